@@ -5,9 +5,34 @@ import 'package:audioplayers/audioplayers.dart';
 
 
 void main() {
+  startRegisterService();
   runApp(const MyApp());
 }
 
+// Start the register service once. It keeps Buku Daftar loaded in memory so BD and KK connect to it
+// instead of loading the excelbook on every click. If one is already running the new one just exits
+Future<void> startRegisterService() async {
+  bool isRelease = bool.fromEnvironment('dart.vm.product');
+
+  // Use fixed install path in release, dynamic in debug
+  final appDir = isRelease
+      ? r'C:\Program Files (x86)\sdm'
+      : r'C:\Users\USER\Desktop\sdm';  // dev path
+
+  final serviceExe = p.join(appDir, 'python-script', 'register_service.exe');
+  if (!await File(serviceExe).exists()) {
+    // Older install without the service. BD and KK still work, they open the excelbook themselves
+    print('Register service not found: $serviceExe');
+    return;
+  }
+
+  try {
+    await Process.start(serviceExe, [], mode: ProcessStartMode.detached);
+  } on ProcessException catch (e) {
+    print('Register service failed to start: $e');
+  }
+}
+
 class MyApp extends StatelessWidget {
   const MyApp({super.key});
 
@@ -1,11 +1,14 @@
 import os
 import sys
-import re
 import csv
 import tkinter as tk
 from tkinter import messagebox, ttk
-from openpyxl import Workbook, load_workbook
 from datetime import datetime
+import register
+import register.dates
+import register.jobs
+import register.profiling
+import register.schema
 
 if getattr(sys, 'frozen', False):
     base_path = os.path.dirname(sys.executable)
@@ -15,28 +18,56 @@ else:
 # Load Existing Buku Daftar excelbook
 filename = os.path.join(base_path, "Buku_Daftar_UAT.xlsx") # Main Excel Master record
 admin_path = os.path.join(base_path, "admin_password.csv") # Admin password for record edit
-workbook = load_workbook(filename)
-sheet = workbook.active
+
+# KK.exe --profile (or REGISTER_PROFILE=1): log time and memory of the register operations, see register.profiling
+if "--profile" in sys.argv:
+    register.profiling.enable()
+
+# Use the register service if the launcher started one. Otherwise open the register here: startup only streams the
+# excelbook read-only, the full writable load happens when a record is opened.
+# Search goes through the reference index kept next to the excelbook, no more scanning the whole register
+reg = register.connect_register(filename)
+column_indexes = reg.column_indexes
 
 # Global variables
 otp_verified = False # Start dictionary for password match
 selected_row_index = None
 invalid_attempts = 0 # invalid attempt counter for admin password trigger
 
-# Find the existing table in the sheet
-def get_table_range(sheet):
-    for table in sheet.tables.values():
-        return table.ref  # Returns the table range
-
-# Find header of the column
-column_indexes = {}
-for col in sheet.iter_cols(1, sheet.max_column):
-    header = col[0].value
-    if header in ["REPORT NUMBER", "INTERNAL REFERENCE NUMBER", "DATE RECEIVED","RECEIVED BY","CONTACT PERSON","APPLICANT BY", "CLIENT",
-            "WORK TITLE", "QUANTITY", "SAMPLE MARKING", "WORK CLASS", "TOT", "NO. OF TEST",
-            "START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE",
-            "LABORATORY PERSONNEL","REVENUE/REMARKS"]:
-        column_indexes[header] = col[0].column  # Store the column index
+# Most rows shown for a free text search, and their columns
+SEARCH_LIMIT = 50
+SEARCH_COLUMNS = ["INTERNAL REFERENCE NUMBER", "REPORT NUMBER", "CLIENT", "WORK TITLE", "DATE RECEIVED"]
+
+# Saves run on a worker thread (register.jobs) so the window keeps repainting while the excelbook is written.
+# Edits go to the journal at once, the excelbook is written after the clerk stops editing for a while
+# (register.jobs.AutoSave, REGISTER_AUTOSAVE_SECONDS) or when KK exits. One of each for the whole session, owned by
+# the search window, so a run of edits over many jobs is written once. Kemaskini and Papar Rekod are windows on top
+# of it. The lines at the bottom of the search window say what the worker is doing and whether there are unsaved
+# changes
+jobs = None
+autosave = None
+
+def start_jobs(window):
+    status_frame = tk.Frame(window)
+    status_frame.pack(side="bottom", fill="x", padx=10, pady=5)
+    status_label = tk.Label(status_frame, text="", fg="blue")
+    status_label.pack(side="left")
+    unsaved_label = tk.Label(status_frame, text="")
+    unsaved_label.pack(side="right")
+
+    def show_unsaved(count):
+        if count:
+            unsaved_label.config(text=f"Unsaved changes ({count} record{'s' if count > 1 else ''})", fg="red")
+        else:
+            unsaved_label.config(text="All changes saved", fg="green")
+
+    jobs = register.jobs.JobQueue(window, on_status=lambda text: status_label.config(text=f"{text}..." if text else ""))
+    autosave = register.jobs.AutoSave(jobs, reg.flush, on_change=show_unsaved, on_error=flush_failed)
+    return jobs, autosave
+
+def flush_failed(e):
+    # Most likely the excelbook is open in Excel. Edits stay in the journal, we try again next flush
+    messagebox.showerror("Error", f"Error saving data: {e}")
 
 # Get admin password from csv for record editing purposes
 def get_values_from_csv(admin_password):
@@ -91,14 +122,23 @@ def change_admin_password():
 
     tk.Button(password_window, text="Save", command=save_new_password).pack(pady=10)
 
+# The excelbook lacks columns KK shows or edits (an older copy without TOT or APPLICANT BY etc2). Say so once at
+# startup instead of edits quietly going nowhere
+def warn_missing_columns():
+    missing = register.schema.missing_headers(column_indexes, register.REGISTER_HEADERS, register.OPTIONAL_HEADERS)
+    if missing:
+        messagebox.showwarning("Buku Daftar", f"Buku Daftar has no column for: {', '.join(missing)}.\n"
+                                              "Those values will not be saved. Add the column(s) to the excelbook first.")
+
 # Main window for reference number searching program
 def main_window():
     global invalid_attempts # invalid attempt counter for admin password
+    global jobs, autosave
 
-    # Main window, main window 😂
+    # Main window, main window 😂. Stays open for the whole session, the other windows open on top of it
     root = tk.Tk()
     root.title("Search Reference Number")
-    root.geometry("600x150")
+    root.geometry("600x230")
 
     frame = tk.Frame(root)
     frame.pack(padx=10, pady=10)
@@ -118,8 +158,12 @@ def main_window():
     # Get the last two digits of the current year
     current_year_suffix = datetime.now().year % 100
 
-    # well...aesthetics again
-    year_label = tk.Label(frame, text=f'{current_year_suffix}').grid(row=1, column=2, padx=5, pady=5, sticky="w")
+    # Year of the reference, this year by default. Older jobs are found the same way, straight from the index
+    tk.Label(frame, text="Year").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+    year_var = tk.StringVar(value=f"{current_year_suffix:02d}")
+    year_dropdown = ttk.Combobox(frame, textvariable=year_var, state="readonly", width=4)
+    year_dropdown["values"] = [f"{year:02d}" for year in sorted(set(reg.reference_years()) | {current_year_suffix}, reverse=True)]
+    year_dropdown.grid(row=1, column=2, padx=5, pady=5, sticky="w")
 
     tk.Label(frame, text="Running Number").grid(row=0, column=3, padx=5, pady=5, sticky="w")
     entry_running_number = tk.Entry(frame)
@@ -144,7 +188,7 @@ def main_window():
         # If valid, reset the counter
         invalid_attempts = 0
 
-        reference_number = f"PA/UAT/{workclass}/{current_year_suffix}/{running_number}" # var for ref number
+        reference_number = f"PA/UAT/{workclass}/{year_var.get()}/{running_number}" # var for ref number
 
         # Locate the column index for "INTERNAL REFERENCE NUMBER" from master record
         col_index = column_indexes.get("INTERNAL REFERENCE NUMBER")
@@ -152,25 +196,15 @@ def main_window():
             messagebox.showerror("Error", "Column 'INTERNAL REFERENCE NUMBER' not found.")
             return
 
-        # Search for the reference number in the column
-        for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=col_index, max_col=col_index):
-            cell = row[0]
-            cell_value = cell.value
-            if cell.value:
-                normalized_cell_value = re.split(r"-\(\d+\)$", cell_value)[0] # Algorithm to ignore suffix. $ looks at the end (\d+\) look at one or more digit at the end after the "-"
-                if normalized_cell_value == reference_number:
-                    row_data = cell.row
-                    messagebox.showinfo("Found", f"Reference Number found at row {row_data}.")
-                    root.destroy()  # Close the main window
-                    show_options_window(reference_number, row_data)
-                    return  # Exit the function if a match is found
-
-        # If not found
-        messagebox.showinfo("Not Found", "Reference Number not found in the table.")
+        # Look up the reference number in the index. Suffix "-(n)" is ignored same as before
+        row_data = reg.find_by_reference(reference_number)
+        if row_data:
+            messagebox.showinfo("Found", f"Reference Number found at row {row_data}.")
+            show_options_window(root, reference_number, row_data)
+            return  # Exit the function if a match is found
 
-        # Show options window if the reference number is found
-        root.destroy()  # Close the main window
-        show_options_window(reference_number, row_data)
+        # If not found. Stay on the search window so user can try again
+        messagebox.showinfo("Not Found", "Reference Number not found in the table.")
 
     # Triggering event to change the password
     def on_no_reference():
@@ -181,12 +215,74 @@ def main_window():
 
     # Back to the main window. This is the search button for the main window
     tk.Button(frame, text="Search", command=search_reference).grid(row=1, column=5, columnspan=2, pady=10)
+
+    # Free text search. Client, report number, work title, sample marking or contact person, any year
+    tk.Label(frame, text="Find").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+    entry_find = tk.Entry(frame, width=50)
+    entry_find.grid(row=2, column=1, columnspan=3, padx=5, pady=5, sticky="we")
+
+    def find_records(event=None):
+        query = entry_find.get().strip()
+        if not query:
+            return
+
+        def found(result):
+            results, rows = result
+            if not results:
+                messagebox.showinfo("Not Found", f"Nothing matches '{query}'.")
+                return
+            show_search_results(root, query, results, rows)
+
+        # On the worker: a cold search index is built from the whole register and the rows may need the full load
+        # of the excelbook. Typing a new query before it is done drops the older one
+        jobs.submit(search_records, query, key="search", supersede=True, label="Searching", on_done=found,
+                    on_error=lambda e: messagebox.showerror("Error", f"Error searching Buku Daftar: {e}"))
+
+    entry_find.bind("<Return>", find_records)
+    tk.Button(frame, text="Find", command=find_records).grid(row=2, column=5, columnspan=2, pady=10)
+    jobs, autosave = start_jobs(root)
+    root.after(0, warn_missing_columns)
     root.mainloop()
+    jobs.close()  # Let a save in progress finish. What is still unsaved is written on exit, see the bottom
+
+# Runs on the worker. The matches, best first, and their SEARCH_COLUMNS
+def search_records(query):
+    results = reg.search(query, limit=SEARCH_LIMIT)
+    return results, reg.read_rows([row_num for row_num, _ in results], SEARCH_COLUMNS)
+
+# Results of the free text search, best match first. Double click a row to open it like a reference search
+def show_search_results(root, query, results, rows):
+    results_window = tk.Toplevel(root)
+    results_window.title(f"Search: {query}")
+    results_window.geometry("900x350")
+
+    tree = ttk.Treeview(results_window, columns=SEARCH_COLUMNS, show="headings")
+    for column in SEARCH_COLUMNS:
+        tree.heading(column, text=column.title())
+        tree.column(column, width=170 if column in ("CLIENT", "WORK TITLE") else 140)
+    scrollbar = ttk.Scrollbar(results_window, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=scrollbar.set)
+    tree.pack(side="left", fill="both", expand=True)
+    scrollbar.pack(side="right", fill="y")
+
+    for (row_num, _), values in zip(results, rows):
+        tree.insert("", tk.END, iid=str(row_num), values=[register.dates.format_date(value) or "" for value in values])
+
+    def open_result(event):
+        selected = tree.focus()
+        if not selected:
+            return
+        row_data = int(selected)
+        reference_number = tree.set(selected, "INTERNAL REFERENCE NUMBER")
+        results_window.destroy()
+        show_options_window(root, reference_number, row_data)
+
+    tree.bind("<Double-1>", open_result)
 
 # Once main window is passed,you get two option. This is that option tkint window.
 # We pass reference_number and row_data in this
-def show_options_window(reference_number, row_data):
-    options_window = tk.Tk()
+def show_options_window(root, reference_number, row_data):
+    options_window = tk.Toplevel(root)
     options_window.title("Options")
     options_window.geometry("400x200")
 
@@ -198,21 +294,19 @@ def show_options_window(reference_number, row_data):
     # Option 1, kemaskini window to amend date of test and revenue
     def open_kemaskini():
         options_window.destroy()
-        kemaskini(reference_number, row_data)
+        kemaskini(root, reference_number, row_data)
 
     # Option 2, show record and edit if needed "wink2"
     def open_papar_rekod():
         options_window.destroy()
-        papar_rekod(reference_number, row_data)
+        papar_rekod(root, reference_number, row_data)
 
     tk.Button(frame, text="Kemaskini", command=open_kemaskini, width=15).pack(pady=5)
     tk.Button(frame, text="Papar Rekod", command=open_papar_rekod, width=15).pack(pady=5)
 
-    options_window.mainloop()
-
 # Option 1 window. Reference_number is not needed anymore but I am too coward to delete it
-def kemaskini(reference_number, row_data):
-    new_data = tk.Tk()
+def kemaskini(root, reference_number, row_data):
+    new_data = tk.Toplevel(root)
     new_data.title("Kemaskini Data Pengujian")
     new_data.geometry("800x600")
 
@@ -250,53 +344,57 @@ def kemaskini(reference_number, row_data):
     entry_RR.grid(row=5, column=1, padx=5, pady=5)
 
     def save_updates():
-        start_test_date = entry_SD.get()
-        end_test_date = entry_ED.get()
-        approved_date = entry_AD.get()
-        release_date = entry_RD.get()
-        lab_personnel = entry_LP.get()
-        revenue_remarks = entry_RR.get()
-
-        if "START TEST DATE" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["START TEST DATE"], value=start_test_date)
-        if "END TEST DATE" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["END TEST DATE"], value=end_test_date)
-        if "APPROVED DATE" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["APPROVED DATE"], value=approved_date)
-        if "REPORT RELEASE DATE" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["REPORT RELEASE DATE"], value=release_date)
-        if "LABORATORY PERSONNEL" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["LABORATORY PERSONNEL"], value=lab_personnel)
-        if "REVENUE/REMARKS" in column_indexes:
-            sheet.cell(row=row_data, column=column_indexes["REVENUE/REMARKS"], value=revenue_remarks)
-
-        # Save the workbook
-        workbook.save(filename)
-        messagebox.showinfo("Success", "Data updated successfully.")
-        new_data.destroy()
+        # Back to the search window for the next job. The edit is in the journal, the autosave writes the
+        # excelbook once the clerk stops for a while
+        def saved(result):
+            autosave.mark(row_data)
+            messagebox.showinfo("Success", "Data updated successfully.")
+            if new_data.winfo_exists():
+                new_data.destroy()
+
+        def failed(e):
+            if new_data.winfo_exists():
+                save_button.config(state="normal")
+            if isinstance(e, register.RegisterLockedError):
+                # Someone else is saving Buku Daftar right now. Keep the window so user can press Save again
+                messagebox.showerror("Error", str(e))
+            else:
+                messagebox.showerror("Error", f"Error saving data: {e}")
+
+        # Journal first, then the sheet in memory. The excelbook itself is written by the autosave
+        save_button.config(state="disabled")
+        jobs.submit(
+            reg.update_test_dates,
+            row_data,
+            start_test_date=entry_SD.get(),
+            end_test_date=entry_ED.get(),
+            approved_date=entry_AD.get(),
+            release_date=entry_RD.get(),
+            lab_personnel=entry_LP.get(),
+            revenue_remarks=entry_RR.get(),
+            label="Saving", on_done=saved, on_error=failed,
+        )
 
     # Save Button. Yes, I know, I didn't include the error if empty field
     # ...and also what would happen if someone clicked Save without entering any data
-    tk.Button(frame, text="Save", command=save_updates).grid(row=6, column=0, columnspan=2, pady=20)
+    save_button = tk.Button(frame, text="Save", command=save_updates)
+    save_button.grid(row=6, column=0, columnspan=2, pady=20)
 
     # Here you go, Are you happy now !!...gotta stop chugging coffee
     tk.Label(frame, text="Jangan biarkan medan kosong sebelum menekan butang Save", font=("Arial", 12), fg="red").grid(row=7, column=0, columnspan=2, pady=20)
 
-    new_data.mainloop()
-
 # Option 2. Yes I know, the reference number isn't needed anymore
-def papar_rekod(reference_number, row_data):
-    def load_row_data(row_data):
-        # Extract all the row value based on row number of the RN "row_data"
-        row_values = {}
-        for cell in sheet[row_data]:
-            column_header = sheet.cell(row=1, column=cell.column).value  # Assuming headers are in row 1
-            row_values[column_header] = cell.value
-        return row_values
-
+def papar_rekod(root, reference_number, row_data):
+    # Extract all the row value based on row number of the RN "row_data". Opening a record pays for the full
+    # writable load of the excelbook, so it is read on the worker and the window opens with it once it is there
+    jobs.submit(reg.read_record, row_data, label="Opening record",
+                on_done=lambda row_values: show_papar_rekod(root, reference_number, row_data, row_values),
+                on_error=lambda e: messagebox.showerror("Error", f"Error reading Buku Daftar: {e}"))
+
+# The record window itself, with the row values read by papar_rekod
+def show_papar_rekod(root, reference_number, row_data, row_values):
     # Function to save papar data. Give error if no password
     def save_papar_data():
-        global sheet
         if not otp_verified:
             messagebox.showerror("Error", "You must Logged in as admin before saving changes.")
             return
@@ -315,19 +413,13 @@ def papar_rekod(reference_number, row_data):
             "SAMPLE MARKING": entry_sample_marking.get(),
         }
 
-        # Loop through the updated data and save it to the corresponding column in the sheet
-        for header, value in updated_data.items():
-            if header in column_indexes:
-                column_index = column_indexes[header]
-                sheet.cell(row=row_data, column=column_index, value=value)
-
-        try:
-            # Save the updated data back to the Excel file
-            workbook.save(filename)
+        def saved(result):
+            autosave.mark(row_data)
             messagebox.showinfo("Success", "Data saved successfully!")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Error saving data: {e}")
+        # Journal first so the edit survive a crash. The excelbook itself is written by the autosave
+        jobs.submit(reg.update_record, row_data, updated_data, label="Saving", on_done=saved,
+                    on_error=lambda e: messagebox.showerror("Error", f"Error saving data: {e}"))
 
     # Prompt for admin login. Main prompt #1
     def prompt_otp(papar_rekod):
@@ -355,11 +447,9 @@ def papar_rekod(reference_number, row_data):
         if not otp_verified:
             prompt_otp(papar)
 
-    # Regurgitate row values. To be populated inside respective tkinter entry
-    row_values = load_row_data(row_data)
-
+    # Regurgitate row values (row_values). To be populated inside respective tkinter entry
     # Main papar window for our option 2
-    papar = tk.Tk()
+    papar = tk.Toplevel(root)
     papar.title("Rekod Makmal")
     papar.geometry("800x600")
 
@@ -400,7 +490,7 @@ def papar_rekod(reference_number, row_data):
     tk.Label(frame, text="Date Received").grid(row=5, column=0, padx=5, pady=5, sticky="e")
     entry_date_received = tk.Entry(frame)
     entry_date_received.grid(row=5, column=1, padx=5, pady=5)
-    entry_date_received.insert(0, row_values.get("DATE RECEIVED", ""))
+    entry_date_received.insert(0, register.dates.format_date(row_values.get("DATE RECEIVED")))  # dd/mm/yy
 
     # Received by
     tk.Label(frame, text="Received By").grid(row=6, column=0, padx=5, pady=5, sticky="e")
@@ -435,8 +525,16 @@ def papar_rekod(reference_number, row_data):
 
     # Save button (optional functionality)
     tk.Button(frame, text="Save Data", command=save_papar_data).grid(row=10, columnspan=3, pady=10)
-    papar.mainloop()
+
+    # Flush button. Write pending edits into the excelbook now instead of waiting for the autosave
+    tk.Button(frame, text="Flush", command=autosave.save_now).grid(row=11, columnspan=3, pady=10)
 
 if __name__ == "__main__":
     main_window()
 
+    # Search window closed, KK exits. Whatever still in the journal goes into the excelbook now
+    try:
+        reg.flush()
+    except Exception as e:
+        flush_failed(e)
+
@@ -0,0 +1,31 @@
+# Headless register library for the Buku Daftar (BD) and Kemaskini (KK) programs.
+# Both UIs call into this. Scripts and bulk jobs can use it without a display, see register/core.py.
+
+from register.core import (
+    OPTIONAL_HEADERS,
+    REGISTER_HEADERS,
+    TEST_CODES,
+    WORKCLASS_CODES,
+    WORKCLASS_MINDEF_SUFFIXES,
+    Register,
+    open_register,
+    prepare_entry,
+    process_marking,
+)
+from register.client import RemoteRegister, connect_register
+from register.writelock import RegisterLockedError
+
+__all__ = [
+    "OPTIONAL_HEADERS",
+    "REGISTER_HEADERS",
+    "TEST_CODES",
+    "WORKCLASS_CODES",
+    "WORKCLASS_MINDEF_SUFFIXES",
+    "Register",
+    "RegisterLockedError",
+    "RemoteRegister",
+    "connect_register",
+    "open_register",
+    "prepare_entry",
+    "process_marking",
+]
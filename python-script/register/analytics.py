@@ -0,0 +1,325 @@
+import argparse
+import csv
+import sys
+import time
+from array import array
+from datetime import date
+
+from register import dates
+from register.core import TEST_CODES, open_register
+
+# Turnaround and workload figures from the register, instead of Excel pivots. The columns below are read once
+# into plain columns (register.column_values), the dates parsed once into day numbers, then every report is a few
+# passes over those arrays:
+#
+#   columns = load_columns(reg)
+#   by_month(columns)                        # received, tests, released, turnaround, backlog for every month
+#   monthly_report(columns, 2025, 3)         # March 2025 by work class and by lab personnel
+#
+#   python -m register.analytics Buku_Daftar_UAT.xlsx
+#   python -m register.analytics Buku_Daftar_UAT.xlsx --month 2025-03 --csv march.csv
+#
+# Durations are calendar days. A row counts for a stage only if it has both dates, an end before its start
+# (typo in the date) is left out and counted in date_errors. Released means REPORT RELEASE DATE is filled in.
+
+ANALYTICS_HEADERS = ["DATE RECEIVED", "START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE",
+                     "WORK CLASS", "TOT", "NO. OF TEST", "LABORATORY PERSONNEL"]
+ANALYTICS_DATE_HEADERS = ["DATE RECEIVED", "START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE"]
+
+# (name, from, to)
+STAGES = [
+    ("to_start", "DATE RECEIVED", "START TEST DATE"),
+    ("testing", "START TEST DATE", "END TEST DATE"),
+    ("approval", "END TEST DATE", "APPROVED DATE"),
+    ("release", "APPROVED DATE", "REPORT RELEASE DATE"),
+    ("turnaround", "DATE RECEIVED", "REPORT RELEASE DATE"),
+]
+NO_DATE = 0  # Day numbers are date.toordinal(), which starts at 1
+NO_DURATION = -1
+
+GROUP_COLUMNS = ["group", "jobs", "tests", "turnaround_mean", "turnaround_median", "turnaround_p90", "turnaround_max",
+                 "to_start_median", "testing_median", "approval_median", "release_median", "date_errors"]
+MONTH_COLUMNS = ["month", "received", "tests_received", *TEST_CODES, "released", "turnaround_mean",
+                 "turnaround_median", "turnaround_p90", "backlog"]
+
+
+def parse_days(values):
+    # Column of dates (datetime, or "dd/mm/yy" text in older rows) -> array of day numbers, NO_DATE if empty or
+    # not a date. The same date repeats on many rows, each distinct value is parsed once
+    days = array("l", [NO_DATE]) * len(values)
+    cache = {}
+    for i, value in enumerate(values):
+        if value is None or value == "":
+            continue
+        day = cache.get(value)
+        if day is None:
+            parsed = dates.parse_date(value)
+            day = cache[value] = parsed.toordinal() if parsed else NO_DATE
+        days[i] = day
+    return days
+
+
+def workclass_group(value):
+    # "MINDEF (Bekalan)" -> "MINDEF"
+    if value is None:
+        return ""
+    return str(value).split(" (")[0].strip()
+
+
+def _count(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Columns:
+    # The register as columns, row 2 of the excelbook at index 0
+    def __init__(self, values):
+        # values: {header: [value, ...]}, every header of ANALYTICS_HEADERS (missing ones as all None)
+        self.size = len(values["DATE RECEIVED"])
+        self.days = {header: parse_days(values[header]) for header in ANALYTICS_DATE_HEADERS}
+        self.workclass = [workclass_group(value) for value in values["WORK CLASS"]]
+        self.personnel = [str(value).strip() if value else "" for value in values["LABORATORY PERSONNEL"]]
+        self.tests = array("l", [_count(value) for value in values["NO. OF TEST"]])
+        self.tot = values["TOT"]
+        self.durations = {name: self._durations(start, end) for name, start, end in STAGES}
+
+    def _durations(self, start_header, end_header):
+        # Days between two date columns, NO_DURATION where one is missing or the end is before the start
+        starts = self.days[start_header]
+        ends = self.days[end_header]
+        return array("l", [end - start if start and end and end >= start else NO_DURATION
+                           for start, end in zip(starts, ends)])
+
+    def date_errors(self, rows):
+        # Rows with an end date before its start date in any stage
+        errors = 0
+        for i in rows:
+            for _, start, end in STAGES:
+                start_day = self.days[start][i]
+                end_day = self.days[end][i]
+                if start_day and end_day and end_day < start_day:
+                    errors += 1
+                    break
+        return errors
+
+
+def load_columns(reg):
+    # One column_values call per header, works the same on Register, SqliteRegister and the register service
+    values = {header: [value for _, value in reg.column_values(header)] for header in ANALYTICS_HEADERS}
+    return Columns(values)
+
+
+def stats(durations):
+    # {mean, median, p90, max} of a list of day counts, None when empty
+    if not durations:
+        return {"mean": None, "median": None, "p90": None, "max": None}
+    durations = sorted(durations)
+    n = len(durations)
+    return {
+        "mean": round(sum(durations) / n, 1),
+        "median": durations[(n - 1) // 2],
+        "p90": durations[min(n - 1, -(-9 * n // 10) - 1)],  # Nearest rank
+        "max": durations[-1],
+    }
+
+
+def _month_key(day, cache):
+    key = cache.get(day)
+    if key is None:
+        d = date.fromordinal(day)
+        key = cache[day] = f"{d.year:04d}-{d.month:02d}"
+    return key
+
+
+def group_rows(keys, rows):
+    # {key: [row index, ...]} in first seen order
+    groups = {}
+    for i in rows:
+        groups.setdefault(keys[i], []).append(i)
+    return groups
+
+
+def group_summary(columns, groups):
+    # One row per group: jobs, tests, turnaround stats and the median of every stage
+    report = []
+    for key, rows in groups.items():
+        turnaround = stats([d for d in (columns.durations["turnaround"][i] for i in rows) if d != NO_DURATION])
+        summary = {
+            "group": key or "(blank)",
+            "jobs": len(rows),
+            "tests": sum(columns.tests[i] for i in rows),
+            "turnaround_mean": turnaround["mean"],
+            "turnaround_median": turnaround["median"],
+            "turnaround_p90": turnaround["p90"],
+            "turnaround_max": turnaround["max"],
+        }
+        for name, _, _ in STAGES[:-1]:
+            durations = columns.durations[name]
+            summary[f"{name}_median"] = stats([d for d in (durations[i] for i in rows) if d != NO_DURATION])["median"]
+        summary["date_errors"] = columns.date_errors(rows)
+        report.append(summary)
+    report.sort(key=lambda row: row["jobs"], reverse=True)
+    return report
+
+
+def released_rows(columns, first_day=None, last_day=None):
+    # Rows released (REPORT RELEASE DATE) between first_day and last_day, both day numbers and inclusive
+    released = columns.days["REPORT RELEASE DATE"]
+    return [i for i, day in enumerate(released)
+            if day and (first_day is None or day >= first_day) and (last_day is None or day <= last_day)]
+
+
+def by_workclass(columns, rows=None):
+    return group_summary(columns, group_rows(columns.workclass, released_rows(columns) if rows is None else rows))
+
+
+def by_personnel(columns, rows=None):
+    return group_summary(columns, group_rows(columns.personnel, released_rows(columns) if rows is None else rows))
+
+
+def by_month(columns):
+    # Intake by month received (jobs, tests, each test type), completion by month released (jobs, turnaround),
+    # and the backlog at the end of each month (received by then, not released by then)
+    months = {}
+    month_cache = {}
+    tot_cache = {}
+    received_days = columns.days["DATE RECEIVED"]
+    released_days = columns.days["REPORT RELEASE DATE"]
+    turnaround = columns.durations["turnaround"]
+
+    def month(key):
+        row = months.get(key)
+        if row is None:
+            row = months[key] = {"month": key, "received": 0, "tests_received": 0, **{code: 0 for code in TEST_CODES},
+                                 "released": 0, "durations": [], "opened": 0, "closed": 0}
+        return row
+
+    for i in range(columns.size):
+        received = received_days[i]
+        if received:
+            row = month(_month_key(received, month_cache))
+            row["received"] += 1
+            row["tests_received"] += columns.tests[i]
+            row["opened"] += 1
+            codes = tot_cache.get(columns.tot[i])
+            if codes is None:
+                codes = tot_cache[columns.tot[i]] = [code.strip() for code in str(columns.tot[i] or "").split(",")
+                                                     if code.strip() in TEST_CODES]
+            for code in codes:
+                row[code] += 1
+        released = released_days[i]
+        if released:
+            row = month(_month_key(released, month_cache))
+            row["released"] += 1
+            if turnaround[i] != NO_DURATION:
+                row["durations"].append(turnaround[i])
+            if received:
+                row["closed"] += 1
+
+    report = []
+    backlog = 0
+    for key in sorted(months):
+        row = months[key]
+        backlog += row.pop("opened") - row.pop("closed")
+        turnaround_stats = stats(row.pop("durations"))
+        row["turnaround_mean"] = turnaround_stats["mean"]
+        row["turnaround_median"] = turnaround_stats["median"]
+        row["turnaround_p90"] = turnaround_stats["p90"]
+        row["backlog"] = backlog
+        report.append(row)
+    return report
+
+
+def month_bounds(year, month):
+    # First and last day number of a month
+    first = date(year, month, 1)
+    following = date(year + month // 12, month % 12 + 1, 1)
+    return first.toordinal(), following.toordinal() - 1
+
+
+def monthly_report(columns, year, month):
+    # Jobs released in that month, by work class and by lab personnel, plus that month's line of by_month
+    first_day, last_day = month_bounds(year, month)
+    rows = released_rows(columns, first_day, last_day)
+    key = f"{year:04d}-{month:02d}"
+    summary = next((row for row in by_month(columns) if row["month"] == key), None)
+    return {
+        "month": key,
+        "summary": summary,
+        "by_workclass": by_workclass(columns, rows),
+        "by_personnel": by_personnel(columns, rows),
+    }
+
+
+def format_table(rows, columns):
+    # Plain text table, first column left aligned, the rest right aligned. Empty stats show as "-"
+    cells = [[("-" if row.get(column) is None else str(row.get(column))) for column in columns] for row in rows]
+    widths = [max([len(column)] + [len(line[n]) for line in cells]) for n, column in enumerate(columns)]
+
+    def line(values):
+        return "  ".join(value.ljust(width) if n == 0 else value.rjust(width)
+                         for n, (value, width) in enumerate(zip(values, widths)))
+
+    return "\n".join([line(columns)] + [line(values) for values in cells])
+
+
+def write_csv(path, sections):
+    # sections: [(title, rows, columns), ...] one after the other with a blank line between, Excel opens it fine
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        for n, (title, rows, columns) in enumerate(sections):
+            if n:
+                writer.writerow([])
+            writer.writerow([title])
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([row.get(column) for column in columns])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Turnaround and workload report from Buku Daftar.")
+    parser.add_argument("register", help="Buku Daftar excelbook (or its .sqlite)")
+    parser.add_argument("--month", help="YYYY-MM: that month's report by work class and lab personnel")
+    parser.add_argument("--csv", help="also write the tables to this CSV file")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    reg = open_register(args.register)
+    columns = load_columns(reg)
+    loaded = time.perf_counter()
+
+    if args.month:
+        try:
+            year, month = (int(part) for part in args.month.split("-"))
+            report = monthly_report(columns, year, month)
+        except ValueError:
+            print(f"--month must look like 2025-03, not {args.month}", file=sys.stderr)
+            return 1
+        sections = [
+            (f"{report['month']}", [report["summary"]] if report["summary"] else [], MONTH_COLUMNS),
+            (f"{report['month']} released, by work class", report["by_workclass"], GROUP_COLUMNS),
+            (f"{report['month']} released, by lab personnel", report["by_personnel"], GROUP_COLUMNS),
+        ]
+    else:
+        sections = [
+            ("By month", by_month(columns), MONTH_COLUMNS),
+            ("Released, by work class", by_workclass(columns), GROUP_COLUMNS),
+            ("Released, by lab personnel", by_personnel(columns), GROUP_COLUMNS),
+        ]
+    done = time.perf_counter()
+
+    for title, rows, table_columns in sections:
+        print(title)
+        print(format_table(rows, table_columns) if rows else "(nothing)")
+        print()
+    if args.csv:
+        write_csv(args.csv, sections)
+        print(f"Written to {args.csv}")
+    print(f"{columns.size} rows: read in {loaded - start:.2f}s, report in {done - loaded:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from register import templates
+from register.core import open_register
+
+# Batch document generation. All three documents (work file, test form, review of request) for many rows,
+# rendered across a process pool (a few rows render in-process, see POOL_MIN_ROWS). Each worker keeps its own
+# template skeletons (register.templates).
+#
+#   python -m register.batch --register Buku_Daftar_UAT.xlsx --rows 2010-2040 --out doc_out_file
+#
+# BD's "Generate All" button calls render_rows() with its added_rows.
+
+# Document kind -> (renderer, which logo it needs)
+DOCUMENT_KINDS = {
+    "Work File": (templates.render_work_file, None),
+    "Test Form": (templates.render_test_form, "logo"),
+    "Review of Request": (templates.render_review_of_request, "logo2"),
+}
+
+# Fewer rows than this render in BD's own process. Measured with spawned workers (what Windows does): starting
+# the pool costs ~0.45s, a row (three documents) ~0.15s in-process, so below ~4 rows the pool only adds waiting
+POOL_MIN_ROWS = 4
+
+
+def _render(kind, record, out_dir, logo_path, name):
+    # Runs in the worker process. Only plain data crosses over, the Register stays in the parent
+    renderer, _ = DOCUMENT_KINDS[kind]
+    if logo_path is None:
+        return renderer(record, out_dir, name=name)
+    return renderer(record, out_dir, logo_path, name=name)
+
+
+def file_names(records):
+    # Documents are named after the client. A tender usually has many rows for one client and they would
+    # overwrite each other, so those get the row number added
+    clients = Counter(record.get("CLIENT") for record in records.values())
+    return {row_num: f"{record.get('CLIENT')} ({row_num})" if clients[record.get("CLIENT")] > 1 else None
+            for row_num, record in records.items()}
+
+
+def render_rows(reg, row_nums, out_dir, logo_path, logo2_path, workers=None, progress=None):
+    # Returns [(row number, kind, path or None, error or None), ...] in row order.
+    # progress(done, total) is called after each document. A failed document doesn't stop the others
+    logos = {None: None, "logo": logo_path, "logo2": logo2_path}
+    records = {row_num: reg.read_record(row_num) for row_num in row_nums}
+    names = file_names(records)
+    jobs = [(row_num, kind, (kind, records[row_num], out_dir, logos[logo], names[row_num]))
+            for row_num in records for kind, (_, logo) in DOCUMENT_KINDS.items()]
+
+    results = []
+    if workers == 1 or len(records) < POOL_MIN_ROWS:
+        # Not worth starting processes for
+        for done, (row_num, kind, args) in enumerate(jobs, start=1):
+            try:
+                results.append((row_num, kind, _render(*args), None))
+            except Exception as e:
+                results.append((row_num, kind, None, str(e)))
+            if progress:
+                progress(done, len(jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render, *args): (row_num, kind) for row_num, kind, args in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                row_num, kind = futures[future]
+                try:
+                    results.append((row_num, kind, future.result(), None))
+                except Exception as e:
+                    results.append((row_num, kind, None, str(e)))
+                if progress:
+                    progress(done, len(jobs))
+
+    kind_order = list(DOCUMENT_KINDS)
+    results.sort(key=lambda result: (result[0], kind_order.index(result[1])))
+    return results
+
+
+def summarize(results, out_dir):
+    # One message for the whole batch instead of a messagebox per document
+    failed = [result for result in results if result[3]]
+    lines = [f"{len(results) - len(failed)} of {len(results)} documents created in {out_dir}"]
+    for row_num, kind, _, error in failed:
+        lines.append(f"Row {row_num} {kind}: {error}")
+    return "\n".join(lines)
+
+
+def parse_rows(specs):
+    # ["2010-2015", "2020"] -> [2010, ..., 2015, 2020]
+    row_nums = []
+    for spec in specs:
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            first, _, last = part.partition("-")
+            row_nums.extend(range(int(first), int(last or first) + 1))
+    return list(dict.fromkeys(row_nums))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the work file, test form and review of request for many rows.")
+    parser.add_argument("--register", default="Buku_Daftar_UAT.xlsx", help="Buku Daftar excelbook")
+    parser.add_argument("--rows", nargs="+", required=True, help="Excel row numbers, e.g 2010-2040 2050")
+    parser.add_argument("--out", default="doc_out_file", help="Folder for the Word documents")
+    parser.add_argument("--logo", help="Logo for the test form (default: STRIDE Logo.png next to the register)")
+    parser.add_argument("--logo2", help="Logo for the review of request (default: STRIDE Logo2.png next to the register)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    base_path = os.path.dirname(os.path.abspath(args.register))
+    logo_path = args.logo or os.path.join(base_path, "STRIDE Logo.png")
+    logo2_path = args.logo2 or os.path.join(base_path, "STRIDE Logo2.png")
+    os.makedirs(args.out, exist_ok=True)
+
+    reg = open_register(args.register)
+    row_nums = parse_rows(args.rows)
+    last_row = reg.next_row - 1
+    out_of_range = [row_num for row_num in row_nums if not 2 <= row_num <= last_row]
+    if out_of_range:
+        print(f"Rows not in Buku Daftar (2-{last_row}): {out_of_range}", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        print(f"\r{done}/{total} documents", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    results = render_rows(reg, row_nums, args.out, logo_path, logo2_path, workers=args.workers, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(summarize(results, args.out))
+    print(f"{elapsed:.2f}s ({len(results) / elapsed:.1f} documents/sec)")
+    return 1 if any(result[3] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
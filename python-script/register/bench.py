@@ -0,0 +1,382 @@
+import argparse
+import csv
+import json
+import os
+import random
+import struct
+import tempfile
+import time
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn
+
+from register import (analytics, browse, counter, documents, lazybook, marking, refindex, revenue, schema, sqlstore,
+                      templates)
+from register.core import REGISTER_HEADERS, open_register
+
+# Headless benchmark with synthetic Buku Daftar registers. No Tk, so it can run anywhere:
+#   python -m register.bench --sizes 1000 10000 100000 --out bench_results
+#   python -m register.bench --sizes 10000 --writers 1 2 4    (several processes writing at once)
+#   python -m register.bench --sizes 10000 --edits 50          (KK edits saved one by one vs autosaved once)
+#   python -m register.bench --sizes 1000 --marking-items 100 1000   (one job with that many sample markings)
+# Writes bench_results.json and bench_results.csv so we can compare runs when the register grows.
+
+WORKCLASSES = [
+    ("9230", "MINDEF", ["Bekalan", "Pembangunan Spesifikasi", "Penyiasatan", "Lain-lain"]),
+    ("9240", "Berbayar", ["Tender", "Syarikat"]),
+    ("9250", "Agensi Kerajaan", [None]),
+    ("9260", "STRIDE", [None]),
+]
+MINDEF_SUFFIXES = ["D", "L", "U", "MAB"]
+MARKING_NAMES = ["shirt", "trousers", "cap", "beret", "jacket", "socks", "glove", "belt", "webbing", "bag", "boot lace", "scarf"]
+TEST_CODES = ["I", "II", "III", "IV", "V"]
+PERSONNEL = ["Aina", "Hafiz", "Kumar", "Mei Ling", "Syafiq"]
+
+
+def synthetic_rows(rows, seed=1):
+    # Yields rows in REGISTER_HEADERS order with real looking references, e.g PA/UAT/9230/24/17 (D)
+    rng = random.Random(seed)
+    running = {}
+    start = date(2021, 1, 4)
+    for i in range(rows):
+        received = start + timedelta(days=i * 1500 // max(rows, 1))
+        code, workclass, subgroups = rng.choice(WORKCLASSES)
+        subgroup = rng.choice(subgroups)
+        year_suffix = received.year % 100
+        key = (code, year_suffix)
+        running[key] = running.get(key, 0) + 1
+        reference = f"PA/UAT/{code}/{year_suffix:02d}/{running[key]:02d}"
+        if workclass == "MINDEF":
+            reference += f" ({rng.choice(MINDEF_SUFFIXES)})"
+        if rng.random() < 0.02:
+            reference += f"-({rng.randint(1, 3)})"  # Amended entries
+        items = [(name, rng.randint(1, 5)) for name in rng.sample(MARKING_NAMES, rng.randint(1, 8))]
+        tests = sorted(rng.sample(TEST_CODES, rng.randint(1, 4)), key=TEST_CODES.index)
+        done = rng.random() < 0.8
+        yield [
+            f"STRIDE/TAL/{year_suffix:02d}/{i + 1:05d}",
+            reference,
+            received.strftime("%d/%m/%y"),
+            rng.choice(PERSONNEL),
+            f"Contact {rng.randint(1, 400)}",
+            "NA",
+            f"Client {rng.randint(1, 600)}",
+            f"Fibre analysis lot {rng.randint(1, 99)}",
+            str(len(items)),
+            marking.format_items(items),
+            f"{workclass} ({subgroup})" if subgroup else workclass,
+            ", ".join(tests),
+            len(tests),
+            (received + timedelta(days=3)).strftime("%d/%m/%y") if done else None,
+            (received + timedelta(days=10)).strftime("%d/%m/%y") if done else None,
+            (received + timedelta(days=14)).strftime("%d/%m/%y") if done else None,
+            (received + timedelta(days=16)).strftime("%d/%m/%y") if done else None,
+            rng.choice(PERSONNEL) if done else None,
+            f"RM {rng.randint(1, 40) * 50}.00" if done and code == "9240" else None,
+            marking.dumps(items),
+        ]
+
+
+def generate_register(path, rows, seed=1):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(REGISTER_HEADERS)
+    for row in synthetic_rows(rows, seed):
+        sheet.append(row)
+    table = Table(displayName="BukuDaftar", ref=f"A1:{get_column_letter(len(REGISTER_HEADERS))}{rows + 1}")
+    # Write-only mode can't read the header back, so the table columns are named here
+    table.tableColumns = [TableColumn(id=n, name=header) for n, header in enumerate(REGISTER_HEADERS, start=1)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # openpyxl warns about table columns in write-only mode even when they are set
+        sheet.add_table(table)
+    workbook.save(path)
+
+
+def write_logo(path):
+    # Smallest valid PNG (1x1 white) so the test form and review of request can add their logo
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    png = b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(b"\x00\xff\xff\xff")) + chunk(b"IEND", b"")
+    with open(path, "wb") as f:
+        f.write(png)
+
+
+def timed(results, size, operation, func, calls=1, unit="rows"):
+    # size is the register size in rows, or what unit says it counts (sample marking items for bench_markings)
+    start = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - start
+    results.append({
+        "size": size,
+        "unit": unit,
+        "operation": operation,
+        "calls": calls,
+        "seconds": round(seconds, 6),
+        "per_call_ms": round(seconds * 1000 / calls, 4),
+    })
+    print(f"{size:>8} {unit:<6}{operation:<28} {seconds:9.3f} s  ({seconds * 1000 / calls:.4f} ms/call)")
+    return value
+
+
+def bench_size(size, workdir, calls, doc_calls, seed=1):
+    results = []
+    path = os.path.join(workdir, f"Buku_Daftar_UAT_{size}.xlsx")
+    timed(results, size, "generate_register", lambda: generate_register(path, size, seed))
+
+    # Startup pieces, read-only streaming (what open_register does)
+    book = lazybook.LazyWorkbook(path)
+    read_only = book.open_read_only()
+    ro_sheet = read_only.active
+    column_indexes = timed(results, size, "read_headers", lambda: schema.column_map(lazybook.read_header_row(ro_sheet), REGISTER_HEADERS))
+    column = lazybook.column_reader(ro_sheet, column_indexes["INTERNAL REFERENCE NUMBER"])
+    values = timed(results, size, "read_reference_column", column)
+    read_only.close()
+    timed(results, size, "build_reference_index", lambda: refindex.build_index(values))
+    timed(results, size, "seed_running_counters", lambda: counter.seed_counters(values))
+
+    # The whole startup through the API, cold (no index/counter cache yet) and warm
+    timed(results, size, "open_register_cold", lambda: open_register(path))
+    reg = timed(results, size, "open_register_warm", lambda: open_register(path))
+
+    # Full writable load (deferred until first save in the programs)
+    timed(results, size, "load_workbook", lambda: reg.sheet)
+
+    # generate_reference_number: peek the next running number
+    rng = random.Random(seed)
+    workclasses = [rng.choice(WORKCLASSES)[1] for _ in range(calls)]
+    timed(results, size, "generate_reference_number",
+          lambda: [reg.allocate_reference(workclass) for workclass in workclasses], calls)
+
+    # search_reference: random existing references plus some misses
+    sample = [rng.choice(values) for _ in range(calls)] + [f"PA/UAT/9999/99/{n}" for n in range(calls // 10)]
+    timed(results, size, "search_reference", lambda: [reg.find_by_reference(ref) for ref in sample], len(sample))
+
+    # Free text search (KK's Find box): building the index once, then client names, markings, prefixes and typos
+    queries = [f"client {rng.randint(1, 600)}" for _ in range(calls // 4)] + [
+        "jacket beret", "cleint 42", "troussers", "jack", "fibre lot 12", "contact 7 client 9", "stride tal 23"]
+    timed(results, size, "search_index_build", lambda: reg.search_index)
+    timed(results, size, "search_text", lambda: [reg.search(query) for query in queries], len(queries))
+
+    # Register browser: sort everything by date, then screenfuls from all over the register
+    row_set = browse.RowSet(reg)
+    timed(results, size, "browse_sort", lambda: row_set.set_sort("DATE RECEIVED", descending=True))
+    positions = [rng.randrange(len(row_set)) for _ in range(calls)]
+    timed(results, size, "browse_window", lambda: [row_set.window(position, 20) for position in positions], calls)
+
+    # Turnaround report: the columns once, then the monthly tables and the groupings
+    columns = timed(results, size, "analytics_load", lambda: analytics.load_columns(reg))
+    timed(results, size, "analytics_report",
+          lambda: (analytics.by_month(columns), analytics.by_workclass(columns), analytics.by_personnel(columns)))
+
+    # Revenue totals: one read-only pass over the excelbook
+    timed(results, size, "revenue_stream", lambda: revenue.aggregate(revenue.stream_rows(path)))
+
+    # Jobs received in a month: the date column parsed once, then a range lookup per month
+    months = [date(rng.randint(2021, 2024), rng.randint(1, 12), 1) for _ in range(calls)]
+    month_ranges = [(first, date(first.year + first.month // 12, first.month % 12 + 1, 1) - timedelta(days=1))
+                    for first in months]
+    timed(results, size, "date_index_build", lambda: reg.date_index("DATE RECEIVED"))
+    timed(results, size, "rows_between",
+          lambda: [reg.rows_between("DATE RECEIVED", first, last) for first, last in month_ranges], calls)
+
+    # save_data: allocate + append rows through the journal
+    row_template = dict(zip(REGISTER_HEADERS, next(synthetic_rows(1, seed))))
+    added_rows = timed(results, size, "save_data",
+                       lambda: [reg.register_entry(row_template, workclass)[0] for workclass in workclasses], calls)
+    timed(results, size, "workbook.save", reg.flush)
+
+    # Same operations on the SQLite store, exporting to a copy of the excelbook
+    db_path = os.path.join(workdir, f"Buku_Daftar_UAT_{size}_store.sqlite")
+    export_path = os.path.join(workdir, f"Buku_Daftar_UAT_{size}_export.xlsx")
+    timed(results, size, "sqlite_import", lambda: sqlstore.import_workbook(path, db_path, force=True).close())
+    store = timed(results, size, "sqlite_open", lambda: sqlstore.SqliteRegister(db_path, export_path))
+    timed(results, size, "sqlite_generate_reference_number",
+          lambda: [store.allocate_reference(workclass) for workclass in workclasses], calls)
+    timed(results, size, "sqlite_search_reference", lambda: [store.find_by_reference(ref) for ref in sample], len(sample))
+    timed(results, size, "sqlite_rows_between",
+          lambda: [store.rows_between("DATE RECEIVED", first, last) for first, last in month_ranges], calls)
+    timed(results, size, "sqlite_save_data",
+          lambda: [store.register_entry(row_template, workclass) for workclass in workclasses], calls)
+    timed(results, size, "sqlite_export", lambda: store.export(force=True))
+    # Flushing afterwards writes the new rows into that export, the first flush loads it
+    for n in range(2):
+        store.register_entry(row_template, workclasses[0])
+        timed(results, size, "sqlite_flush_first" if n == 0 else "sqlite_flush", store.flush)
+    timed(results, size, "sqlite_revenue_stream", lambda: revenue.aggregate(revenue.stream_rows(db_path)))
+    store.close()
+
+    # Documents for the rows we just added
+    out_dir = os.path.join(workdir, f"docs_{size}")
+    os.makedirs(out_dir, exist_ok=True)
+    logo_path = os.path.join(workdir, "logo.png")
+    write_logo(logo_path)
+    rows = added_rows[:doc_calls]
+    records = [reg.read_record(r) for r in rows]
+    # Built from scratch every time (the old way)
+    timed(results, size, "create_page1_scratch",
+          lambda: [documents.render_work_file(record, out_dir, f"{n}_scratch") for n, record in enumerate(records)], len(rows))
+    timed(results, size, "create_page2_scratch",
+          lambda: [documents.render_test_form(record, out_dir, logo_path, f"{n}_scratch") for n, record in enumerate(records)], len(rows))
+    timed(results, size, "create_page3_scratch",
+          lambda: [documents.render_review_of_request(record, out_dir, logo_path, f"{n}_scratch") for n, record in enumerate(records)], len(rows))
+    # Filled into the cached skeletons, including building them the first time
+    templates.clear_cache()
+    timed(results, size, "create_page1", lambda: [reg.render_work_file(r, out_dir, str(r)) for r in rows], len(rows))
+    timed(results, size, "create_page2", lambda: [reg.render_test_form(r, out_dir, logo_path, str(r)) for r in rows], len(rows))
+    timed(results, size, "create_page3", lambda: [reg.render_review_of_request(r, out_dir, logo_path, str(r)) for r in rows], len(rows))
+    return results
+
+
+def _concurrent_writer(path, entries, flush_every, seed):
+    # One writer process: register rows one at a time like a clerk on BD, flushing every few rows
+    rng = random.Random(seed)
+    reg = open_register(path)
+    row_values = dict(zip(REGISTER_HEADERS, next(synthetic_rows(1, seed))))
+    references = []
+    for n in range(1, entries + 1):
+        references.append(reg.register_entry(row_values, rng.choice(WORKCLASSES)[1])[1])
+        if n % flush_every == 0:
+            reg.flush()
+    reg.flush()
+    return references, reg.reload_count, reg.lock.wait_seconds
+
+
+def bench_concurrent_writers(size, workdir, writers, entries, flush_every, seed=1):
+    # Several processes writing to the same excelbook at once. Checks nobody's rows got wiped and
+    # no reference number was handed out twice
+    results = []
+    path = os.path.join(workdir, f"Buku_Daftar_UAT_{size}_writers.xlsx")
+    generate_register(path, size, seed)
+    open_register(path)  # Build the index and running number cache once, like a normal first launch
+
+    with ProcessPoolExecutor(max_workers=writers) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(_concurrent_writer, path, entries, flush_every, seed + n) for n in range(writers)]
+        outcomes = [future.result() for future in futures]
+        seconds = time.perf_counter() - start
+
+    total = writers * entries
+    operation = f"concurrent_writers_{writers}"
+    results.append({"size": size, "unit": "rows", "operation": operation, "calls": total, "seconds": round(seconds, 6),
+                    "per_call_ms": round(seconds * 1000 / total, 4)})
+    references = [reference for refs, _, _ in outcomes for reference in refs]
+    reloads = sum(reloads for _, reloads, _ in outcomes)
+    lock_wait = sum(wait for _, _, wait in outcomes)
+    print(f"{size:>8} rows  {operation:<28} {seconds:9.3f} s  ({total / seconds:.1f} rows/sec, "
+          f"{reloads} reloads, {lock_wait:.1f} s waiting for the lock)")
+
+    # Everything must be in the excelbook, once
+    workbook = load_workbook(path, read_only=True)
+    column = REGISTER_HEADERS.index("INTERNAL REFERENCE NUMBER") + 1
+    on_disk = [value for (value,) in workbook.active.iter_rows(min_row=size + 2, min_col=column, max_col=column, values_only=True)]
+    workbook.close()
+    if len(set(references)) != total or sorted(on_disk) != sorted(references):
+        raise AssertionError(f"{operation}: {total} rows written, {len(on_disk)} on disk, {len(set(references))} unique references")
+    return results
+
+
+def bench_edits(size, workdir, edits, seed=1):
+    # KK updating test dates for one job after another: the excelbook written after every edit (the old Save) vs
+    # edits journaled and written once when the clerk goes idle (register.jobs.AutoSave)
+    results = []
+    path = os.path.join(workdir, f"Buku_Daftar_UAT_{size}_edits.xlsx")
+    generate_register(path, size, seed)
+    reg = open_register(path)
+    reg.sheet  # Full load once, both ways pay it the same
+    rng = random.Random(seed)
+    row_nums = [rng.randrange(2, size + 2) for _ in range(edits)]
+
+    def edit(n, row_num):
+        reg.update_test_dates(row_num, "01/03/25", "05/03/25", "07/03/25", "10/03/25", rng.choice(PERSONNEL), f"RM{n}")
+
+    def save_each():
+        for n, row_num in enumerate(row_nums):
+            edit(n, row_num)
+            reg.flush()
+
+    def autosave():
+        for n, row_num in enumerate(row_nums):
+            edit(n, row_num)
+        reg.flush()
+
+    timed(results, size, f"edits_save_each_{edits}", save_each, edits)
+    timed(results, size, f"edits_autosave_{edits}", autosave, edits)
+    saved = results[-2]["seconds"] - results[-1]["seconds"]
+    print(f"{size:>8} rows  {edits} edits: autosave saves {saved:.1f} s ({edits - 1} excelbook writes fewer)")
+    return results
+
+
+def bench_markings(items, workdir, calls=3, seed=1):
+    # One bulk supply job with items sample markings: work file and test form with their continuation pages,
+    # built from scratch and from the skeletons (the first call builds the skeleton, the others only fill it)
+    results = []
+    rng = random.Random(seed)
+    marking_items = [(f"{rng.choice(MARKING_NAMES)} lot {n}", rng.randint(1, 5)) for n in range(1, items + 1)]
+    record = dict(zip(REGISTER_HEADERS, next(synthetic_rows(1, seed))))
+    record.update({"SAMPLE MARKING": marking.format_items(marking_items), "QUANTITY": str(items),
+                   marking.ITEMS_HEADER: marking.dumps(marking_items), "TOT": "I, II, III, IV, V"})
+    out_dir = os.path.join(workdir, f"docs_markings_{items}")
+    os.makedirs(out_dir, exist_ok=True)
+    logo_path = os.path.join(workdir, "logo.png")
+    write_logo(logo_path)
+
+    timed(results, items, "markings_page1_scratch",
+          lambda: [documents.render_work_file(record, out_dir, f"{n}_scratch") for n in range(calls)], calls, "items")
+    timed(results, items, "markings_page2_scratch",
+          lambda: [documents.render_test_form(record, out_dir, logo_path, f"{n}_scratch") for n in range(calls)], calls,
+          "items")
+    templates.clear_cache()
+    timed(results, items, "markings_page1",
+          lambda: [templates.render_work_file(record, out_dir, str(n)) for n in range(calls)], calls, "items")
+    timed(results, items, "markings_page2",
+          lambda: [templates.render_test_form(record, out_dir, logo_path, str(n)) for n in range(calls)], calls, "items")
+    return results
+
+
+def write_results(results, out_prefix):
+    with open(out_prefix + ".json", "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    with open(out_prefix + ".csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["size", "unit", "operation", "calls", "seconds", "per_call_ms"])
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark register operations on synthetic Buku Daftar registers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="register sizes in rows")
+    parser.add_argument("--calls", type=int, default=200, help="calls per timed operation")
+    parser.add_argument("--doc-calls", type=int, default=5, help="documents rendered per page type")
+    parser.add_argument("--workdir", help="where to put the synthetic registers (default: a temp dir)")
+    parser.add_argument("--out", default="bench_results", help="output prefix for the .json and .csv results")
+    parser.add_argument("--writers", type=int, nargs="*", default=[], help="also run N concurrent writer processes")
+    parser.add_argument("--writer-entries", type=int, default=50, help="rows each concurrent writer registers")
+    parser.add_argument("--writer-flush-every", type=int, default=10, help="concurrent writers flush every N rows")
+    parser.add_argument("--edits", type=int, default=0, help="also time N KK edits, saved one by one vs autosaved")
+    parser.add_argument("--marking-items", type=int, nargs="*", default=[1000],
+                        help="also render a job with N sample markings (continuation pages), none to skip")
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="sdm_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    for size in args.sizes:
+        results.extend(bench_size(size, workdir, args.calls, args.doc_calls))
+        for writers in args.writers:
+            results.extend(bench_concurrent_writers(size, workdir, writers, args.writer_entries, args.writer_flush_every))
+        if args.edits:
+            results.extend(bench_edits(size, workdir, args.edits))
+    for items in args.marking_items:
+        results.extend(bench_markings(items, workdir))
+    write_results(results, args.out)
+    print(f"Results written to {args.out}.json and {args.out}.csv (registers in {workdir})")
+
+
+if __name__ == "__main__":
+    main()
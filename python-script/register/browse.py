@@ -0,0 +1,123 @@
+from collections import OrderedDict
+
+from register.dates import DATE_HEADERS, parse_date
+
+# Data side of BD's register tables (the rows just added, and Browse Register over everything). The table only
+# shows a screenful at a time, it asks a RowSet for those rows and the RowSet reads them from the register a page
+# at a time. Filtering (through the search index) and sorting happen here on row numbers, never on widgets:
+#
+#   rows = RowSet(reg)                        # whole register, or RowSet(reg, added_rows). Nothing read yet
+#   rows.set_filter("client 42")
+#   rows.set_sort("DATE RECEIVED", descending=True)
+#   rows.window(0, 20)                        # -> [(row_num, [values in rows.columns order]), ...]
+#
+# All of those read the register (the first read of a local one may be the full load of the excelbook), so a UI
+# calls show() on its worker thread instead: filter, sort and the screenful in one go.
+
+BROWSE_COLUMNS = ["INTERNAL REFERENCE NUMBER", "REPORT NUMBER", "DATE RECEIVED", "CLIENT", "WORK TITLE", "WORK CLASS"]
+
+PAGE_SIZE = 200
+CACHED_PAGES = 10
+
+
+def sort_key(header):
+    # Numbers as numbers, dates as dates, text without case. Mixed columns group by kind so they still compare
+    is_date = header in DATE_HEADERS
+
+    def key(value):
+        if is_date:
+            parsed = parse_date(value)
+            if parsed is not None:
+                return (0, parsed, "")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (1, value, "")
+        text = str(value).strip()
+        if text.isdigit():
+            return (1, int(text), "")
+        return (2, 0, text.casefold())
+
+    return key
+
+
+class RowSet:
+    def __init__(self, reg, row_nums=None, columns=None, sort_by=None, descending=False, page_size=PAGE_SIZE):
+        self.reg = reg
+        self.base_rows = None if row_nums is None else list(row_nums)  # None: every row of the register
+        self.columns = list(columns or BROWSE_COLUMNS)
+        self.page_size = page_size
+        self.sort_by = sort_by
+        self.descending = descending
+        self.query = ""
+        self.order = None  # Row numbers in display order, the only thing kept for every row. Worked out on first use
+        self._pages = OrderedDict()  # page number -> [(row_num, values), ...], least recently used first
+
+    def __len__(self):
+        return len(self._order())
+
+    def _order(self):
+        if self.order is None:
+            self.refresh()
+        return self.order
+
+    def refresh(self):
+        # Work the order out again, e.g after rows were added or edited
+        self._pages.clear()
+        if self.base_rows is None:
+            rows = list(range(2, self.reg.last_row() + 1))
+        else:
+            rows = list(self.base_rows)
+        if self.query:
+            matched = {row_num for row_num, _ in self.reg.search(self.query, limit=None)}
+            rows = [row_num for row_num in rows if row_num in matched]
+        if self.sort_by:
+            # Only the sort column is read for every row
+            values = dict(self.reg.column_values(self.sort_by, None if self.base_rows is None and not self.query else rows))
+            key = sort_key(self.sort_by)
+            # Empty cells always last, whichever way we sort
+            filled = [row_num for row_num in rows if values.get(row_num) not in (None, "")]
+            empty = [row_num for row_num in rows if values.get(row_num) in (None, "")]
+            filled.sort(key=lambda row_num: key(values[row_num]), reverse=self.descending)
+            rows = filled + empty
+        elif self.descending:
+            rows.reverse()
+        self.order = rows
+
+    def set_filter(self, query):
+        self.query = query.strip()
+        self.refresh()
+
+    def set_sort(self, header, descending=False):
+        self.sort_by = header
+        self.descending = descending
+        self.refresh()
+
+    def show(self, start, count, query="", sort_by=None, descending=False, refresh=False):
+        # One screenful for a table, everything it asked for in one call: the order is worked out again if the
+        # filter or sort changed (or refresh, rows were added), then rows start .. start + count - 1.
+        # Returns (start, total, rows), start moved back so the last screenful is full
+        query = query.strip()
+        if refresh or self.order is None or (query, sort_by, descending) != (self.query, self.sort_by, self.descending):
+            self.query, self.sort_by, self.descending = query, sort_by, descending
+            self.refresh()
+        start = max(0, min(start, len(self.order) - count))
+        return start, len(self.order), self.window(start, count)
+
+    def window(self, start, count):
+        # Rows start .. start + count - 1 of the display order
+        rows = []
+        for position in range(max(start, 0), min(start + count, len(self._order()))):
+            page_number, offset = divmod(position, self.page_size)
+            rows.append(self._page(page_number)[offset])
+        return rows
+
+    def _page(self, page_number):
+        page = self._pages.get(page_number)
+        if page is None:
+            row_nums = self.order[page_number * self.page_size:(page_number + 1) * self.page_size]
+            page = list(zip(row_nums, self.reg.read_rows(row_nums, self.columns)))
+            self._pages[page_number] = page
+            if len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_number)
+        return page
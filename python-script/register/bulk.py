@@ -0,0 +1,146 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime
+
+from register.core import open_register, prepare_entry
+
+# Bulk registration from an intake sheet (CSV or XLSX), for tenders that come in with dozens of lots at once.
+# Every row goes through prepare_entry(), the same rules as the BD form. If any row is bad nothing is registered,
+# otherwise all rows get their reference numbers in one pass, are appended, and the excelbook is saved once.
+#
+#   python -m register.bulk intake.csv --register Buku_Daftar_UAT.xlsx
+#
+# Intake columns (row 1 is the header, case does not matter):
+#   REPORT NUMBER, CLIENT, CONTACT PERSON, WORK TITLE, DATE RECEIVED, RECEIVED BY, QUANTITY, SAMPLE MARKING,
+#   WORK CLASS, SUB-WORKCLASS, MINDEF SUBGROUP, APPLICANT BY, TOT
+# SAMPLE MARKING is written the same way as in the form {eg: Baju No. 3, Seluar Hitam;2}, TOT as "I, IV" or empty.
+
+# Intake header -> prepare_entry keyword
+INTAKE_COLUMNS = {
+    "REPORT NUMBER": "report_number",
+    "CLIENT": "client",
+    "CONTACT PERSON": "contact_person",
+    "WORK TITLE": "work_title",
+    "DATE RECEIVED": "date_received",
+    "RECEIVED BY": "received_by",
+    "QUANTITY": "quantity",
+    "SAMPLE MARKING": "sample_marking",
+    "WORK CLASS": "workclass",
+    "SUB-WORKCLASS": "subgroup",
+    "MINDEF SUBGROUP": "additional",
+    "APPLICANT BY": "applicant_by",
+    "TOT": "tests",
+}
+
+
+class IntakeError(ValueError):
+    # errors is a list of (line number in the intake sheet, message)
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("\n".join(f"Line {line}: {message}" for line, message in errors))
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%d/%m/%y")  # Same as what the form asks for
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_intake(path):
+    # Yields (line number, {header: text}). Blank rows are skipped
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        from register.lazybook import load_workbook  # openpyxl only when an excelbook is imported
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [_cell_text(header).upper() for header in next(rows, ())]
+            for line, row in enumerate(rows, start=2):
+                values = {header: _cell_text(value) for header, value in zip(headers, row) if header}
+                if any(values.values()):
+                    yield line, values
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:  # utf-8-sig, Excel likes to put a BOM in
+            reader = csv.reader(f)
+            headers = [header.strip().upper() for header in next(reader, [])]
+            for line, row in enumerate(reader, start=2):
+                values = {header: value.strip() for header, value in zip(headers, row) if header}
+                if any(values.values()):
+                    yield line, values
+
+
+def parse_tests(text):
+    # "I, IV" -> ["I", "IV"]. "None" is what BD writes when no test is ticked
+    if text.strip().lower() in ("", "none"):
+        return []
+    return [code.strip().upper() for code in text.replace(";", ",").split(",") if code.strip()]
+
+
+def prepare_intake(rows):
+    # Validate everything before touching the register. Returns [(line, prepare_entry result), ...]
+    prepared = []
+    errors = []
+    for line, values in rows:
+        kwargs = {keyword: values.get(header, "") for header, keyword in INTAKE_COLUMNS.items()}
+        kwargs["tests"] = parse_tests(kwargs["tests"])
+        try:
+            prepared.append((line, prepare_entry(**kwargs)))
+        except ValueError as e:
+            errors.append((line, str(e)))
+    if errors:
+        raise IntakeError(errors)
+    return prepared
+
+
+def import_intake(reg, intake_path, flush=True):
+    # Returns [(line, row number, reference), ...]. Raises IntakeError (nothing registered) on bad rows
+    prepared = prepare_intake(read_intake(intake_path))
+    registered = reg.register_entries([entry for _, entry in prepared])
+    if flush:
+        reg.flush()
+    return [(line, row_num, reference) for (line, _), (row_num, reference) in zip(prepared, registered)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Register every row of an intake sheet into Buku Daftar in one go.")
+    parser.add_argument("intake", help="CSV or XLSX intake sheet")
+    parser.add_argument("--register", default="Buku_Daftar_UAT.xlsx", help="Buku Daftar excelbook")
+    parser.add_argument("--check", action="store_true", help="Only validate the intake sheet, register nothing")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        try:
+            prepared = prepare_intake(read_intake(args.intake))
+        except IntakeError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(f"{len(prepared)} rows OK")
+        return 0
+
+    reg = open_register(args.register)
+    start = time.perf_counter()
+    try:
+        imported = import_intake(reg, args.intake)
+    except IntakeError as e:
+        print(e, file=sys.stderr)
+        print("Nothing registered.", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    for line, row_num, reference in imported:
+        print(f"Line {line} -> row {row_num} {reference}")
+    rate = len(imported) / elapsed if elapsed else 0.0
+    print(f"{len(imported)} rows registered in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
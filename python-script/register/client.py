@@ -0,0 +1,139 @@
+import os
+import socket
+import threading
+
+from register import protocol
+from register.core import open_register
+from register.writelock import RegisterLockedError
+
+# Client side of register.service. RemoteRegister has the same methods as Register, so BD and KK don't care
+# which one they got:
+#
+#   reg = connect_register("Buku_Daftar_UAT.xlsx")   # the service if it runs for this excelbook, else local
+#
+# Errors come back as the same exception type where it matters (ValueError for bad input, RegisterLockedError,
+# PermissionError for a wrong token or a document folder the service doesn't write into).
+
+CONNECT_TIMEOUT_SECONDS = 0.5
+
+
+class RegisterServiceError(RuntimeError):
+    pass
+
+
+class RemoteRegister:
+    def __init__(self, port=None, timeout=None):
+        port = port or protocol.service_port()
+        self._token = protocol.read_token(port)  # Left by the service for this user, see register.service
+        self._socket = socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT_SECONDS)
+        self._file = self._socket.makefile("rwb")
+        self._lock = threading.Lock()
+        self._next_id = 0
+        try:
+            info = self.call("info")
+        except Exception:
+            self.close()
+            raise
+        self._socket.settimeout(timeout)  # Renders and flushes can take a while, no timeout by default
+        self.path = info["path"]
+        self.headers = info["headers"]
+        self.column_indexes = info["column_indexes"]
+
+    def call(self, method, **params):
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "token": self._token, "method": method, "params": params}
+            self._file.write((protocol.dumps(request) + "\n").encode("utf-8"))
+            self._file.flush()
+            line = self._file.readline()
+        if not line:
+            raise RegisterServiceError("Register service closed the connection")
+        response = protocol.loads(line.decode("utf-8"))
+        if not response.get("ok"):
+            if response.get("type") == "ValueError":
+                raise ValueError(response.get("error"))
+            if response.get("type") == "RegisterLockedError":
+                raise RegisterLockedError(response.get("error"))
+            if response.get("type") == "PermissionError":
+                raise PermissionError(response.get("error"))
+            raise RegisterServiceError(response.get("error"))
+        return response.get("result")
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def allocate_reference(self, workclass, suffix=None, year=None):
+        return self.call("allocate_reference", workclass=workclass, suffix=suffix, year=year)
+
+    def reference_years(self):
+        return self.call("reference_years")
+
+    def append_entry(self, row_values):
+        return self.call("append_entry", row_values=row_values)
+
+    def register_entry(self, row_values, workclass, suffix=None):
+        return tuple(self.call("register_entry", row_values=row_values, workclass=workclass, suffix=suffix))
+
+    def register_entries(self, prepared):
+        return [tuple(result) for result in self.call("register_entries", prepared=[list(entry) for entry in prepared])]
+
+    def find_by_reference(self, reference_number):
+        return self.call("find_by_reference", reference_number=reference_number)
+
+    def search(self, query, limit=50):
+        return [tuple(result) for result in self.call("search", query=query, limit=limit)]
+
+    def read_record(self, row_num):
+        return self.call("read_record", row_num=row_num)
+
+    def last_row(self):
+        return self.call("last_row")
+
+    def read_rows(self, row_nums, headers):
+        return self.call("read_rows", row_nums=list(row_nums), headers=list(headers))
+
+    def column_values(self, header, row_nums=None):
+        return self.call("column_values", header=header, row_nums=None if row_nums is None else list(row_nums))
+
+    def update_records(self, updates):
+        return self.call("update_records", updates=[list(update) for update in updates])
+
+    def rows_between(self, header, first, last):
+        return self.call("rows_between", header=header, first=first, last=last)
+
+    def update_record(self, row_num, values):
+        return self.call("update_record", row_num=row_num, values=values)
+
+    def update_test_dates(self, row_num, start_test_date, end_test_date, approved_date, release_date,
+                          lab_personnel, revenue_remarks):
+        return self.call("update_test_dates", row_num=row_num, start_test_date=start_test_date,
+                         end_test_date=end_test_date, approved_date=approved_date, release_date=release_date,
+                         lab_personnel=lab_personnel, revenue_remarks=revenue_remarks)
+
+    def has_pending(self):
+        return self.call("has_pending")
+
+    def flush(self):
+        return self.call("flush")
+
+    def render_work_file(self, row_num, out_dir, name=None):
+        return self.call("render_work_file", row_num=row_num, out_dir=out_dir, name=name)
+
+    def render_test_form(self, row_num, out_dir, logo_path, name=None):
+        return self.call("render_test_form", row_num=row_num, out_dir=out_dir, logo_path=logo_path, name=name)
+
+    def render_review_of_request(self, row_num, out_dir, logo_path, name=None):
+        return self.call("render_review_of_request", row_num=row_num, out_dir=out_dir, logo_path=logo_path, name=name)
+
+
+def connect_register(path, port=None):
+    # The running service if it serves this excelbook, otherwise open it here like before
+    try:
+        remote = RemoteRegister(port)
+    except OSError:  # Not running, or another user's service (PermissionError, we don't have its token)
+        return open_register(path)
+    if os.path.normcase(remote.path) != os.path.normcase(os.path.abspath(path)):
+        remote.close()  # Someone else's excelbook
+        return open_register(path)
+    return remote
@@ -0,0 +1,94 @@
+import argparse
+import os
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from register import dates, formats, journal, sqlstore, writelock
+
+# One-off migration for rows written before the date columns were typed (see register.dates): date text like
+# "14/3/25" becomes a real date shown as dd/mm/yy. Text that is not a date ("NA", "KIV") is left as it is and listed,
+# so somebody can fix it by hand. Safe to run again, rows already converted are skipped.
+#
+#   python -m register.convert_dates Buku_Daftar_UAT.xlsx [--dry-run]
+#
+# If Buku Daftar is in SQLite (register.sqlstore) the database is converted and the excelbook follows on the
+# next export.
+
+EXAMPLES_SHOWN = 20
+
+
+def convert_sheet(sheet, column_indexes):
+    # Returns (cells converted, [(row, header, text) left as text])
+    converted = 0
+    left = []
+    for header in dates.DATE_HEADERS:
+        if header not in column_indexes:
+            continue
+        col_index = column_indexes[header]
+        number_format = formats.COLUMN_FORMATS.get(header)
+        cells = sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=col_index, max_col=col_index)
+        for row_num, (cell,) in enumerate(cells, start=2):
+            value = cell.value
+            if value is None or isinstance(value, datetime):
+                continue
+            parsed = dates.parse_date(value)
+            if parsed is None:
+                if not dates.is_no_date(value):
+                    left.append((row_num, header, value))
+                continue
+            cell.value = parsed
+            if number_format:
+                cell.number_format = number_format
+            converted += 1
+    return converted, left
+
+
+def convert_workbook(workbook_path, dry_run=False):
+    with writelock.WriteLock(workbook_path):  # BD/KK may be open, they reload after we are done
+        workbook = load_workbook(workbook_path)
+        sheet = workbook.active
+        column_indexes = {cell.value: cell.column for cell in sheet[1] if cell.value}
+
+        # Pending journal rows go in first so they get converted too
+        if not dry_run:
+            journal.recover(workbook, workbook_path, sheet, column_indexes)
+
+        converted, left = convert_sheet(sheet, column_indexes)
+        if converted and not dry_run:
+            tmp_path = workbook_path + ".tmp"  # Same swap as Register.flush
+            workbook.save(tmp_path)
+            os.replace(tmp_path, workbook_path)
+    return converted, left
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn date text in Buku Daftar into real dates (one-off migration).")
+    parser.add_argument("workbook", help="path to Buku_Daftar_UAT.xlsx")
+    parser.add_argument("--dry-run", action="store_true", help="only count, save nothing")
+    args = parser.parse_args()
+
+    workbook_path = os.path.abspath(args.workbook)
+    db_path = sqlstore.db_path_for(workbook_path)
+    if os.path.exists(db_path):
+        reg = sqlstore.SqliteRegister(db_path, workbook_path)
+        try:
+            converted, left = reg.convert_dates(dry_run=args.dry_run)
+        finally:
+            reg.close()
+        target = db_path
+    else:
+        converted, left = convert_workbook(workbook_path, dry_run=args.dry_run)
+        target = workbook_path
+
+    print(f"{converted} date(s) {'to convert' if args.dry_run else 'converted'} in {target}")
+    if left:
+        print(f"{len(left)} cell(s) are not dates and stay as text:")
+        for row_num, header, value in left[:EXAMPLES_SHOWN]:
+            print(f"  row {row_num}, {header}: {value!r}")
+        if len(left) > EXAMPLES_SHOWN:
+            print(f"  ... and {len(left) - EXAMPLES_SHOWN} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import os
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.worksheet.table import TableColumn
+
+from register import journal, marking, sqlstore, writelock
+
+# One-off migration for the SAMPLE MARKING ITEMS column (see register.marking): adds the column to the excelbook,
+# next to the last one and inside its table, and fills it in from SAMPLE MARKING for the rows already there.
+# Safe to run again, rows that have their items are skipped. A SAMPLE MARKING whose items don't fit one cell is
+# left without them and listed.
+#
+#   python -m register.convert_markings Buku_Daftar_UAT.xlsx [--dry-run]
+#
+# If Buku Daftar is in SQLite (register.sqlstore) the database already has the column and the excelbook gets it
+# on the next export, only the rows are filled in.
+
+
+def add_items_column(sheet, column_indexes):
+    # Column number of SAMPLE MARKING ITEMS, added after the last header if it isn't there
+    if marking.ITEMS_HEADER in column_indexes:
+        return column_indexes[marking.ITEMS_HEADER]
+    col = max(column_indexes.values()) + 1
+    sheet.cell(row=1, column=col, value=marking.ITEMS_HEADER)
+    for table in sheet.tables.values():  # Only one table in Buku Daftar
+        min_col, min_row, max_col, max_row = range_boundaries(table.ref)
+        if max_col < col:
+            table.ref = f"{get_column_letter(min_col)}{min_row}:{get_column_letter(col)}{max_row}"
+            table.tableColumns.append(TableColumn(id=len(table.tableColumns) + 1, name=marking.ITEMS_HEADER))
+        break
+    column_indexes[marking.ITEMS_HEADER] = col
+    return col
+
+
+def items_for(sample_marking, row_num, left):
+    # The items cell for a SAMPLE MARKING, or None (listed in left) when they don't fit one cell
+    try:
+        return marking.dumps(marking.parse_text(sample_marking))
+    except ValueError as e:
+        left.append((row_num, str(e)))
+        return None
+
+
+def fill_sheet(sheet, column_indexes):
+    # Items for every row that has a SAMPLE MARKING and no items yet.
+    # Returns (rows filled in, [(row, why)] left without items)
+    marking_col = column_indexes.get("SAMPLE MARKING")
+    left = []
+    if not marking_col:
+        return 0, left
+    items_col = column_indexes[marking.ITEMS_HEADER]
+    filled = 0
+    for row in sheet.iter_rows(min_row=2, max_row=sheet.max_row):
+        sample_marking = row[marking_col - 1].value
+        items_cell = sheet.cell(row=row[0].row, column=items_col)
+        if sample_marking in (None, "") or items_cell.value not in (None, ""):
+            continue
+        items = items_for(sample_marking, row[0].row, left)
+        if items is not None:
+            items_cell.value = items
+            filled += 1
+    return filled, left
+
+
+def convert_workbook(workbook_path, dry_run=False):
+    with writelock.WriteLock(workbook_path):  # BD/KK may be open, they reload after we are done
+        workbook = load_workbook(workbook_path)
+        sheet = workbook.active
+        column_indexes = {cell.value: cell.column for cell in sheet[1] if cell.value}
+
+        # Pending journal rows go in first so they get their items too
+        if not dry_run:
+            journal.recover(workbook, workbook_path, sheet, column_indexes)
+
+        added = marking.ITEMS_HEADER not in column_indexes
+        add_items_column(sheet, column_indexes)
+        filled, left = fill_sheet(sheet, column_indexes)
+        if (added or filled) and not dry_run:  # Already converted: the excelbook is not written again
+            tmp_path = workbook_path + ".tmp"  # Same swap as Register.flush
+            workbook.save(tmp_path)
+            os.replace(tmp_path, workbook_path)
+    return filled, left
+
+
+def convert_database(reg, dry_run=False):
+    # Rows of a SqliteRegister without items, filled in one transaction. Returns the same as fill_sheet
+    markings = reg.column_values("SAMPLE MARKING")
+    items = dict(reg.column_values(marking.ITEMS_HEADER))
+    left = []
+    updates = []
+    for row_num, sample_marking in markings:
+        if sample_marking in (None, "") or items.get(row_num) not in (None, ""):
+            continue
+        row_items = items_for(sample_marking, row_num, left)
+        if row_items is not None:
+            updates.append((row_num, {"SAMPLE MARKING": sample_marking, marking.ITEMS_HEADER: row_items}))
+    if updates and not dry_run:
+        reg.update_records(updates)
+    return len(updates), left
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add SAMPLE MARKING ITEMS to Buku Daftar (one-off migration).")
+    parser.add_argument("workbook", help="path to Buku_Daftar_UAT.xlsx")
+    parser.add_argument("--dry-run", action="store_true", help="only count, save nothing")
+    args = parser.parse_args()
+
+    workbook_path = os.path.abspath(args.workbook)
+    db_path = sqlstore.db_path_for(workbook_path)
+    if os.path.exists(db_path):
+        reg = sqlstore.SqliteRegister(db_path, workbook_path)
+        try:
+            filled, left = convert_database(reg, dry_run=args.dry_run)
+        finally:
+            reg.close()
+        target = db_path
+    else:
+        filled, left = convert_workbook(workbook_path, dry_run=args.dry_run)
+        target = workbook_path
+    print(f"{filled} row(s) {'to fill in' if args.dry_run else 'filled in'} in {target}")
+    if left:
+        print(f"{len(left)} row(s) left without {marking.ITEMS_HEADER}, their SAMPLE MARKING stays as text:")
+        for row_num, reason in left:
+            print(f"  row {row_num}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
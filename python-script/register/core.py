@@ -0,0 +1,531 @@
+import os
+from datetime import datetime
+
+from register import counter, dates, formats, journal, lazybook, marking, profiling, refindex, schema, search, templates, writelock
+
+# Headless register API. Everything BD and KK do to Buku_Daftar_UAT.xlsx goes through here, so scripts and
+# bulk jobs can drive the register without a display or a Tk event loop:
+#
+#   reg = open_register("Buku_Daftar_UAT.xlsx")
+#   row_values, workclass, suffix = prepare_entry(report_number="...", client="...", ...)
+#   row_num, reference = reg.register_entry(row_values, workclass, suffix)
+#   reg.flush()
+#
+# Errors are raised (ValueError for bad input), never shown. Showing them is the UI's job.
+
+# Every column BD and KK care about
+REGISTER_HEADERS = [
+    "REPORT NUMBER", "INTERNAL REFERENCE NUMBER", "DATE RECEIVED", "RECEIVED BY", "CONTACT PERSON", "APPLICANT BY",
+    "CLIENT", "WORK TITLE", "QUANTITY", "SAMPLE MARKING", "WORK CLASS", "TOT", "NO. OF TEST",
+    "START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE", "LABORATORY PERSONNEL", "REVENUE/REMARKS",
+    marking.ITEMS_HEADER,
+]
+# Columns older excelbooks don't have yet. Nothing is lost without them, so no warning (register.convert_markings)
+OPTIONAL_HEADERS = [marking.ITEMS_HEADER]
+
+# Open workclass codes dictionary 'W01'
+WORKCLASS_CODES = {
+    "MINDEF": "9230",
+    "Berbayar": "9240",
+    "Agensi Kerajaan": "9250",
+    "STRIDE": "9260",
+}
+
+# Additional suffixes for Work Class MINDEF 'W02'
+WORKCLASS_MINDEF_SUFFIXES = ["D", "L", "U", "MAB"]
+
+# Type of testing codes, in the order they are saved in TOT
+TEST_CODES = {
+    "I": "Qualitative Analysis (Microscopic)",
+    "II": "Qualitative Analysis (Burning)",
+    "III": "Qualitative Analysis (Solubility)",
+    "IV": "Quantitative Analysis",
+    "V": "FTIR",
+}
+
+# Columns KK updates after the test is done
+TEST_DATE_HEADERS = ["START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE",
+                     "LABORATORY PERSONNEL", "REVENUE/REMARKS"]
+
+
+def process_marking(marking_input):
+    # "Baju No. 3, Seluar Hitam;2" -> "01. baju no. 3 x 1; 02. seluar hitam x 2"
+    # Items are separated with ',' and the quantity (if any) with ';'. See register.marking
+    return marking.format_cell(marking.parse_input(marking_input))
+
+
+def prepare_entry(report_number, client, contact_person, work_title, date_received, received_by, quantity,
+                  sample_marking, workclass, subgroup="", additional="", applicant_by="", tests=()):
+    # Same rules as the BD form. Returns (row_values, workclass, MINDEF suffix) ready for Register.register_entry
+    fields = {
+        "Report Number": report_number,
+        "Contact Person": contact_person,
+        "Received by": received_by,
+        "Work Title": work_title,
+        "Date Received": date_received,
+        "Client": client,
+        "Kuantiti": quantity,
+        "Sample Marking": sample_marking,
+        "Work Class": workclass,
+    }
+    for field_name, field_value in fields.items():
+        if not str(field_value).strip():
+            raise ValueError(f"{field_name} cannot be empty.")
+
+    # Validate Additional Selection Mindef and Berbayar
+    if workclass in ["MINDEF", "Berbayar"] and not subgroup:
+        raise ValueError("You must select additional information for Work Class MINDEF or Berbayar.")
+    if workclass == "MINDEF" and not additional:
+        raise ValueError("You must select an additional option (D,U,L,MAB or Others) for Work Class MINDEF.")
+    if workclass not in WORKCLASS_CODES:
+        raise ValueError(f"Invalid Work Class: {workclass}")
+    for code in tests:
+        if code not in TEST_CODES:
+            raise ValueError(f"Invalid Type of Testing: {code}")
+    # Saved as a real date, so it sorts and filters as one
+    received = dates.parse_date(date_received)
+    if received is None:
+        raise ValueError(f"Date Received must be a date (dd/mm/yy): {date_received}")
+
+    suffix = additional if workclass == "MINDEF" and additional in WORKCLASS_MINDEF_SUFFIXES else None
+    selected_tests = [code for code in TEST_CODES if code in tests]
+    # Parsed once here, the documents read the items instead of slicing the string
+    items = marking.parse_input(sample_marking)
+
+    row_values = {
+        "DATE RECEIVED": received,
+        "CLIENT": client,
+        "TOT": ", ".join(selected_tests) if selected_tests else "None",
+        "NO. OF TEST": len(selected_tests),
+        "WORK TITLE": work_title,
+        "QUANTITY": quantity,
+        "SAMPLE MARKING": marking.format_cell(items),
+        marking.ITEMS_HEADER: marking.dumps(items),
+        "REPORT NUMBER": report_number,
+        "CONTACT PERSON": contact_person,
+        "RECEIVED BY": received_by,
+        "APPLICANT BY": str(applicant_by).strip() or "NA",
+        "WORK CLASS": f"{workclass} ({subgroup})" if subgroup else workclass,
+    }
+    return row_values, workclass, suffix
+
+
+def normalize_row(values):
+    # What every write does to a row first: typed dates (register.dates) and the marking items (register.marking)
+    return marking.normalize_row(dates.normalize_row(values))
+
+
+@profiling.profiled("generate_reference_number")
+def next_reference(counters, workclass, suffix=None, year=None):
+    # Next INTERNAL REFERENCE NUMBER from the running number cache, e.g PA/UAT/9230/25/42 (D). Peek only
+    code = WORKCLASS_CODES.get(workclass)
+    if not code:
+        raise ValueError(f"Invalid Work Class: {workclass}")
+    year_suffix = (year or datetime.now().year) % 100
+    running_number = counter.next_running_number(counters, code, year_suffix)
+    reference = f"PA/UAT/{code}/{year_suffix:02d}/{running_number:02d}"
+    if suffix:  # For MINDEF, there's additonal suffix
+        reference += f" ({suffix})"
+    return reference
+
+
+class Register:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        # Other programs may write to the same excelbook (BD and KK together, two clerks on a shared drive).
+        # Everything that touch the journal or the excelbook holds this lock, see _sync
+        self.lock = writelock.WriteLock(self.path)
+        self.reload_count = 0  # How often someone else's save made us reload, the bench reads this
+        with self.lock:
+            self._load()
+
+    def _load(self):
+        # Startup only streams the excelbook read-only: headers, reference index and running number cache.
+        # The full writable load happens on first save
+        self._disk_stamp = refindex.workbook_stamp(self.path)
+        mark = journal.read_saved_mark(self.path)
+        self._generation = mark["generation"] if mark else 0
+        self.book = lazybook.LazyWorkbook(self.path)
+        self._next_row = None  # Tracked by us after the full load. sheet.max_row scans every cell
+
+        # Opened only if the header cache, the index or the running number cache is stale
+        startup_sheet = lazybook.ReadOnlySheet(self.path)
+        try:
+            self.headers, self.column_indexes = schema.load_schema(
+                self.path, self._disk_stamp, lambda: lazybook.read_header_row(startup_sheet), REGISTER_HEADERS,
+                OPTIONAL_HEADERS)
+
+            # Reference index and running number cache. Both share one pass over the column if they are stale
+            self.reference_index = {}
+            self.running_counters = {}
+            if "INTERNAL REFERENCE NUMBER" in self.column_indexes:
+                reference_column = lazybook.column_reader(startup_sheet, self.column_indexes["INTERNAL REFERENCE NUMBER"])
+                self.reference_index = refindex.load_index(self.path, reference_column)
+                self.running_counters = counter.load_counters(self.path, reference_column)
+        finally:
+            startup_sheet.close()
+
+        self._search = None  # Search index, loaded or built on the first search
+        self._date_indexes = {}  # header -> dates.DateIndex, built on the first rows_between
+
+        # Rows journaled but not in the excelbook yet: ours from before a crash, or another program's pending rows
+        self.moved_rows = {}  # {journaled row: row it really went to} when the excelbook was edited under us
+        self._journal_offset = 0
+        self._catch_up()
+
+    def _sync(self):
+        # Call with the lock held. Bring our copy up to date with what the other programs did since we last looked
+        stamp = refindex.workbook_stamp(self.path)
+        if stamp != self._disk_stamp:
+            mark = journal.read_saved_mark(self.path)
+            if (mark and mark.get("stamp") == stamp and mark.get("generation") == self._generation + 1
+                    and mark.get("journal_offset") == self._journal_offset):
+                # Another program saved exactly what we have in memory (their rows and ours). Nothing to reload
+                self._generation += 1
+                self._journal_offset = 0
+                self._disk_stamp = stamp
+            else:
+                # Changed behind our back (Excel, or a save with rows we never saw). Take the fresh copy and
+                # re-apply the pending journal on top of it, instead of overwriting it on our next save
+                self.reload_count += 1
+                self._load()
+                return
+        elif journal.size(self.path) < self._journal_offset:
+            # Journal cleared without a save we know of (recovered by the formats tool etc2)
+            self.reload_count += 1
+            self._load()
+            return
+        self._catch_up()
+
+    def _catch_up(self):
+        # Apply journal entries other programs wrote since we last read it
+        entries, self._journal_offset = journal.read_from(self.path, self._journal_offset)
+        if not entries:
+            return
+        for entry in entries:
+            row_num = entry["row"]
+            if entry.get("op") == "append":
+                row_num = self._append_target(row_num, entry["values"])
+            else:
+                row_num = self.moved_rows.get(row_num, row_num)
+            self._apply_row(row_num, entry["values"])
+        journal.extend_table(self.sheet, self.next_row - 1, len(self.headers))
+
+    def _append_target(self, row_num, values):
+        # A journaled new row normally lands on its own row (free, or already there after a crash). If the
+        # excelbook was edited outside our programs that row may hold something else now, or rows were deleted
+        # above it. Then it goes to the end instead of overwriting somebody's row
+        reference_col = self.column_indexes.get("INTERNAL REFERENCE NUMBER")
+        if reference_col is None:
+            return row_num
+        if row_num <= self.next_row:
+            current = self.sheet.cell(row=row_num, column=reference_col).value
+            if current == values.get("INTERNAL REFERENCE NUMBER"):
+                return row_num
+            row_empty = all(self.sheet.cell(row=row_num, column=col).value in (None, "")
+                            for col in range(1, len(self.headers) + 1))
+            if row_empty:
+                return row_num
+        new_row = self.next_row
+        self.moved_rows[row_num] = new_row
+        return new_row
+
+    @property
+    def sheet(self):
+        # First access pays for the full writable load
+        return self.book.sheet
+
+    @property
+    def next_row(self):
+        if self._next_row is None:
+            self._next_row = self.sheet.max_row + 1
+        return self._next_row
+
+    def refresh(self):
+        # Pick up rows and edits other programs made since we last looked
+        with self.lock:
+            self._sync()
+
+    def allocate_reference(self, workclass, suffix=None, year=None):
+        # Peek the next INTERNAL REFERENCE NUMBER. Only committed by register_entry/append_entry
+        with self.lock:
+            self._sync()
+            return next_reference(self.running_counters, workclass, suffix, year)
+
+    def reference_years(self):
+        # Years KK can look references up in, from the running number cache so no column scan
+        with self.lock:
+            self._sync()
+            return counter.counter_years(self.running_counters)
+
+    def append_entry(self, row_values):
+        # Append one row: journal first, then the sheet in memory. The excelbook itself is written on flush
+        return self.append_entries([row_values])[0]
+
+    def append_entries(self, rows):
+        # Append many rows with one journal write. Returns their row numbers
+        with self.lock:
+            self._sync()
+            first_row = self.next_row
+            entries = [(first_row + n, normalize_row(row_values)) for n, row_values in enumerate(rows)]
+            if not entries:
+                return []
+            self._journal_offset = journal.append_rows(self.path, entries, op="append")
+            for row_num, row_values in entries:
+                self._apply_row(row_num, row_values)
+            journal.extend_table(self.sheet, entries[-1][0], len(self.headers))
+            return [row_num for row_num, _ in entries]
+
+    def register_entry(self, row_values, workclass, suffix=None):
+        # Allocate the reference and append in one go. Returns (row number, reference)
+        return self.register_entries([(row_values, workclass, suffix)])[0]
+
+    @profiling.profiled("save_data")
+    def register_entries(self, prepared):
+        # prepared is a list of prepare_entry() results. References are allocated in one pass on a copy of the
+        # counters, so nothing is bumped if the append fails. The lock is held from allocating to journaling,
+        # so no other program can hand out the same number in between. Returns [(row number, reference), ...]
+        with self.lock:
+            self._sync()
+            pending_counters = dict(self.running_counters)
+            rows = []
+            references = []
+            for row_values, workclass, suffix in prepared:
+                reference = next_reference(pending_counters, workclass, suffix)
+                counter.record_reference(pending_counters, reference)
+                rows.append(dict(row_values, **{"INTERNAL REFERENCE NUMBER": reference}))
+                references.append(reference)
+            return list(zip(self.append_entries(rows), references))
+
+    def find_by_reference(self, reference_number):
+        # Row number or None. The "-(n)" suffix is ignored
+        with self.lock:
+            self._sync()
+            return refindex.lookup(self.reference_index, reference_number)
+
+    def search(self, query, limit=50):
+        # Rows matching every word of query in the searched columns, best first: [(row number, score), ...]
+        with self.lock:
+            self._sync()
+            return self.search_index.search(query, limit)
+
+    @property
+    def search_index(self):
+        if self._search is None:
+            self._search = self._load_search_index()
+        return self._search
+
+    def _load_search_index(self):
+        # Saved index if it belongs to this excelbook, otherwise one pass over the searched columns
+        search_path = search.search_path_for(self.path)
+        index = search.load_index(search_path)
+        if index is not None and index.stamp == self._disk_stamp:
+            pending = journal.read_entries(self.path)
+        else:
+            if self.book.loaded:
+                sheet = self.sheet
+                records = self._search_records(sheet.iter_rows(min_row=2, max_row=self.next_row - 1, values_only=True))
+                return search.build_index(records)  # Already has the journal in it. Saved on the next flush
+            workbook = self.book.open_read_only()
+            try:
+                index = search.build_index(self._search_records(workbook.active.iter_rows(min_row=2, values_only=True)))
+            finally:
+                workbook.close()
+            pending = journal.read_entries(self.path)
+            if not pending:
+                search.save_index(search_path, index, self._disk_stamp)
+        # Journaled rows are only in the sheet in memory
+        for row_num in dict.fromkeys(self.moved_rows.get(entry["row"], entry["row"]) for entry in pending):
+            index.add(row_num, self._search_record(row_num))
+        return index
+
+    def _search_records(self, rows):
+        columns = [(header, self.headers.index(header)) for header in search.SEARCH_FIELDS if header in self.headers]
+        for row_num, row in enumerate(rows, start=2):
+            yield row_num, {header: row[col] for header, col in columns if col < len(row)}
+
+    def _search_record(self, row_num):
+        return {header: self.sheet.cell(row=row_num, column=self.column_indexes[header]).value
+                for header in search.SEARCH_FIELDS if header in self.column_indexes}
+
+    def read_record(self, row_num):
+        with self.lock:
+            self._sync()
+            sheet = self.sheet
+            return {header: sheet.cell(row=row_num, column=col).value for col, header in enumerate(self.headers, start=1) if header}
+
+    def last_row(self):
+        # Last row number in use
+        with self.lock:
+            self._sync()
+            return self.next_row - 1
+
+    def read_rows(self, row_nums, headers):
+        # A few columns of many rows, e.g one page of a table: [[value, ...], ...] in row_nums order
+        with self.lock:
+            self._sync()
+            sheet = self.sheet
+            columns = [self.column_indexes.get(header) for header in headers]
+            return [[sheet.cell(row=row_num, column=col).value if col else None for col in columns] for row_num in row_nums]
+
+    def column_values(self, header, row_nums=None):
+        # One column as [[row_num, value], ...], every row if row_nums is None. What a table sorts on
+        with self.lock:
+            self._sync()
+            col = self.column_indexes.get(header)
+            if row_nums is None:
+                if not col:
+                    return [[row_num, None] for row_num in range(2, self.next_row)]
+                rows = self.sheet.iter_rows(min_row=2, max_row=self.next_row - 1, min_col=col, max_col=col, values_only=True)
+                return [[row_num, value] for row_num, (value,) in enumerate(rows, start=2)]
+            sheet = self.sheet
+            return [[row_num, sheet.cell(row=row_num, column=col).value if col else None] for row_num in row_nums]
+
+    def rows_between(self, header, first, last):
+        # Rows whose date column (DATE RECEIVED etc2) is first .. last, both inclusive, in date order.
+        # e.g jobs received this month. The column is parsed once, after that it's a lookup
+        with self.lock:
+            self._sync()
+            return self.date_index(header).rows_between(first, last)
+
+    def date_index(self, header):
+        index = self._date_indexes.get(header)
+        if index is None:
+            index = self._date_indexes[header] = self._load_date_index(header)
+        return index
+
+    def _load_date_index(self, header):
+        # Like the search index: the sheet in memory if it is loaded, otherwise one read-only pass plus the journal
+        col = self.column_indexes.get(header)
+        if not col:
+            return dates.DateIndex()
+        dates_path = dates.dates_path_for(self.path)
+        index = dates.load_indexes(dates_path, self._disk_stamp).get(header)
+        if index is not None:
+            self._set_journaled_dates(index, header)
+            return index
+        if self.book.loaded:
+            rows = self.sheet.iter_rows(min_row=2, max_row=self.next_row - 1, min_col=col, max_col=col, values_only=True)
+            return dates.DateIndex((row_num, value) for row_num, (value,) in enumerate(rows, start=2))
+        workbook = self.book.open_read_only()
+        try:
+            rows = workbook.active.iter_rows(min_row=2, min_col=col, max_col=col, values_only=True)
+            index = dates.DateIndex((row_num, value) for row_num, (value,) in enumerate(rows, start=2))
+        finally:
+            workbook.close()
+        if not self._set_journaled_dates(index, header):
+            dates.save_indexes(dates_path, dict(self._date_indexes, **{header: index}), self._disk_stamp)
+        return index
+
+    def _set_journaled_dates(self, index, header):
+        # Journaled rows are only in the sheet in memory. Returns how many entries there were
+        entries = journal.read_entries(self.path)
+        for entry in entries:
+            if header in entry["values"]:
+                index.set(self.moved_rows.get(entry["row"], entry["row"]), entry["values"][header])
+        return len(entries)
+
+    def update_record(self, row_num, values):
+        # Edit an existing row. Moves the reference in the index if it changed
+        self.update_records([(row_num, values)])
+
+    def update_records(self, updates):
+        # Edit many rows, [(row_num, values), ...], with one journal write
+        updates = [(row_num, normalize_row(values)) for row_num, values in updates]
+        if not updates:
+            return
+        with self.lock:
+            self._sync()
+            self._journal_offset = journal.append_rows(self.path, updates, op="update")
+            for row_num, values in updates:
+                self._apply_row(row_num, values)
+
+    def update_test_dates(self, row_num, start_test_date, end_test_date, approved_date, release_date,
+                          lab_personnel, revenue_remarks):
+        values = [start_test_date, end_test_date, approved_date, release_date, lab_personnel, revenue_remarks]
+        self.update_record(row_num, dict(zip(TEST_DATE_HEADERS, values)))
+
+    def has_pending(self):
+        return journal.has_pending(self.path)
+
+    def flush(self):
+        # Write the journaled rows (ours and the other programs') into the excelbook in one save, then re-stamp the
+        # index and running number cache. Raises if the save fails (excelbook open in Excel etc2), the rows then
+        # stay in the journal
+        with self.lock:
+            self._sync()
+            if not self.has_pending():
+                return False
+            # Save next to it and swap, so a crash halfway never leaves a broken excelbook
+            tmp_path = self.path + ".tmp"
+            try:
+                with profiling.timed("workbook.save", rows=self.next_row - 2):
+                    self.book.workbook.save(tmp_path)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self._generation += 1
+            journal.mark_saved(self.path, self._generation, self._journal_offset)
+            journal.clear(self.path)
+            self._journal_offset = 0
+            self._disk_stamp = refindex.workbook_stamp(self.path)
+
+            refindex.save_index(self.path, self.reference_index)
+            schema.save_schema(self.path, self.headers, self.column_indexes, self._disk_stamp, REGISTER_HEADERS)
+            if self._search is not None:
+                search.save_index(search.search_path_for(self.path), self._search, self._disk_stamp)
+            if self._date_indexes:
+                dates.save_indexes(dates.dates_path_for(self.path), self._date_indexes, self._disk_stamp)
+            if "INTERNAL REFERENCE NUMBER" in self.column_indexes:
+                last_row = self.next_row - 1
+                last_ref = self.sheet.cell(row=last_row, column=self.column_indexes["INTERNAL REFERENCE NUMBER"]).value
+                counter.save_counters(self.path, self.running_counters, last_row, None if last_ref is None else str(last_ref))
+            return True
+
+    # Documents are filled into cached skeletons (register.templates), register.documents builds those
+    def render_work_file(self, row_num, out_dir, name=None):
+        return templates.render_work_file(self.read_record(row_num), out_dir, name)
+
+    def render_test_form(self, row_num, out_dir, logo_path, name=None):
+        return templates.render_test_form(self.read_record(row_num), out_dir, logo_path, name)
+
+    def render_review_of_request(self, row_num, out_dir, logo_path, name=None):
+        return templates.render_review_of_request(self.read_record(row_num), out_dir, logo_path, name)
+
+    def _apply_row(self, row_num, values):
+        # Write one journaled row into the sheet in memory and keep the index and running numbers in step
+        sheet = self.sheet
+        reference_col = self.column_indexes.get("INTERNAL REFERENCE NUMBER")
+        old_reference = None
+        if "INTERNAL REFERENCE NUMBER" in values and reference_col:
+            old_reference = sheet.cell(row=row_num, column=reference_col).value
+        for header, value in values.items():
+            if header in self.column_indexes:
+                sheet.cell(row=row_num, column=self.column_indexes[header], value=value)
+        formats.format_row(sheet, self.column_indexes, row_num)  # Same formatting as a freshly saved row
+
+        reference = values.get("INTERNAL REFERENCE NUMBER")
+        if reference and reference != old_reference:
+            refindex.update_index(self.reference_index, row_num, reference, old_reference)
+            counter.record_reference(self.running_counters, reference)
+        if row_num >= self.next_row:
+            self._next_row = row_num + 1
+        if self._search is not None and any(header in search.SEARCH_FIELDS for header in values):
+            self._search.add(row_num, self._search_record(row_num))
+        for header, index in self._date_indexes.items():
+            if header in values:
+                index.set(row_num, values[header])
+
+
+@profiling.profiled("open_register")
+def open_register(path):
+    # Once Buku Daftar is moved into SQLite (python -m register.sqlstore import ...) it is used from there and the
+    # excelbook becomes its export. Otherwise the excelbook itself, like before
+    from register import sqlstore  # sqlstore builds on this module
+    if path.endswith(sqlstore.DB_SUFFIX):
+        return sqlstore.SqliteRegister(path)
+    if os.path.exists(sqlstore.db_path_for(path)):
+        return sqlstore.SqliteRegister(sqlstore.db_path_for(path), workbook_path=path)
+    return Register(path)
@@ -0,0 +1,93 @@
+import json
+import os
+
+from register import refindex
+
+# Running number cache for INTERNAL REFERENCE NUMBER. One counter per (work class code, year), e.g "9230/25" -> 41
+# Seeded once from the sheet, bumped in memory on every save and kept next to the excelbook.
+# We also remember the excelbook stamp (mtime, size), the last row and its reference. If the stamp changed and
+# the sheet's last row don't match on startup, somebody added/deleted rows behind our back so we reseed from the sheet.
+
+
+def counter_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".refcounter.json"
+
+
+def counter_key(code, year_suffix):
+    return f"{code}/{year_suffix:02d}"
+
+
+def parse_reference(value):
+    # PA/UAT/{code}/{yy}/{running} with optional " (D)" for MINDEF. Amended "-(n)" refs are not counted, same as before
+    parts = str(value).split("/")
+    if len(parts) != 5 or parts[0] != "PA" or parts[1] != "UAT":
+        return None
+    running = parts[4].split(" ")[0]
+    if not (parts[3].isdigit() and running.isdigit()):
+        return None
+    return parts[2], int(parts[3]), int(running)
+
+
+def record_reference(counters, value):
+    # Bump the counter if this reference is the highest we've seen for its work class and year
+    parsed = parse_reference(value) if value else None
+    if parsed:
+        code, year_suffix, running = parsed
+        key = counter_key(code, year_suffix)
+        if running > counters.get(key, 0):
+            counters[key] = running
+
+
+def seed_counters(values):
+    counters = {}
+    for value in values:
+        record_reference(counters, value)
+    return counters
+
+
+def column_tail(values):
+    # (last row, its reference) from the reference column (row 2 down). What we validate against on startup
+    last_ref = values[-1] if values else None
+    return len(values) + 1, None if last_ref is None else str(last_ref)
+
+
+def save_counters(workbook_path, counters, last_row, last_ref):
+    # Call AFTER workbook.save, the stamp must belong to the file we just wrote
+    payload = {"stamp": refindex.workbook_stamp(workbook_path), "last_row": last_row, "last_ref": last_ref,
+               "counters": counters}
+    counter_path = counter_path_for(workbook_path)
+    tmp_path = counter_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, counter_path)
+
+
+def load_counters(workbook_path, column_values):
+    # column_values() gives the reference column from row 2 down, only read when the stamp doesn't match
+    try:
+        with open(counter_path_for(workbook_path), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        # Excelbook untouched since we saved the cache. Trust it without reading a single row
+        if payload.get("stamp") == refindex.workbook_stamp(workbook_path):
+            return payload["counters"]
+        # Saved by someone else (KK, Excel). Still fine as long as the last row is the one we know
+        if [payload.get("last_row"), payload.get("last_ref")] == list(column_tail(column_values())):
+            counters = payload["counters"]
+            save_counters(workbook_path, counters, *column_tail(column_values()))
+            return counters
+    except (OSError, ValueError, KeyError):
+        pass  # No cache yet or broken. Reseed
+
+    counters = seed_counters(column_values())
+    save_counters(workbook_path, counters, *column_tail(column_values()))
+    return counters
+
+
+def counter_years(counters):
+    # Two digit years that have references, newest first. The counters are already split per work class and year
+    return sorted({int(key.split("/")[1]) for key in counters}, reverse=True)
+
+
+def next_running_number(counters, code, year_suffix):
+    # Peek only. The counter is bumped by record_reference once the row is really saved
+    return counters.get(counter_key(code, year_suffix), 0) + 1
@@ -0,0 +1,145 @@
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+
+# Dates in Buku Daftar. The forms used to write whatever was typed ("14/3/25", "14/03/2025", "NA") as text, so
+# every filter had to parse it again. Now the date columns are written as real datetimes (shown dd/mm/yy, see
+# register.formats), whatever the clerk typed. Text that is not a date ("NA", "KIV") stays text.
+#
+#   normalize_date("14/3/25")          -> datetime(2025, 3, 14)
+#   format_date(datetime(2025, 3, 14)) -> "14/03/25"   for Entry boxes, tables and documents
+#   DateIndex: one date column as day numbers, rows between two dates by bisect (Register.rows_between).
+#   Saved next to the excelbook (.dates.json) on flush, so the column is only read again when the excelbook changes
+#
+# Older rows are converted once with register.convert_dates
+
+# Columns that hold dates
+DATE_HEADERS = ["DATE RECEIVED", "START TEST DATE", "END TEST DATE", "APPROVED DATE", "REPORT RELEASE DATE"]
+DATE_FORMATS = ["%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d", "%d-%m-%y", "%d-%m-%Y", "%d.%m.%y", "%d.%m.%Y"]
+DISPLAY_FORMAT = "%d/%m/%y"
+# What the clerks put when there is no date yet. Kept as typed
+NO_DATE_TEXT = {"", "NA", "N/A", "-", "NIL", "TIADA"}
+
+
+def parse_date(value):
+    # datetime, or None if it doesn't look like a date
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            pass
+    return None
+
+
+def normalize_date(value):
+    # What goes into a date cell: a datetime if it is one, otherwise the text as typed (stripped)
+    if value is None:
+        return None
+    parsed = parse_date(value)
+    if parsed is not None:
+        return parsed
+    return str(value).strip()
+
+
+def is_no_date(value):
+    return value is None or str(value).strip().upper() in NO_DATE_TEXT
+
+
+def normalize_row(values):
+    # {header: value} with its date columns normalized. A new dict, values is left alone
+    if not any(header in values for header in DATE_HEADERS):
+        return values
+    return {header: normalize_date(value) if header in DATE_HEADERS else value for header, value in values.items()}
+
+
+def format_date(value):
+    # For showing a cell: datetimes as dd/mm/yy, anything else as it is ("" for empty)
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime(DISPLAY_FORMAT)
+    return value
+
+
+def to_day(value):
+    # Day number (date.toordinal) or 0 if not a date. Cheap for datetimes, the text ones go through parse_date
+    if isinstance(value, datetime):
+        return value.toordinal()
+    if value is None or value == "":
+        return 0
+    parsed = parse_date(value)
+    return parsed.toordinal() if parsed else 0
+
+
+class DateIndex:
+    # One date column, parsed once: row -> day number, and (day, row) sorted for range lookups. Kept up to date
+    # with set() as rows are written, so "received this month" is two bisects, not a parse of every row
+    def __init__(self, values=()):
+        # values: (row_num, cell value) pairs
+        self.days = {}
+        cache = {}  # The same date text repeats on many rows
+        for row_num, value in values:
+            if isinstance(value, datetime):
+                day = value.toordinal()
+            else:
+                day = cache.get(value)
+                if day is None:
+                    day = cache[value] = to_day(value)
+            if day:
+                self.days[row_num] = day
+        self._sorted = sorted((day, row_num) for row_num, day in self.days.items())
+
+    def __len__(self):
+        return len(self.days)
+
+    def set(self, row_num, value):
+        old = self.days.pop(row_num, None)
+        if old is not None:
+            i = bisect_left(self._sorted, (old, row_num))
+            del self._sorted[i]
+        day = to_day(value)
+        if day:
+            self.days[row_num] = day
+            insort(self._sorted, (day, row_num))
+
+    def rows_between(self, first, last):
+        # Rows dated first .. last (dates or datetimes, both inclusive), in date order
+        start = bisect_left(self._sorted, (to_day(first), 0))
+        end = bisect_right(self._sorted, (to_day(last), float("inf")))
+        return [row_num for _, row_num in self._sorted[start:end]]
+
+
+def dates_path_for(register_path):
+    return os.path.splitext(register_path)[0] + ".dates.json"
+
+
+def save_indexes(path, indexes, stamp):
+    # {header: DateIndex}. stamp is the excelbook stamp the indexes belong to, checked on load
+    payload = {"stamp": stamp, "columns": {header: index._sorted for header, index in indexes.items()}}
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_indexes(path, stamp):
+    # {header: DateIndex} saved for this stamp, {} if there is none or it's for another version of the excelbook
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload["stamp"] != stamp:
+            return {}
+        indexes = {}
+        for header, pairs in payload["columns"].items():
+            index = indexes[header] = DateIndex()
+            index._sorted = [(day, row_num) for day, row_num in pairs]
+            index.days = {row_num: day for day, row_num in index._sorted}
+        return indexes
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
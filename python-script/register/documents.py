@@ -0,0 +1,900 @@
+import os
+
+from docx import Document
+from docx.shared import Pt, Cm, Inches
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.text import WD_UNDERLINE
+from docx.enum.table import WD_TABLE_ALIGNMENT
+
+from register import dates, marking
+
+# Word documents for one row of Buku Daftar: work file, test form and review of request.
+# No Tk in here, BD wraps these with its messagebox and the benchmark calls them directly.
+# Each render_* function takes the row as {header: value}, saves the docx into out_dir and returns its path.
+# The file is named after the client unless name is given (batch does this when one client has many rows).
+
+# Sample markings on the form itself, and on each continuation page (see marking_pages)
+WORK_FILE_MARKINGS = 48  # 4 columns of 12
+WORK_FILE_MARKING_ROWS = 48
+WORK_FILE_MARKINGS_PER_PAGE = 4 * WORK_FILE_MARKING_ROWS
+TEST_FORM_MARKINGS = 36  # 3 columns of 12 in the Sample Marking cell
+TEST_FORM_MARKING_ROWS = 45
+TEST_FORM_MARKINGS_PER_PAGE = 3 * TEST_FORM_MARKING_ROWS
+
+# Start with common doc function font setting, spacing, table, merge etc2
+def font_settings_header(run, font_name='Arial', font_size=Pt(11), bold=True, underline=False):
+    run.font.name = font_name
+    run.font.size = font_size
+    run.bold = bold
+    if underline:
+        run.font.underline = WD_UNDERLINE.SINGLE  # Use WD_UNDERLINE for underlining
+    else:
+        run.font.underline = None  # No underline
+
+def set_paragraph_spacing(paragraph, line_spacing_pt, before_spacing_pt=0, after_spacing_pt=0):
+    pPr = paragraph._element.get_or_add_pPr()
+    spacing = pPr.find(qn('w:spacing'))
+    if spacing is None:
+        spacing = OxmlElement('w:spacing')
+        pPr.append(spacing)
+    spacing.set(qn('w:line'), str(int(line_spacing_pt * 20)))
+    spacing.set(qn('w:lineRule'), 'auto')
+
+    # Set before and after spacing
+    spacing.set(qn('w:before'), str(int(before_spacing_pt * 20)))
+    spacing.set(qn('w:after'), str(int(after_spacing_pt * 20)))
+
+# Function to set cell text
+def set_cell_text(cell, text, bold=False, font_size = 10, line_spacing_pt=11, before_spacing_pt=0, after_spacing_pt=0, alignment=WD_ALIGN_PARAGRAPH.CENTER):
+    paragraph = cell.paragraphs[0]
+    run = paragraph.add_run(text)
+    run.font.name = 'Arial'  # Set font name
+    run.font.size = Pt(font_size)  # Set font size
+    if bold:
+        run.bold = True
+    paragraph.alignment = alignment
+    set_paragraph_spacing(paragraph, line_spacing_pt, before_spacing_pt, after_spacing_pt)
+
+def set_column_width(column, width):
+    for cell in column.cells:
+        tc = cell._element  # Access the XML element of the cell
+        tcPr = tc.get_or_add_tcPr()  # Get or create the cell properties element
+        tcW = OxmlElement('w:tcW')  # Create a new width element
+        tcW.set(qn('w:w'), str(int(width * 1440)))  # 1440 twips per inch, set the width
+        tcW.set(qn('w:type'), 'dxa')  # Use 'dxa' for width units in twips (20ths of a point)
+        tcPr.append(tcW)
+
+def set_table_borders(table):
+    tbl = table._tbl  # Get the table XML element
+    tblPr = tbl.tblPr
+    tblBorders = tblPr.find(qn('w:tblBorders'))
+
+    if tblBorders is None:
+       tblBorders = OxmlElement('w:tblBorders')
+       tblPr.append(tblBorders)
+
+        # Define border styles
+    border_styles = {
+        'top': {'w:val': 'single', 'w:sz': '4'},
+        'left': {'w:val': 'single', 'w:sz': '4'},
+        'bottom': {'w:val': 'single', 'w:sz': '4'},
+        'right': {'w:val': 'single', 'w:sz': '4'},
+        'insideH': {'w:val': 'single', 'w:sz': '4'},
+        'insideV': {'w:val': 'single', 'w:sz': '4'}
+    }
+
+    # Apply border styles to each side of the table and inside
+    for side, attrs in border_styles.items():
+        border_element = OxmlElement(f'w:{side}')
+        for key, value in attrs.items():
+            border_element.set(qn(key), value)
+        tblBorders.append(border_element)
+
+
+def merge_cells_horizontally(table, row_idx, start_col_idx, end_col_idx):
+    cell = table.cell(row_idx, start_col_idx)
+    cell.merge(table.cell(row_idx, end_col_idx))
+
+
+# Sample markings for any number of items. The first names go in the marking table of the form like always,
+# the rest go on continuation pages at the end of the document, one full table per page. Bulk MINDEF supply jobs
+# have hundreds of items, they used to stop the form with "Table has insufficient rows"
+def marking_pages(names, first_page, per_page):
+    # [names on the form, names on continuation page 1, page 2, ...]
+    pages = [names[:first_page]]
+    pages += [names[start:start + per_page] for start in range(first_page, len(names), per_page)]
+    return pages
+
+
+def fill_marking_table(table, names, first_number, rows, start_row=0, font_size=10, spacing=None):
+    # Names numbered from first_number, down each column of rows names then the next column. One pass over the
+    # table (table.cell() looks the grid up again every call). spacing is (line, before, after) for every cell
+    table_rows = table.rows[start_row:start_row + rows]
+    for row_idx, row in enumerate(table_rows):
+        for col_idx, cell in enumerate(row.cells):
+            paragraph = cell.paragraphs[0]
+            idx = col_idx * rows + row_idx
+            if idx < len(names):
+                run = paragraph.add_run(f"{first_number + idx}. {names[idx]}")
+                run.font.name = "Arial"
+                run.font.size = Pt(font_size)
+            if spacing:
+                set_paragraph_spacing(paragraph, *spacing)
+    return table
+
+
+def add_marking_continuation(doc, pages, title, columns, rows_per_page, width, font_size=10, spacing=None):
+    # pages from marking_pages. A page break, the title and a table for every page after the first
+    number = len(pages[0]) + 1
+    for names in pages[1:]:
+        doc.add_page_break()
+        heading = doc.add_paragraph()
+        run = heading.add_run(title)
+        font_settings_header(run, font_size=Pt(10), bold=True, underline=False)
+        set_paragraph_spacing(heading, line_spacing_pt=11, before_spacing_pt=0, after_spacing_pt=6)
+
+        # Last page only as long as it needs, the names reflow over all the columns
+        rows = min(rows_per_page, -(-len(names) // columns))
+        table = doc.add_table(rows=rows, cols=columns)
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        table.autofit = False
+        set_table_borders(table)
+        for column in table.columns:
+            set_column_width(column, width)
+        fill_marking_table(table, names, number, rows, font_size=font_size, spacing=spacing)
+        number += len(names)
+
+
+def marking_continued_note(pages):
+    # Under the form's marking table when there are continuation pages
+    total = sum(len(names) for names in pages)
+    return f"{total - len(pages[0])} more of {total} items on the continuation pages"
+
+
+def render_work_file(record, out_dir, name=None):
+    doc = build_work_file(record, marking.sample_names(record))
+    work_file = os.path.join(out_dir, f'{name or record.get("CLIENT")}_workfile.docx')
+    doc.save(work_file)
+    return work_file
+
+
+# Builds the work file layout. marking_for_table is the list of sample names (register.marking.sample_names).
+# register.templates calls this with placeholders to make its skeleton
+def build_work_file(record, marking_for_table):
+    # Call all data we needed first
+    report_number = record.get("REPORT NUMBER")
+    client = record.get("CLIENT")
+    contact_person = record.get("CONTACT PERSON")
+    date_received = dates.format_date(record.get("DATE RECEIVED"))  # dd/mm/yy, not the datetime's str()
+    received_by = record.get("RECEIVED BY")
+    work_title = record.get("WORK TITLE")
+    workclass = record.get("WORK CLASS")
+    lab_work_no = record.get("INTERNAL REFERENCE NUMBER")
+    applicant_by = record.get("APPLICANT BY")
+    type_of_test = record.get("TOT")
+
+    # Additional function we create just specific for page one
+    def apply_single_line_spacing_to_table(table):
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    set_paragraph_spacing(paragraph, line_spacing_pt=11, before_spacing_pt=1, after_spacing_pt=1)
+
+    def set_cell_border(cell, is_bold=True, Thickness=6, borders='top and bottom'):
+        # Get or create the cell properties element (w:tcPr)
+        tc_pr = cell._element.get_or_add_tcPr()
+
+        # Get or create the borders element (w:tcBorders)
+        cell_borders = tc_pr.find(qn('w:tcBorders'))
+        if cell_borders is None:
+            cell_borders = OxmlElement('w:tcBorders')
+            tc_pr.append(cell_borders)
+
+        # Set top border if 'top_and_bottom' or 'top_only'
+        if borders in ['top_and_bottom', 'top_only']:
+            top_border = OxmlElement('w:top')
+            top_border.set(qn('w:val'), 'single')  # Solid line
+            top_border.set(qn('w:sz'), str(Thickness))  # Thickness (in 1/8 pt)
+            top_border.set(qn('w:space'), '0')  # No extra space
+            if is_bold:
+                top_border.set(qn('w:color'), '000000')  # Black color for bold effect
+            cell_borders.append(top_border)
+
+        # Set bottom border if 'top_and_bottom' or 'bottom_only'
+        if borders in ['top_and_bottom', 'bottom_only']:
+            bottom_border = OxmlElement('w:bottom')
+            bottom_border.set(qn('w:val'), 'single')  # Solid line
+            bottom_border.set(qn('w:sz'), str(Thickness))  # Thickness (in 1/8 pt)
+            bottom_border.set(qn('w:space'), '0')  # No extra space
+            if is_bold:
+                bottom_border.set(qn('w:color'), '000000')  # Black color for bold effect
+            cell_borders.append(bottom_border)
+
+        # Set left and right borders to 'nil' (no border)
+        left_border = OxmlElement('w:left')
+        left_border.set(qn('w:val'), 'nil')  # No left border
+        cell_borders.append(left_border)
+
+        right_border = OxmlElement('w:right')
+        right_border.set(qn('w:val'), 'nil')  # No right border
+        cell_borders.append(right_border)
+
+    # Create a new document
+    doc = Document()
+
+    # Set the top, bottom, left, and right margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Cm(1.27)  # Set the top margin to 0 cm
+        section.bottom_margin = Cm(2.25)  # Set the bottom margin to 2.25 cm
+        section.left_margin = Cm(2.03)  # Set the left margin to 2.03 cm
+        section.right_margin = Cm(2.03)  # Set the right margin to 2.03 cm
+
+    # Add the first line: "Nama Unit"
+    p1 = doc.add_paragraph()
+    p1.alignment = 1  # Center alignment
+    p1.paragraph_format.space_before = Pt(12)  # 12 pt is roughly one line of spacing
+    run1 = p1.add_run("UNIT ANALISIS TEKSTIL")
+    font_settings_header(run1, bold=True, underline=False)
+    set_paragraph_spacing(p1, line_spacing_pt=11, before_spacing_pt=0, after_spacing_pt=0)
+
+    # Add the second line: "Nama Bahagian"
+    p2 = doc.add_paragraph()
+    p2.alignment = 1  # Center alignment
+    run2 = p2.add_run("BAHAGIAN TEKNOLOGI PRESTASI ANGKATAN")
+    font_settings_header(run2, bold=True, underline=False)
+    set_paragraph_spacing(p2, line_spacing_pt=11, before_spacing_pt=0, after_spacing_pt=0)
+
+    # Add Space antara Nama bahagian dan document title
+    p4 = doc.add_paragraph()
+    p4.alignment = 1  # Center alignment
+    run4 = p4.add_run()
+    set_paragraph_spacing(p4,line_spacing_pt=11, before_spacing_pt=0, after_spacing_pt=0)
+
+    # Add the third line: "Document Title"
+    p3 = doc.add_paragraph()
+    p3.alignment = 1  # Center alignment
+    run3 = p3.add_run("Laboratory Work File")
+    font_settings_header(run3, bold=True, underline=False)
+
+    # Create table with specific number of rows and columns
+    table = doc.add_table(rows=6, cols=4)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Disable auto-fit so the widths are respected
+    table.autofit = False
+
+    set_table_borders(table)
+
+    apply_single_line_spacing_to_table(table)
+
+    set_column_width(table.columns[0], 1.12)
+    set_column_width(table.columns[1], 3.26)
+    set_column_width(table.columns[2], 1.15)
+    set_column_width(table.columns[3], 1.65)
+
+    merge_cells_horizontally(table, 5, 1, 3)  # Merge Row Work Title
+    merge_cells_horizontally(table, 4, 1, 3)  # Merge Row Specification
+
+    set_cell_text(table.cell(0, 0), 'Report No.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 0), 'Work Class', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(2, 0), 'Client', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(3, 0), 'Contact Person', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(4, 0), 'Work Title', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(5, 0), 'Specification', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(0, 2), 'Lab Work No.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 2), 'Applicant by', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(2, 2), 'Date Received', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(3, 2), 'Received by', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    # Content populate from Excel
+    set_cell_text(table.cell(0, 1), report_number, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 1), workclass, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(2, 1), client, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(3, 1), contact_person, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(4, 1), work_title, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(0, 3), lab_work_no, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 3), applicant_by, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(2, 3), date_received, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(3, 3), received_by, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    # Add the fourth line: "Sample Marking"
+    p4 = doc.add_paragraph()
+    p4.alignment = 1  # Center alignment
+    run4 = p4.add_run("Sample Marking")
+    font_settings_header(run4,font_size=Pt(10),bold=False, underline=False)
+    set_paragraph_spacing(p4, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3)
+
+    # Create table with specific number of rows and columns
+    table01 = doc.add_table(rows=13, cols=4)
+    table01.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Disable auto-fit so the widths are respected
+    table01.autofit = False
+
+    set_table_borders(table01)
+
+    set_column_width(table01.columns[0], 1.8)
+    set_column_width(table01.columns[1], 1.8)
+    set_column_width(table01.columns[2], 1.8)
+    set_column_width(table01.columns[3], 1.8)
+
+    # 12 names down each of the 4 columns here, the rest on continuation pages at the end
+    marking_table = marking_pages(marking_for_table, WORK_FILE_MARKINGS, WORK_FILE_MARKINGS_PER_PAGE)
+    fill_marking_table(table01, marking_table[0], 1, rows=12, start_row=1)
+
+    apply_single_line_spacing_to_table(table01)
+
+    if len(marking_table) > 1:
+        p_more = doc.add_paragraph()
+        run_more = p_more.add_run(marking_continued_note(marking_table))
+        font_settings_header(run_more, font_size=Pt(9), bold=False, underline=False)
+        set_paragraph_spacing(p_more, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=0)
+
+    # Add the fifth line:
+    p5 = doc.add_paragraph()
+    p5.alignment = 0  # Center alignment
+    run5 = p5.add_run("Laboratory Activities:")
+    font_settings_header(run5, font_size=Pt(10), bold=True, underline=False)
+    set_paragraph_spacing(p5, line_spacing_pt=11, before_spacing_pt=12, after_spacing_pt=3)
+
+    # Create table with specific number of rows and columns (number of rows at top, olah dari json)
+    table02 = doc.add_table(rows=4, cols=5)
+    table02.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Disable auto-fit so the widths are respected
+    table02.autofit = False
+
+    set_table_borders(table02)
+
+    set_cell_text(table02.cell(0, 0), 'No.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(0, 1), 'Type of Testing', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(0, 2), 'Laboratory Personnel', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(0, 3), 'Date Start', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(0, 4), 'Date Finish', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    # Start populating the table based on type_of_test
+    row_index = 1  # Starting row index for data
+
+    # Check if any value from {I, II, III, IV} is present in type_of_test
+    if any(test in type_of_test for test in {'I', 'II', 'III', 'IV'}):
+        table02.add_row()
+        set_cell_text(table02.cell(row_index, 0), '1.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        set_cell_text(table02.cell(row_index, 1), 'Qualitative Analysis', line_spacing_pt=11, before_spacing_pt=3,
+                      after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        row_index += 1
+
+    # Check if {IV} is present in type_of_test
+    if 'IV' in type_of_test:
+        table02.add_row()
+        set_cell_text(table02.cell(row_index, 0), '2.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        set_cell_text(table02.cell(row_index, 1), 'Quantitative Analysis', line_spacing_pt=11, before_spacing_pt=3,
+                      after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    set_column_width(table02.columns[0], 0.37)
+    set_column_width(table02.columns[1], 2.32)
+    set_column_width(table02.columns[2], 1.66)
+    set_column_width(table02.columns[3], 1.42)
+    set_column_width(table02.columns[4], 1.42)
+
+    apply_single_line_spacing_to_table(table02)
+
+    # Add the sixth line
+    p6 = doc.add_paragraph()
+    p6.alignment = 0  # Center alignment
+    run6 = p6.add_run("Report:")
+    font_settings_header(run6, font_size=Pt(10), bold=True, underline=False)
+    set_paragraph_spacing(p6, line_spacing_pt=11, before_spacing_pt=12, after_spacing_pt=3)
+
+    # Create table with specific number of rows and columns (number of rows at top, olah dari json)
+    table03 = doc.add_table(rows=5, cols=2)
+    table03.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    # Disable auto-fit so the widths are respected
+    table03.autofit = False
+
+    set_table_borders(table03)
+
+    apply_single_line_spacing_to_table(table03)
+
+    set_column_width(table03.columns[0], 1.91)
+    set_column_width(table03.columns[1], 5.28)
+
+    set_cell_text(table03.cell(0, 0), 'Report No.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(1, 0), 'Report Title', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(2, 0), 'Draft Date', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(3, 0), 'Approved Date', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(4, 0), 'Dispatch Date', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(0, 1), report_number, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(1, 1), work_title, line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                  alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    # Add the seventh line
+    p7 = doc.add_paragraph()
+    p7.alignment = 0  # Center alignment
+    run7 = p7.add_run("Remarks:")
+    font_settings_header(run7, font_size=Pt(10), bold=False, underline=False)
+    set_paragraph_spacing(p7, line_spacing_pt=11, before_spacing_pt=12, after_spacing_pt=3)
+
+    # Adding double parallel bold lines
+    table04 = doc.add_table(rows=3, cols=1)
+
+    apply_single_line_spacing_to_table(table04)
+
+    # Access the cell in the table (but don't add any text)
+    Is_bold = False
+    border_thickness = 3
+    for row in table04.rows:
+        for cell in row.cells:
+            set_cell_border(cell, is_bold=Is_bold, Thickness=border_thickness, borders='bottom_only')
+
+    add_marking_continuation(doc, marking_table, f"Sample Marking (continued) - {report_number}", columns=4,
+                             rows_per_page=WORK_FILE_MARKING_ROWS, width=1.8, spacing=(11, 1, 1))
+
+    return doc
+
+# Test form (page 2)
+def render_test_form(record, out_dir, logo_path, name=None):
+    doc = build_test_form(record, marking.sample_names(record), logo_path)
+    test_form = os.path.join(out_dir, f'{name or record.get("CLIENT")}_testform.docx')
+    doc.save(test_form)
+    return test_form
+
+
+def build_test_form(record, marking_for_table, logo_path):
+    # Call data locally for easy access
+    work_title = record.get("WORK TITLE")
+    workclass = record.get("WORK CLASS")
+    lab_work_no = record.get("INTERNAL REFERENCE NUMBER")
+    type_of_test = record.get("TOT")
+
+    # Map type of test so that we know which cell to mark check or cross appropriately
+    test_to_cell_mapping = {
+        'I': (1, 1),
+        'II': (0, 1),
+        'III': (2, 1),
+        'IV': (3, 1),
+        'V': (4, 1)
+    }
+
+    def populate_names_in_table(cell, names):
+        num_names = len(names)
+
+        # Determine number of columns based on number of names. Max we have 3 column, max item 36
+        # (TEST_FORM_MARKINGS, the rest go on continuation pages)
+        if 10 < num_names <= 20:
+            num_columns = 2
+            names_per_column = 10
+        elif 20 < num_names <= 30:
+            num_columns = 3
+            names_per_column = 10
+        else:
+            num_columns = 3
+            names_per_column = 12
+
+        # Split names into chunks
+        columns = [names[i:i + names_per_column] for i in range(0, num_names, names_per_column)]
+
+        # Add a single table within the cell
+        table = cell.add_table(rows=1, cols=num_columns)
+        table.autofit = False  # Disable autofit to prevent unnecessary column resizing
+
+        index = 1
+        for col_idx, column_names in enumerate(columns):
+            # Fill each column with names
+            col_cell = table.cell(0, col_idx)
+            for name in column_names:
+                para = col_cell.add_paragraph()
+                run = para.add_run(f"{index}. {name}")  # Add index and name
+                run.font.name = "Arial"  # Set font to Arial
+                run.font.size = Pt(9)  # Set font size to 9
+                para.paragraph_format.line_spacing = Pt(10)  # Minimize spacing between lines
+                para.paragraph_format.space_after = Pt(0)  # Remove extra spacing
+                index += 1
+
+        # Remove internal borders. So there's no table between the column for marking names
+        for row in table.rows:
+            for cell in row.cells:
+                tc_pr = cell._element.get_or_add_tcPr()
+                tc_borders = OxmlElement('w:tcBorders')
+                for border in ['top', 'left', 'bottom', 'right']:
+                    border_elem = OxmlElement(f'w:{border}')
+                    border_elem.set(qn('w:val'), 'nil')  # Correctly set the 'w:val' attribute
+                    tc_borders.append(border_elem)
+                tc_pr.append(tc_borders)
+
+    # Create a new document
+    doc = Document()
+
+    # Set the top, bottom, left, and right margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1.0)  # Set the top margin to 0 cm
+        section.bottom_margin = Inches(0.39)  # Set the bottom margin to 2.25 cm
+        section.left_margin = Inches(1.0)  # Set the left margin to 2.03 cm
+        section.right_margin = Inches(1.0)  # Set the right margin to 2.03 cm
+
+    header = doc.sections[0].header  # Get the first section of the document
+    header_table = header.add_table(rows=2, cols=3,width=Inches(6)) # Access the header of the section
+    header_table.autofit = False
+
+    # Set explicit column widths
+    column_widths = [Inches(1.9), Inches(3.1), Inches(1.5)]  # Adjust as needed
+    for col, width in zip(header_table.columns, column_widths):
+        for cell in col.cells:
+            cell.width = width
+
+    set_table_borders(header_table)
+
+    # Add the logo to the first cell
+    cell = header_table.cell(0, 0)
+    paragraph = cell.paragraphs[0]
+    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = paragraph.add_run()
+    run.add_picture(logo_path, width=Inches(1.1))
+
+    # Merge the first column (2 rows)
+    cell_to_merge = header_table.cell(1, 0)
+    cell.merge(cell_to_merge)
+
+    # Add content to the other cells
+    set_cell_text(header_table.cell(0, 1), 'WORK SHEET', bold=True, line_spacing_pt=12, before_spacing_pt=6, after_spacing_pt=6)
+    set_cell_text(header_table.cell(1, 1), '\n\nLaboratory Testing Form', bold=True, line_spacing_pt=12, before_spacing_pt=0, after_spacing_pt=0)
+    set_cell_text(header_table.cell(0, 2), 'Document No: STRIDE/TAL/WS/01', font_size=9, bold=False, line_spacing_pt=12, before_spacing_pt=2, after_spacing_pt=2,alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(header_table.cell(1, 2), '\nPage: 1 of 1\nIssue No: 1\nRev. No: 0\nIssue Date: 1/3/2021', font_size=9, bold=False, line_spacing_pt=12, before_spacing_pt=2, after_spacing_pt=2,alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    doc.add_paragraph()
+
+    table = doc.add_table(rows=6, cols=2)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_table_borders(table)
+    set_column_width(table.columns[0],2.44)
+    set_column_width(table.columns[1], 3.84)
+
+    set_cell_text(table.cell(0, 0), 'Internal Reference', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6,alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 0), 'Work Title', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(2, 0), 'Sample Marking', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(3, 0), 'Specification', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(4, 0), 'Test Result', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(5, 0), 'Work Class', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    set_cell_text(table.cell(0, 1), lab_work_no, bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 1), work_title, bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(5, 1), workclass, bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    # Up to 3 columns of 12 names in the cell, the rest on continuation pages at the end
+    marking_table = marking_pages(marking_for_table, TEST_FORM_MARKINGS, TEST_FORM_MARKINGS_PER_PAGE)
+    populate_names_in_table(table.cell(2,1),marking_table[0])
+    if len(marking_table) > 1:
+        para_more = table.cell(2, 1).add_paragraph()
+        run_more = para_more.add_run(marking_continued_note(marking_table))
+        font_settings_header(run_more, font_size=Pt(9), bold=False, underline=False)
+
+    p1 = doc.add_paragraph()
+    run1 = p1.add_run("   General Information")
+    font_settings_header(run1, bold=True, underline=False)
+    p1.paragraph_format.space_before = Pt(3)
+    p1.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    p2 = doc.add_paragraph()
+    run2 = p2.add_run("   Testing")
+    font_settings_header(run2, bold=True, underline=False)
+    p2.paragraph_format.space_after = Pt(3)
+    p2.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    table01 = doc.add_table(rows=5, cols=2)
+    table01.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_table_borders(table01)
+    set_column_width(table01.columns[0], 2.44)
+    set_column_width(table01.columns[1], 3.86)
+
+    set_table_borders(table01)
+
+    set_cell_text(table01.cell(0, 0), 'Qualitative Analysis (Burning)', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table01.cell(1, 0), 'Qualitative Analysis (Microscopic)', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6,after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table01.cell(2, 0), 'Qualitative Analysis (Solubility)', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6,after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table01.cell(3, 0), 'Quantitative Analysis', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6,after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table01.cell(4, 0), 'FTIR', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6,after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    for test, cell_coords in test_to_cell_mapping.items():
+        row, col = cell_coords
+        if test in type_of_test:  # Assuming 'type_of_test' is defined and contains the test types
+            set_cell_text(table01.cell(row, col),'√',bold=False,line_spacing_pt=12,before_spacing_pt=6,
+                          after_spacing_pt=6,alignment=WD_ALIGN_PARAGRAPH.CENTER)
+        else:
+            set_cell_text(table01.cell(row, col),'X',bold=False,line_spacing_pt=12,before_spacing_pt=6,
+                after_spacing_pt=6,alignment=WD_ALIGN_PARAGRAPH.CENTER)
+
+    p3 = doc.add_paragraph()
+    run3 = p3.add_run("   Carried out by:")
+    font_settings_header(run3, bold=True, underline=False)
+    p3.paragraph_format.space_before = Pt(6)
+    p3.paragraph_format.space_after = Pt(3)
+    p3.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    table02 = doc.add_table(rows=3, cols=2)
+    table02.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_column_width(table02.columns[0], 1.41)
+    set_column_width(table02.columns[1], 4.82)
+
+    set_cell_text(table02.cell(0, 1)," : "+'.'*50, bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6,after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(1, 0), 'Date Start', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=0,after_spacing_pt=0, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(2, 0), 'Date Completed', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=0, after_spacing_pt=0, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(1, 1), " : " + '.' * 50, bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6, after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(2, 1), " : " + '.' * 50, bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6, after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    p4 = doc.add_paragraph()
+    run4 = p4.add_run("   Verified by:")
+    font_settings_header(run4, bold=True, underline=False)
+    p4.paragraph_format.space_before = Pt(6)
+    p4.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    table03 = doc.add_table(rows=2, cols=2)
+    table03.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_column_width(table03.columns[0], 1.41)
+    set_column_width(table03.columns[1], 4.82)
+
+    set_cell_text(table03.cell(0, 1), " : " + '.' * 50, bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6, after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(1, 0), 'Date', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=0, after_spacing_pt=0, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table03.cell(1, 1), " : " + '.' * 50, bold=False, line_spacing_pt=12,
+                  before_spacing_pt=6, after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    add_marking_continuation(doc, marking_table, f"Sample Marking (continued) - {lab_work_no}", columns=3,
+                             rows_per_page=TEST_FORM_MARKING_ROWS, width=2.08, font_size=9, spacing=(10, 1, 1))
+
+    return doc
+
+# Review of request (page 3)
+def render_review_of_request(record, out_dir, logo_path, name=None):
+    doc = build_review_of_request(record, logo_path)
+    review_request = os.path.join(out_dir, f'{name or record.get("CLIENT")}_review of request.docx')
+    doc.save(review_request)
+    return review_request
+
+
+def build_review_of_request(record, logo_path):
+    # Call locally data for easy access
+    work_title = record.get("WORK TITLE")
+    lab_work_no = record.get("INTERNAL REFERENCE NUMBER")
+    type_of_test = record.get("TOT")
+    client = record.get("CLIENT")
+
+    # Create a new document
+    doc = Document()
+
+    # Set the top, bottom, left, and right margins
+    sections = doc.sections
+    for section in sections:
+        section.top_margin = Inches(1.0)  # Set the top margin to 0 cm
+        section.bottom_margin = Inches(0.39)  # Set the bottom margin to 2.25 cm
+        section.left_margin = Inches(1.0)  # Set the left margin to 2.03 cm
+        section.right_margin = Inches(1.0)  # Set the right margin to 2.03 cm
+
+    header = doc.sections[0].header  # Get the first section of the document
+    header_table = header.add_table(rows=1, cols=2, width=Inches(6))  # Access the header of the section
+    header_table.autofit = False
+
+    # Set explicit column widths
+    column_widths = [Inches(1.1), Inches(5.7)]  # Adjust as needed
+    for col, width in zip(header_table.columns, column_widths):
+        for cell in col.cells:
+            cell.width = width
+
+    set_table_borders(header_table)
+
+    # Add the logo to the first cell
+    cell = header_table.cell(0, 0)
+    paragraph = cell.paragraphs[0]
+    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run = paragraph.add_run()
+    run.add_picture(logo_path, width=Inches(1.0))
+
+    set_cell_text(header_table.cell(0, 1), '\n\nSCIENCE AND TECHNOLOGY RESEARCH INSTITUTE FOR DEFENCE (STRIDE)', font_size=10, bold=True, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6)
+
+    p1 = doc.add_paragraph()
+    run1 = p1.add_run("REVIEW OF REQUEST")
+    font_settings_header(run1,font_size=Pt(12), bold=True, underline=False)
+    p1.paragraph_format.space_before = Pt(12)
+    p1.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    table = doc.add_table(rows=2, cols=2)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_table_borders(table)
+    set_column_width(table.columns[0], 4.25)
+    set_column_width(table.columns[1], 3.11)
+
+    set_cell_text(table.cell(0, 0), f'Item: {work_title}', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(0, 1), 'Date:', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 0), f'Client: {client}', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table.cell(1, 1), f'Reference No: {lab_work_no}', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+
+    p2 = doc.add_paragraph()
+    run2 = p2.add_run("")
+    font_settings_header(run2, font_size=Pt(12), bold=True, underline=False)
+    p2.paragraph_format.space_before = Pt(0)
+    p2.paragraph_format.space_after = Pt(0)
+    p2.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    table01 = doc.add_table(rows=9, cols=6)
+    table01.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_table_borders(table01)
+    set_column_width(table01.columns[0], 0.36)
+    set_column_width(table01.columns[1], 2.95)
+    set_column_width(table01.columns[2], 0.69)
+    set_column_width(table01.columns[3], 0.94)
+    set_column_width(table01.columns[4], 0.94)
+    set_column_width(table01.columns[5], 1.46)
+
+    set_cell_text(table01.cell(0, 0), 'No', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+    set_cell_text(table01.cell(0, 1), 'Required Test', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+    set_cell_text(table01.cell(0, 2), 'Test Method (√/x)', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+    set_cell_text(table01.cell(0, 3), 'Equipment\n\n (√/x)', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+    set_cell_text(table01.cell(0, 4), 'Laboratory Personnel (√/x)', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+    set_cell_text(table01.cell(0, 5), 'Environmental Condition\n (√/x)', bold=False, line_spacing_pt=12, before_spacing_pt=6,
+                  after_spacing_pt=6, alignment=WD_ALIGN_PARAGRAPH.CENTER)
+
+    # Start populating the table based on type_of_test. 1 row or 2 row.
+    row_index = 1  # Starting row index for data
+
+    # Check if any value from {I, II, III, IV} is present in type_of_test
+    if any(test in type_of_test for test in {'I', 'II', 'III', 'IV'}):
+        table01.add_row()
+        set_cell_text(table01.cell(row_index, 0), '1.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        set_cell_text(table01.cell(row_index, 1), 'Qualitative Analysis', line_spacing_pt=11, before_spacing_pt=3,
+                      after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        row_index += 1
+
+    # Check if {IV} is present in type_of_test
+    if 'IV' in type_of_test:
+        table01.add_row()
+        set_cell_text(table01.cell(row_index, 0), '2.', line_spacing_pt=11, before_spacing_pt=3, after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+        set_cell_text(table01.cell(row_index, 1), 'Quantitative Analysis', line_spacing_pt=11, before_spacing_pt=3,
+                      after_spacing_pt=3,
+                      alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    p3 = doc.add_paragraph()
+    run3 = p3.add_run("Please tick (√):")
+    font_settings_header(run3, bold=False, underline=False)
+    p3.paragraph_format.space_before = Pt(2)
+    p3.paragraph_format.space_after = Pt(0)
+    p3.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    # Define the items to add the checkbox too. We do it this way to easily add checkboxes and iterate it once...
+    # instead of re-writing several times to unnecessarily make our codes too long. This is why I comment sparingly too.
+    items = [
+        "Notify customer & proceed to the job",
+        "Reject / Feedback to customer",
+        "Subcontracting / Feedback to customer"
+    ]
+
+    # Add each item with a checkbox
+    for item in items:
+        # Create a paragraph for the item
+        paragraph = doc.add_paragraph()
+
+        # Add a small square checkbox
+        checkbox_run = paragraph.add_run()
+        font_settings_header(checkbox_run, bold=False, underline=False, font_size=Pt(20))
+        checkbox_run.add_text("☐")  # Unicode for an empty checkbox
+
+        # Add a tab space and the text
+        text_run = paragraph.add_run(f" {item}")
+        font_settings_header(text_run, bold=False, underline=False)  # Apply your font settings
+
+        # Optional: Adjust paragraph spacing
+        paragraph.paragraph_format.space_after = Pt(0)
+        paragraph.paragraph_format.space_before = Pt(0)
+        paragraph.paragraph_format.line_spacing = 1.0
+
+    p4 = doc.add_paragraph()
+    run4 = p4.add_run("Approved by:")
+    font_settings_header(run4, bold=False, underline=False)
+    p4.paragraph_format.space_before = Pt(2)
+    p4.paragraph_format.space_after = Pt(0)
+    p4.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+    table02 = doc.add_table(rows=1, cols=2)
+    table02.alignment = WD_TABLE_ALIGNMENT.CENTER
+
+    set_table_borders(table02)
+    set_column_width(table02.columns[0], 5.5)
+    set_column_width(table02.columns[1], 1.8)
+
+    set_cell_text(table02.cell(0, 0), 'Laboratory Manager/Deputy Laboratory Manager:', bold=False, line_spacing_pt=12, before_spacing_pt=12,
+                  after_spacing_pt=12, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(table02.cell(0, 1), 'Date:', bold=False, line_spacing_pt=12,
+                  before_spacing_pt=12,after_spacing_pt=12, alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    footer = doc.sections[0].footer  # Get the first section of the document
+    footer_table = footer.add_table(rows=1, cols=2, width=Inches(6))  # Access the header of the section
+    footer_table.autofit = False
+
+    # Set explicit column widths
+    column_widths = [Inches(2.08), Inches(1.44)]  # Adjust as needed
+    for col, width in zip(footer_table.columns, column_widths):
+        for cell in col.cells:
+            cell.width = width
+
+    set_cell_text(footer_table.cell(0, 0), 'STRIDE/LQP7.1/FORM 1',
+                  font_size=8, bold=False, line_spacing_pt=12, before_spacing_pt=6,after_spacing_pt=6,alignment=WD_ALIGN_PARAGRAPH.LEFT)
+    set_cell_text(footer_table.cell(0, 1), 'Issue No.: 1\nRev No.: 0\nIssue Date: 15/8/2019',
+                  font_size=8, bold=False, line_spacing_pt=12, before_spacing_pt=6, after_spacing_pt=6,alignment=WD_ALIGN_PARAGRAPH.LEFT)
+
+    return doc
@@ -0,0 +1,65 @@
+import argparse
+import os
+
+# Number format for each column that needs one. New rows get formatted as they are written,
+# old rows are normalized once with the migration command at the bottom of this file:
+#   python -m register.formats Buku_Daftar_UAT.xlsx
+COLUMN_FORMATS = {
+    "DATE RECEIVED": "dd/mm/yy",
+    "START TEST DATE": "dd/mm/yy",
+    "END TEST DATE": "dd/mm/yy",
+    "APPROVED DATE": "dd/mm/yy",
+    "REPORT RELEASE DATE": "dd/mm/yy",
+    "QUANTITY": "General",
+    "NO. OF TEST": "General",
+}
+
+
+def format_row(sheet, column_indexes, row_num):
+    # Only touch the row we just wrote. Looping the whole column on every save is O(rows)
+    for header, number_format in COLUMN_FORMATS.items():
+        if header in column_indexes:
+            sheet.cell(row=row_num, column=column_indexes[header]).number_format = number_format
+
+
+def normalize_formats(sheet, column_indexes):
+    # One-off for legacy rows. Returns how many cells actually changed
+    changed = 0
+    for header, number_format in COLUMN_FORMATS.items():
+        if header not in column_indexes:
+            continue
+        col_index = column_indexes[header]
+        for (cell,) in sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=col_index, max_col=col_index):
+            if cell.number_format != number_format:
+                cell.number_format = number_format
+                changed += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize number formats on every row of Buku Daftar (one-off migration).")
+    parser.add_argument("workbook", help="path to Buku_Daftar_UAT.xlsx")
+    args = parser.parse_args()
+
+    workbook_path = os.path.abspath(args.workbook)
+
+    # Imported here, journal itself uses format_row. openpyxl only for the migration, format_row doesn't need it
+    from openpyxl import load_workbook
+
+    from register import journal, writelock
+    with writelock.WriteLock(workbook_path):  # BD/KK may be open, they reload after we are done
+        workbook = load_workbook(workbook_path)
+        sheet = workbook.active
+        column_indexes = {cell.value: cell.column for cell in sheet[1] if cell.value}
+
+        # Pending journal rows go in first so they get normalized too
+        journal.recover(workbook, workbook_path, sheet, column_indexes)
+
+        changed = normalize_formats(sheet, column_indexes)
+        if changed:
+            workbook.save(workbook_path)
+    print(f"{changed} cell(s) reformatted in {workbook_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import queue
+import threading
+
+# Background jobs for the Tk programs. Saves (workbook.save on a big register takes seconds) and document renders
+# run on one worker thread so the window keeps repainting. Results and errors come back on the Tk thread through
+# widget.after(), Tk must never be touched from the worker:
+#
+#   jobs = JobQueue(root, on_status=show_status)
+#   jobs.submit(reg.flush, key="flush", on_done=..., on_error=...)
+#
+# Jobs run one at a time in the order submitted. A job with a key (e.g "flush") that is already waiting is not
+# queued again, the new callbacks ride along on the waiting one, so five Save clicks during a slow save give one
+# more write, not five. With supersede=True the newest submit of a key wins instead (e.g "search": only what the
+# clerk typed last is wanted), older results are never delivered. Nothing here imports Tk, widget is anything
+# with after().
+#
+# AutoSave sits on top for KK, one for the whole session: edits still go to the journal straight away (cheap, survive
+# a crash), the excelbook is written once the clerk has stopped editing for a while, instead of once per Save.
+
+POLL_MS = 50
+
+# Idle time before edits are written into the excelbook, REGISTER_AUTOSAVE_SECONDS overrides it
+AUTOSAVE_IDLE_SECONDS = 10
+
+
+def autosave_idle_seconds():
+    return float(os.environ.get("REGISTER_AUTOSAVE_SECONDS", AUTOSAVE_IDLE_SECONDS))
+
+
+class _Job:
+    def __init__(self, func, args, kwargs, key, label, on_progress):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.label = label
+        self.on_progress = on_progress
+        self.callbacks = []  # (on_done, on_error) of everyone waiting on this job
+        self.started = False
+        self.superseded = False  # A newer job with the same key was submitted, nobody wants this result
+
+
+class JobQueue:
+    def __init__(self, widget, on_status=None, poll_ms=POLL_MS):
+        self.widget = widget
+        self.on_status = on_status  # Called on the Tk thread with a status text, or None once idle
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()  # Worker -> Tk thread
+        self._waiting = {}  # key -> job not started yet, for coalescing
+        self._latest = {}  # key -> last job submitted with supersede
+        self._lock = threading.Lock()
+        self._outstanding = 0  # Submitted and not reported back yet. Only touched on the Tk thread
+        self._polling = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def busy(self):
+        return self._outstanding > 0
+
+    def submit(self, func, *args, key=None, supersede=False, label="Working", on_done=None, on_error=None,
+               on_progress=None, **kwargs):
+        # Runs func(*args, **kwargs) on the worker. Read what it needs from the widgets before submitting.
+        # on_done(result) / on_error(exception) / on_progress(done, total) run on the Tk thread.
+        # With on_progress, func gets a progress= keyword to call from the worker
+        with self._lock:
+            job = self._waiting.get(key) if key is not None else None
+            if job is not None and not job.started:
+                if supersede:
+                    # Still waiting, so it runs the new call in its place
+                    job.func, job.args, job.kwargs, job.label, job.on_progress = func, args, kwargs, label, on_progress
+                    job.callbacks = [(on_done, on_error)]
+                else:
+                    job.callbacks.append((on_done, on_error))
+                return job
+            job = _Job(func, args, kwargs, key, label, on_progress)
+            job.callbacks.append((on_done, on_error))
+            if key is not None:
+                self._waiting[key] = job
+            if supersede and key is not None:
+                previous = self._latest.get(key)
+                if previous is not None:
+                    previous.superseded = True  # Running or done already, its result is dropped
+                self._latest[key] = job
+        self._outstanding += 1
+        self._jobs.put(job)
+        self._status(label)
+        self._start_polling()
+        return job
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            with self._lock:
+                job.started = True
+                if job.key is not None and self._waiting.get(job.key) is job:
+                    del self._waiting[job.key]
+            self._results.put(("started", job, None))
+            try:
+                kwargs = dict(job.kwargs)
+                if job.on_progress:
+                    kwargs["progress"] = lambda done, total: self._results.put(("progress", job, (done, total)))
+                result = job.func(*job.args, **kwargs)
+                self._results.put(("done", job, result))
+            except Exception as e:
+                self._results.put(("error", job, e))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        # Tk thread. Hand everything the worker finished to its callbacks. A callback that raises still lets the
+        # rest come through on the next poll
+        try:
+            self._deliver()
+        finally:
+            if self._outstanding:
+                self.widget.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+                self._status(None)
+
+    def _deliver(self):
+        while True:
+            try:
+                kind, job, value = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "started":
+                self._status(job.label)
+            elif kind == "progress":
+                if not job.superseded:
+                    job.on_progress(*value)
+            else:
+                self._outstanding -= 1
+                if job.superseded:
+                    continue
+                if self._latest.get(job.key) is job:
+                    del self._latest[job.key]
+                for on_done, on_error in job.callbacks:
+                    if kind == "done" and on_done:
+                        on_done(value)
+                    elif kind == "error" and on_error:
+                        on_error(value)
+
+    def _status(self, text):
+        if self.on_status:
+            self.on_status(text)
+
+    def close(self, timeout=None):
+        # Let the queued jobs finish (the last save especially), then stop the worker. Callbacks of jobs that
+        # finish after this are not called, the window is usually gone by then
+        self._jobs.put(None)
+        self._worker.join(timeout)
+
+
+class AutoSave:
+    # Rows edited but not in the excelbook yet. mark() after each edit is journaled, the save (reg.flush) runs as
+    # the "flush" job once nothing was marked for idle_seconds, or straight away with save_now().
+    # on_change(number of unsaved rows) runs on the Tk thread, for the unsaved changes indicator
+    def __init__(self, jobs, save, idle_seconds=None, on_change=None, on_error=None):
+        self.jobs = jobs
+        self.save = save
+        self.idle_ms = int(1000 * (autosave_idle_seconds() if idle_seconds is None else idle_seconds))
+        self.on_change = on_change
+        self.on_error = on_error
+        self.dirty = {}  # row_num -> edit count, so a row edited again during a save stays dirty
+        self._edits = 0
+        self._timer = None
+
+    def mark(self, row_num):
+        self._edits += 1
+        self.dirty[row_num] = self._edits
+        self._changed()
+        self._cancel_timer()
+        self._timer = self.jobs.widget.after(self.idle_ms, self.save_now)
+
+    def save_now(self):
+        self._cancel_timer()
+        if not self.dirty:
+            return
+        saving = dict(self.dirty)
+
+        def saved(result):
+            for row_num, edit in saving.items():
+                if self.dirty.get(row_num) == edit:
+                    del self.dirty[row_num]
+            self._changed()
+
+        def failed(e):
+            # Edits stay in the journal and dirty, try again after the next idle period
+            self._cancel_timer()
+            self._timer = self.jobs.widget.after(self.idle_ms, self.save_now)
+            if self.on_error:
+                self.on_error(e)
+
+        self.jobs.submit(self.save, key="flush", label="Writing Buku Daftar", on_done=saved, on_error=failed)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self.jobs.widget.after_cancel(self._timer)
+            self._timer = None
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(len(self.dirty))
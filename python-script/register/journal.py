@@ -0,0 +1,130 @@
+import json
+import os
+
+from register import formats, protocol, refindex
+
+# Write-ahead journal for the excelbook. workbook.save rewrites the whole .xlsx zip just to change one row,
+# so every new or edited row goes to a small append-only file first (one JSON line per row) and the
+# excelbook is only saved in batch when we flush (on exit, on a timer, or when user press "Flush").
+# On startup whatever still in the journal is replayed into the sheet, so a crash never lose an entry.
+# The journal is shared: every program writing to the same excelbook appends here under the write lock and
+# reads the others' entries back, so they all agree on row numbers and reference numbers.
+# Dates are written like the service sends them ({"$datetime": iso}, register.protocol) and come back as datetimes.
+
+
+def journal_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".journal.jsonl"
+
+
+def sync_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".sync.json"
+
+
+def append_rows(workbook_path, entries, op="update"):
+    # Batch of (row_num, values), values is {header: value}. One write and one fsync for the lot, this is our
+    # crash safety.
+    # op is "append" for new rows, "update" for edits. Returns the journal size after the write.
+    # Several programs share this journal, always hold the write lock (register.writelock) around it
+    lines = "".join(json.dumps({"op": op, "row": row_num, "values": values}, default=protocol.encode_value,
+                               ensure_ascii=False) + "\n" for row_num, values in entries)
+    with open(journal_path_for(workbook_path), "a+b") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) != b"\n":
+                lines = "\n" + lines  # Torn line from a crash. Don't glue our entry onto it
+        f.write(lines.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+def read_from(workbook_path, offset=0):
+    # Entries after byte offset. Returns (entries, offset to read from next time)
+    entries = []
+    try:
+        with open(journal_path_for(workbook_path), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return entries, 0  # No journal, nothing to replay
+    for line in data.splitlines():
+        try:
+            entries.append(json.loads(line, object_hook=protocol.decode_value))
+        except ValueError:
+            pass  # Torn line from a crash mid-write. The ones around it are good
+    return entries, offset + len(data)
+
+
+def read_entries(workbook_path):
+    return read_from(workbook_path)[0]
+
+
+def size(workbook_path):
+    try:
+        return os.path.getsize(journal_path_for(workbook_path))
+    except OSError:
+        return 0
+
+
+def has_pending(workbook_path):
+    return size(workbook_path) > 0
+
+
+def clear(workbook_path):
+    # Only call after the excelbook is saved, otherwise we lose the pending rows
+    try:
+        os.remove(journal_path_for(workbook_path))
+    except FileNotFoundError:
+        pass
+
+
+def mark_saved(workbook_path, generation, journal_offset):
+    # Written after a save, before the journal is cleared. Tells the other programs which save this was
+    # (generation) and how much of the journal went into it, so they know if their copy in memory is
+    # still the same as the excelbook or they have to reload it
+    payload = {"stamp": refindex.workbook_stamp(workbook_path), "generation": generation,
+               "journal_offset": journal_offset}
+    sync_path = sync_path_for(workbook_path)
+    tmp_path = sync_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, sync_path)
+
+
+def read_saved_mark(workbook_path):
+    try:
+        with open(sync_path_for(workbook_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def extend_table(sheet, end_row, last_column=None):
+    # Stretch the excel table so the appended rows are part of it. Only one table in Buku Daftar.
+    # Pass last_column if you know it, sheet.max_column has to look at every cell
+    from openpyxl.utils.cell import range_boundaries  # Only with a loaded sheet, clients of the service don't
+
+    for table in sheet.tables.values():
+        if end_row > range_boundaries(table.ref)[3]:
+            table.ref = f"A1:{sheet.cell(row=end_row, column=last_column or sheet.max_column).coordinate}"
+        return
+
+
+def recover(workbook, workbook_path, sheet, column_indexes):
+    # For the one-off migrations (formats, convert_dates, convert_markings) that load the excelbook themselves:
+    # apply the pending rows onto the freshly loaded sheet, write them in for good, then start with an empty
+    # journal. Same row same values, so replaying twice is harmless. Clearing also drop a torn last line so new
+    # rows are not appended behind it. Register._load reads the journal itself (_catch_up)
+    entries = read_entries(workbook_path)
+    for entry in entries:
+        row_num = entry["row"]
+        for header, value in entry["values"].items():
+            if header in column_indexes:
+                sheet.cell(row=row_num, column=column_indexes[header], value=value)
+        formats.format_row(sheet, column_indexes, row_num)  # Same formatting as a freshly saved row
+    if entries:
+        extend_table(sheet, max(entry["row"] for entry in entries))
+        workbook.save(workbook_path)
+    clear(workbook_path)
+    return len(entries)
@@ -0,0 +1,79 @@
+import time
+
+from register import profiling
+
+# Startup used to do a full read-write load_workbook before any window appear, so startup time and memory
+# grow with the register. Now startup only stream the excelbook read-only (headers, reference index, last row)
+# and the full writable load is deferred until somebody really need to write or read a whole row.
+# openpyxl itself is only imported then too: BD/KK talking to register.service never open the excelbook.
+
+
+def load_workbook(path, **kwargs):
+    from openpyxl import load_workbook  # Takes a while to import, see above
+    return load_workbook(path, **kwargs)
+
+
+class LazyWorkbook:
+    def __init__(self, path):
+        self.path = path
+        self._workbook = None
+        self.full_load_seconds = None  # So we can tell how long the deferred load took
+
+    def open_read_only(self):
+        # Caller must close() it, read-only mode keeps the file handle open
+        return load_workbook(self.path, read_only=True)
+
+    @property
+    def loaded(self):
+        return self._workbook is not None
+
+    @property
+    def workbook(self):
+        if self._workbook is None:
+            start = time.perf_counter()
+            with profiling.timed("load_workbook"):
+                self._workbook = load_workbook(self.path)
+            self.full_load_seconds = time.perf_counter() - start
+        return self._workbook
+
+    @property
+    def sheet(self):
+        return self.workbook.active
+
+
+class ReadOnlySheet:
+    # Active sheet of a read-only load, opened on first use. Startup with every cache fresh never opens it.
+    # Caller must close()
+    def __init__(self, path):
+        self.path = path
+        self._workbook = None
+
+    def __getattr__(self, name):
+        if self._workbook is None:
+            with profiling.timed("open_read_only"):
+                self._workbook = load_workbook(self.path, read_only=True)
+        return getattr(self._workbook.active, name)
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+
+
+def read_header_row(sheet):
+    # Only row 1. iter_cols would materialize every column just to read its first cell
+    return list(next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ()))
+
+
+def column_reader(sheet, col_index):
+    # Values of one column from row 2 down, read in ONE pass and only if somebody ask for it
+    # (stale reference index or running number cache). Both share the same pass
+    cache = []
+
+    def read():
+        if not cache:
+            rows = sheet.iter_rows(min_row=2, max_row=sheet.max_row, min_col=col_index, max_col=col_index, values_only=True)
+            cache.append([value for (value,) in rows])
+        return cache[0]
+
+    return read
@@ -0,0 +1,116 @@
+import json
+import re
+
+# Sample markings as records. The form takes "Baju No. 3, Seluar Hitam;2" and SAMPLE MARKING keeps the readable
+# "01. baju no. 3 x 1; 02. seluar hitam x 2", but the documents used to slice the names back out of that string,
+# which broke for 10+ pieces and 100+ items. Now the entry is parsed once and the items are saved as JSON in
+# SAMPLE MARKING ITEMS next to it, which both documents read:
+#
+#   items = parse_input("Baju No. 3, Seluar Hitam;2")    # [("baju no. 3", 1), ("seluar hitam", 2)]
+#   format_items(items)                                  # "01. baju no. 3 x 1; 02. seluar hitam x 2"
+#   dumps(items)                                         # '[["baju no. 3",1],["seluar hitam",2]]'
+#   record_items(record)                                 # from the JSON, or the string for older rows
+#
+# Older rows get the column with register.convert_markings. Without it everything still works from the string.
+
+ITEMS_HEADER = "SAMPLE MARKING ITEMS"
+ITEM_SEPARATOR = "; "
+# "01. baju no. 3 x 1". Greedy name, so a name with " x 2" in it keeps it
+SAVED_ITEM = re.compile(r"^\s*\d+\.\s*(.*\S)\s+x\s+(\d+)\s*$")
+CELL_LIMIT = 32767  # Most characters Excel keeps in one cell
+
+
+def parse_input(marking_input):
+    # What the clerk typed, items separated with ',' and the quantity (if any) after ';'. [(name, qty), ...]
+    items = []
+    for item in str(marking_input).split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if ";" in item:
+            name, qty = item.split(";", 1)
+            name = name.strip()
+            qty = qty.strip()
+            qty = int(qty) if qty.isdigit() else 1  # Default quantity to 1 if not provided or invalid
+        else:
+            name = item
+            qty = 1
+        items.append((name.lower(), qty))
+    return items
+
+
+def parse_saved(sample_marking):
+    # "01. baju x 1; 02. seluar x 2" back into [(name, qty), ...]. None if it isn't in that form (typed over in KK)
+    items = []
+    for part in str(sample_marking).split(ITEM_SEPARATOR):
+        if not part.strip():
+            continue
+        match = SAVED_ITEM.match(part)
+        if match is None:
+            return None
+        items.append((match.group(1), int(match.group(2))))
+    return items
+
+
+def parse_text(sample_marking):
+    # A SAMPLE MARKING cell, saved form or typed like the form
+    if sample_marking is None:
+        return []
+    items = parse_saved(sample_marking)
+    return parse_input(sample_marking) if items is None else items
+
+
+def format_items(items):
+    # Index at least two digits. 100 and up just get longer
+    return ITEM_SEPARATOR.join(f"{str(n).zfill(2)}. {name} x {qty}" for n, (name, qty) in enumerate(items, start=1))
+
+
+def check_cell(text, header):
+    # Excel cuts a longer cell off without a word, so refuse instead. Both marking columns go through here
+    if len(text) > CELL_LIMIT:
+        raise ValueError(f"Too many sample markings for one Buku Daftar cell ({header}: {len(text)} characters, "
+                         f"at most {CELL_LIMIT})")
+    return text
+
+
+def format_cell(items):
+    # format_items for the SAMPLE MARKING cell
+    return check_cell(format_items(items), "SAMPLE MARKING")
+
+
+def dumps(items):
+    text = json.dumps([[name, qty] for name, qty in items], ensure_ascii=False, separators=(",", ":"))
+    return check_cell(text, ITEMS_HEADER)
+
+
+def loads(text):
+    # [(name, qty), ...] or None if it's not a list of items
+    try:
+        return [(str(name), int(qty)) for name, qty in json.loads(text)]
+    except (TypeError, ValueError):
+        return None
+
+
+def record_items(record):
+    # Items of one row ({header: value}), parsed when it was saved. Older rows from the SAMPLE MARKING string
+    saved = record.get(ITEMS_HEADER)
+    items = loads(saved) if saved else None
+    return parse_text(record.get("SAMPLE MARKING")) if items is None else items
+
+
+def sample_names(record):
+    # Names for the document tables, sorted like they always were
+    return sorted(name.strip().title() for name, _ in record_items(record))
+
+
+def normalize_row(values):
+    # {header: value} about to be saved. A changed SAMPLE MARKING (typed over in KK) gets its items column made
+    # again from it. The text itself is saved as the user typed it. A new dict when something changed, values is
+    # left alone
+    if "SAMPLE MARKING" not in values or ITEMS_HEADER in values:
+        return values
+    sample_marking = values["SAMPLE MARKING"]
+    if sample_marking in (None, ""):
+        return dict(values, **{ITEMS_HEADER: None})
+    check_cell(str(sample_marking), "SAMPLE MARKING")
+    return dict(values, **{ITEMS_HEADER: dumps(parse_text(sample_marking))})
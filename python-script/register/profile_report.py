@@ -0,0 +1,87 @@
+import argparse
+import glob
+import json
+import os
+import pstats
+import sys
+
+from register.profiling import DEFAULT_PROFILE_DIR, profile_dir
+
+# Reading the logs register.profiling writes (REGISTER_PROFILE=1):
+#
+#   python -m register.profile_report report                  per operation: count, total, mean, p95, max, peak memory
+#   python -m register.profile_report report some/dir a.jsonl --program BD_0.0.13
+#   python -m register.profile_report stats BD_..._4242.prof  top functions of a cProfile dump
+
+REPORT_COLUMNS = ["operation", "count", "total_s", "mean_ms", "p95_ms", "max_ms", "peak_mb"]
+
+
+def read_logs(paths):
+    # Every record of the given .jsonl files and directories
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))) if os.path.isdir(path) else [path])
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(records):
+    # [{operation, count, total_s, mean_ms, p95_ms, max_ms, peak_mb}, ...], most total time first
+    by_operation = {}
+    for record in records:
+        by_operation.setdefault(record["operation"], []).append(record)
+    rows = []
+    for operation, items in by_operation.items():
+        seconds = sorted(item["seconds"] for item in items)
+        rows.append({
+            "operation": operation,
+            "count": len(seconds),
+            "total_s": round(sum(seconds), 3),
+            "mean_ms": round(sum(seconds) * 1000 / len(seconds), 2),
+            "p95_ms": round(seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))] * 1000, 2),
+            "max_ms": round(seconds[-1] * 1000, 2),
+            "peak_mb": max(item.get("peak_mb", 0) for item in items),
+        })
+    rows.sort(key=lambda row: row["total_s"], reverse=True)
+    return rows
+
+
+def format_report(rows):
+    # Plain text table, operation left aligned, numbers right aligned
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in REPORT_COLUMNS]
+
+    def line(values):
+        return "  ".join(str(value).ljust(width) if n == 0 else str(value).rjust(width)
+                         for n, (value, width) in enumerate(zip(values, widths)))
+
+    return "\n".join([line(REPORT_COLUMNS)] + [line([row[column] for column in REPORT_COLUMNS]) for row in rows])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize register profiling logs (REGISTER_PROFILE=1).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="time and memory per operation")
+    report.add_argument("paths", nargs="*", help=f"log files or directories (default {DEFAULT_PROFILE_DIR})")
+    report.add_argument("--program", help="only this program, e.g BD_0.0.13")
+    stats = commands.add_parser("stats", help="top functions of a cProfile dump (REGISTER_PROFILE=cprofile)")
+    stats.add_argument("path", help=".prof file")
+    stats.add_argument("--limit", type=int, default=30, help="functions to show")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        pstats.Stats(args.path).sort_stats("cumulative").print_stats(args.limit)
+        return 0
+    records = [record for record in read_logs(args.paths or [profile_dir()])
+               if not args.program or record.get("program") == args.program]
+    if not records:
+        print("No profiling records found", file=sys.stderr)
+        return 1
+    print(format_report(summarize(records)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
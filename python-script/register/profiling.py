@@ -0,0 +1,147 @@
+import atexit
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+# Opt-in timing for when somebody says BD is slow. Off unless REGISTER_PROFILE is set (or a program's --profile):
+#
+#   REGISTER_PROFILE=1          one JSON line per operation: wall time and peak memory
+#   REGISTER_PROFILE=cprofile   the same, plus a cProfile dump of the main thread when the program exits
+#
+# Logs go to REGISTER_PROFILE_DIR (default ~/register_profile), one file per program run
+# (BD_0.0.13_20250314_093012_4242.jsonl). Worker processes (Generate All) inherit the setting and log their own file.
+#
+#   python -m register.profile_report report      summary per operation, see register.profile_report
+#
+# Peak memory is tracemalloc's peak above what was allocated when the operation started. tracemalloc is process
+# wide, so an operation on the job worker overlapping one on the Tk thread shares its peak. Tracing costs time,
+# compare timings of profiled runs with each other, not with unprofiled ones.
+
+PROFILE_ENV = "REGISTER_PROFILE"
+PROFILE_DIR_ENV = "REGISTER_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), "register_profile")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def enabled():
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def enable(mode="1"):
+    # For a --profile flag. Through the environment so worker processes pick it up too
+    os.environ[PROFILE_ENV] = mode
+
+
+def profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+
+
+class _Session:
+    def __init__(self):
+        directory = profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        self.program = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+        started = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.base_path = os.path.join(directory, f"{self.program}_{started}_{os.getpid()}")
+        self.log_path = self.base_path + ".jsonl"
+        self._file = open(self.log_path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._frames = threading.local()  # Operations open on this thread, innermost last
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.profiler = None
+        if os.environ.get(PROFILE_ENV) == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        atexit.register(self.close)
+
+    def stack(self):
+        if not hasattr(self._frames, "stack"):
+            self._frames.stack = []
+        return self._frames.stack
+
+    def write(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()  # A crash or a killed exe still leaves the log
+
+    def close(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.base_path + ".prof")
+            self.profiler = None
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def _get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _Session()
+        return _session
+
+
+@contextmanager
+def timed(operation, **details):
+    # with profiling.timed("workbook.save", rows=n): ...   Free when profiling is off
+    if not enabled():
+        yield
+        return
+    session = _get_session()
+    stack = session.stack()
+    current, peak = tracemalloc.get_traced_memory()
+    for frame in stack:  # The peak so far belongs to the operations already open, keep it before resetting
+        frame["peak"] = max(frame["peak"], peak)
+    tracemalloc.reset_peak()
+    frame = {"base": current, "peak": current}
+    stack.append(frame)
+    started = datetime.now()
+    start = time.perf_counter()
+    ok = True
+    try:
+        yield
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        stack.pop()
+        frame["peak"] = max(frame["peak"], peak)
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+        session.write({
+            "program": session.program,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "operation": operation,
+            "started": started.isoformat(timespec="milliseconds"),
+            "seconds": round(seconds, 6),
+            "peak_mb": round((frame["peak"] - frame["base"]) / 1e6, 3),
+            "ok": ok,
+            **details,
+        })
+
+
+def profiled(operation):
+    # Decorator version of timed()
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with timed(operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
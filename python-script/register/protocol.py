@@ -0,0 +1,72 @@
+import json
+import os
+from datetime import date, datetime
+
+# Wire format shared by register.service and register.client: one JSON object per line
+
+DEFAULT_PORT = 47613
+
+
+def service_port():
+    return int(os.environ.get("REGISTER_SERVICE_PORT", DEFAULT_PORT))
+
+
+def token_path(port):
+    # The service's session token, readable only by the user who started it. Per user on purpose, not next to
+    # the excelbook: that folder is shared with the other clerks
+    base = os.environ.get("REGISTER_SERVICE_DIR") or os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, ".sdm", f"register_service_{port}.token")
+
+
+def write_token(port, token):
+    path = token_path(port)
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.replace(tmp_path, path)
+
+
+def read_token(port):
+    try:
+        with open(token_path(port), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def remove_token(port, token):
+    # Only our own, a second service started on the same port must not remove the running one's
+    if read_token(port) == token:
+        try:
+            os.remove(token_path(port))
+        except OSError:
+            pass
+
+
+def encode_value(value):
+    # json.dumps default= hook. datetime first, it is a subclass of date
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decode_value(obj):
+    # json.loads object_hook= hook
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def dumps(message):
+    return json.dumps(message, default=encode_value, ensure_ascii=False)
+
+
+def loads(line):
+    return json.loads(line, object_hook=decode_value)
@@ -0,0 +1,85 @@
+import json
+import os
+import re
+
+# On-disk index of INTERNAL REFERENCE NUMBER -> row number. Saved next to the excelbook so KK search
+# does not have to walk the whole column for every lookup. The index remember the mtime and size of the
+# excelbook it was built from. If someone touch the excelbook outside our programs (Excel, copy from backup etc2)
+# the stamp won't match and we rebuild once.
+
+# Amended references get "-(1)", "-(2)" at the end. $ looks at the end, (\d+\) look at one or more digit after the "-"
+SUFFIX_PATTERN = re.compile(r"-\(\d+\)$")
+
+
+def normalize_reference(value):
+    return SUFFIX_PATTERN.split(str(value))[0]
+
+
+def index_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".refindex.json"
+
+
+def workbook_stamp(workbook_path):
+    # (mtime, size) of the excelbook. The one stamp every side file next to it is checked against
+    # (counters, journal sync mark, header cache, search and date indexes), so they all agree
+    stat = os.stat(workbook_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def build_index(values):
+    # values is the INTERNAL REFERENCE NUMBER column from row 2 down.
+    # One reference can sit on several rows (the amended "-(n)" ones), so we keep every row in order.
+    refs = {}
+    for row_num, value in enumerate(values, start=2):
+        if value:
+            refs.setdefault(normalize_reference(value), []).append(row_num)
+    return refs
+
+
+def save_index(workbook_path, refs):
+    # Always call this AFTER workbook.save so the stamp belongs to the file we just wrote
+    index_path = index_path_for(workbook_path)
+    payload = {"stamp": workbook_stamp(workbook_path), "refs": refs}
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, index_path)  # so a crash halfway never leave a half written index
+
+
+def load_index(workbook_path, column_values):
+    # column_values() gives the reference column, only called when we have to rebuild
+    index_path = index_path_for(workbook_path)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("stamp") == workbook_stamp(workbook_path):
+            return payload["refs"]
+    except (OSError, ValueError, KeyError):
+        pass  # Missing or broken index. Just rebuild
+
+    # Stale or missing. Build once from the sheet and persist it for the next launch
+    refs = build_index(column_values())
+    save_index(workbook_path, refs)
+    return refs
+
+
+def lookup(refs, reference_number):
+    # First row wins, same as the old top to bottom scan
+    rows = refs.get(normalize_reference(reference_number))
+    return rows[0] if rows else None
+
+
+def update_index(refs, row_num, new_value, old_value=None):
+    # Incremental update for an appended or edited row
+    if old_value:
+        old_key = normalize_reference(old_value)
+        rows = refs.get(old_key, [])
+        if row_num in rows:
+            rows.remove(row_num)
+        if not rows:
+            refs.pop(old_key, None)
+    if new_value:
+        rows = refs.setdefault(normalize_reference(new_value), [])
+        if row_num not in rows:
+            rows.append(row_num)
+            rows.sort()
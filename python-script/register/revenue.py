@@ -0,0 +1,292 @@
+import argparse
+import os
+import re
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+
+from register import analytics, dates, journal, sqlstore, writelock
+
+# Revenue totals from REVENUE/REMARKS, for finance. KK saves that column as free text ("RM 1,500.00",
+# "RM1500 inv 23/25", "Percuma", ...), so the amounts are pulled out of the text here. The register is streamed
+# once read-only (or straight from the SQLite store) and only the running totals are kept, so memory depends on
+# the number of clients and periods, not on the number of rows:
+#
+#   summary = aggregate(stream_rows("Buku_Daftar_UAT.xlsx"), RevenueParser())
+#   summary.sections()                       # by work class, by client, by period, and all three together
+#
+#   python -m register.revenue Buku_Daftar_UAT.xlsx --out revenue.xlsx
+#   python -m register.revenue Buku_Daftar_UAT.xlsx --period year --date received --out revenue.csv
+#   python -m register.revenue Buku_Daftar_UAT.xlsx --pattern "(?:RM|MYR)\s*([\d,]+(?:\.\d+)?)"
+#
+# An amount is every match of the pattern in the text added up ("RM 100 + RM 50" is 150), or the cell itself if it
+# is a number or only a number. Text with no amount in it ("Percuma", "KIV") counts as a job with no revenue and a
+# few of them are listed so somebody can check. Rows still in the journal are included.
+
+REVENUE_HEADERS = ["WORK CLASS", "CLIENT", "REVENUE/REMARKS", "DATE RECEIVED", "REPORT RELEASE DATE"]
+# Ringgit amount, the first group is the number
+DEFAULT_PATTERN = r"RM\s*([\d,]+(?:\.\d+)?)"
+PLAIN_AMOUNT = re.compile(r"^\s*([\d,]+(?:\.\d+)?)\s*$")
+PERIODS = {"month": "%Y-%m", "year": "%Y"}
+DATE_COLUMNS = {"released": "REPORT RELEASE DATE", "received": "DATE RECEIVED"}
+NO_PERIOD = "(no date)"
+NO_AMOUNT_TEXT = {"", "NA", "N/A", "-", "NIL", "TIADA"}  # Nothing to check, not an unparsed amount
+EXAMPLES_KEPT = 20
+
+SUMMARY_COLUMNS = ["jobs", "priced", "revenue"]
+MONEY_FORMAT = "#,##0.00"
+ZERO = Decimal("0.00")
+
+
+class RevenueParser:
+    # Callable: cell value -> Decimal amount, or None if there is no amount in it
+    def __init__(self, pattern=DEFAULT_PATTERN):
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        if self.pattern.groups < 1:
+            raise ValueError(f"The revenue pattern needs a group around the amount: {pattern}")
+
+    def __call__(self, value):
+        if value is None or isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return Decimal(str(value))
+        text = str(value)
+        amounts = [_amount(match.group(1)) for match in self.pattern.finditer(text)]
+        if not amounts:
+            plain = PLAIN_AMOUNT.match(text)
+            amounts = [_amount(plain.group(1))] if plain else []
+        amounts = [amount for amount in amounts if amount is not None]
+        return sum(amounts, ZERO) if amounts else None
+
+
+def _amount(text):
+    try:
+        return Decimal(text.replace(",", ""))
+    except InvalidOperation:
+        return None
+
+
+def stream_rows(register_path, headers=REVENUE_HEADERS):
+    # Yields (row_num, {header: value}) one row at a time, with the journal's pending rows on top.
+    # From the SQLite store if the register has one, otherwise the excelbook read-only
+    register_path = os.path.abspath(register_path)
+    if register_path.endswith(sqlstore.DB_SUFFIX) or os.path.exists(sqlstore.db_path_for(register_path)):
+        db_path = register_path if register_path.endswith(sqlstore.DB_SUFFIX) else sqlstore.db_path_for(register_path)
+        yield from _stream_sqlite(db_path, headers)
+        return
+
+    # Journal and excelbook read together under the lock, so a flush can't happen in between
+    with writelock.WriteLock(register_path):
+        entries = journal.read_entries(register_path)
+        workbook = load_workbook(register_path, read_only=True)
+    try:
+        sheet = workbook.active
+        header_row = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        pending = _pending_rows(entries, sheet, header_row)
+        rows = sheet.iter_rows(values_only=True)
+        positions = [(col, header) for col, header in enumerate(next(rows, ())) if header in headers]
+        last_row = 1
+        for row_num, row in enumerate(rows, start=2):
+            values = {header: row[col] if col < len(row) else None for col, header in positions}
+            if row_num in pending:
+                values.update((header, value) for header, value in pending.pop(row_num).items() if header in headers)
+            if any(value not in (None, "") for value in values.values()):
+                yield row_num, values
+            last_row = row_num
+    finally:
+        workbook.close()
+    for row_num in sorted(pending):  # Appended after the last saved row
+        if row_num > last_row:
+            values = dict.fromkeys(headers)
+            values.update((header, value) for header, value in pending[row_num].items() if header in headers)
+            yield row_num, values
+
+
+def _pending_rows(entries, sheet, header_row):
+    # {row: values} for the journal's rows, on the rows Register puts them (_catch_up, _append_target): a new row
+    # whose row holds another job now (the excelbook was edited outside BD/KK) goes to the end instead, and later
+    # edits of it follow. Only those rows of the sheet are looked at, in one extra pass and only if there are any
+    reference_col = header_row.index("INTERNAL REFERENCE NUMBER") if "INTERNAL REFERENCE NUMBER" in header_row else None
+    last_row = sheet.max_row or sum(1 for _ in sheet.iter_rows(values_only=True)) or 1  # No dimension saved: count
+    targets = {entry["row"] for entry in entries if entry.get("op") == "append" and entry["row"] <= last_row}
+    sheet_rows = {}  # row -> (reference, empty) as saved
+    if targets and reference_col is not None:
+        for row_num, row in enumerate(sheet.iter_rows(min_row=2, max_row=max(targets), values_only=True), start=2):
+            if row_num in targets:
+                reference = row[reference_col] if reference_col < len(row) else None
+                sheet_rows[row_num] = (reference, all(value in (None, "") for value in row))
+
+    pending = {}
+    moved = {}  # Register.moved_rows
+    next_row = last_row + 1
+    for entry in entries:
+        row_num = entry["row"]
+        if entry.get("op") == "append" and reference_col is not None:
+            reference, empty = sheet_rows.get(row_num, (None, True))
+            if row_num in pending:
+                reference = pending[row_num].get("INTERNAL REFERENCE NUMBER", reference)
+                empty = empty and all(value in (None, "") for value in pending[row_num].values())
+            if row_num > next_row or (reference != entry["values"].get("INTERNAL REFERENCE NUMBER") and not empty):
+                moved[row_num] = next_row
+                row_num = next_row
+        else:
+            row_num = moved.get(row_num, row_num)
+        pending.setdefault(row_num, {}).update(entry["values"])
+        next_row = max(next_row, row_num + 1)
+    return pending
+
+
+def _stream_sqlite(db_path, headers):
+    # Own connection, the cursor hands the rows over as they are read
+    conn = sqlstore.connect(db_path)
+    try:
+        known = [header for header in headers if header in sqlstore.REGISTER_HEADERS]
+        columns = ", ".join(["row_num"] + [sqlstore._quote(header) for header in known])
+        for row in conn.execute(f"SELECT {columns} FROM register ORDER BY row_num"):
+            values = dict.fromkeys(headers)
+            values.update(zip(known, (sqlstore.decode_value(value) for value in row[1:])))
+            yield row[0], values
+    finally:
+        conn.close()
+
+
+class Summary:
+    # Running totals keyed by (work class, client, period): [jobs, jobs with an amount, revenue]
+    def __init__(self, period="month", date_header="REPORT RELEASE DATE"):
+        self.period = period
+        self.date_header = date_header
+        self.totals = {}
+        self.rows = 0
+        self.unparsed = 0
+        self.examples = []  # (row_num, text) of the first few with no amount in them
+        self._periods = {}  # Date value -> period, the same date repeats on many rows
+
+    def add(self, row_num, values, amount):
+        self.rows += 1
+        key = (_text(values.get("WORK CLASS")), _text(values.get("CLIENT")), self._period(values.get(self.date_header)))
+        total = self.totals.get(key)
+        if total is None:
+            total = self.totals[key] = [0, 0, ZERO]
+        total[0] += 1
+        if amount is not None:
+            total[1] += 1
+            total[2] += amount
+        elif _text(values.get("REVENUE/REMARKS")).upper() not in NO_AMOUNT_TEXT:  # Written, but no amount in it
+            self.unparsed += 1
+            if len(self.examples) < EXAMPLES_KEPT:
+                self.examples.append((row_num, values.get("REVENUE/REMARKS")))
+
+    def _period(self, value):
+        period = self._periods.get(value)
+        if period is None:
+            parsed = dates.parse_date(value) if value not in (None, "") else None
+            period = self._periods[value] = parsed.strftime(PERIODS[self.period]) if parsed else NO_PERIOD
+        return period
+
+    def by(self, *fields):
+        # Totals rolled up on some of "workclass", "client", "period": [{field: ..., jobs, priced, revenue}, ...]
+        # sorted on the fields
+        positions = [("workclass", "client", "period").index(field) for field in fields]
+        rolled = {}
+        for key, (jobs, priced, revenue) in self.totals.items():
+            group = tuple(key[position] for position in positions)
+            total = rolled.get(group)
+            if total is None:
+                total = rolled[group] = [0, 0, ZERO]
+            total[0] += jobs
+            total[1] += priced
+            total[2] += revenue
+        return [dict(zip(fields, group), jobs=jobs, priced=priced, revenue=revenue)
+                for group, (jobs, priced, revenue) in sorted(rolled.items())]
+
+    def total(self):
+        return sum((revenue for _, _, revenue in self.totals.values()), ZERO)
+
+    def sections(self):
+        # [(title, rows, columns), ...] like register.analytics, for printing and writing
+        return [
+            ("By work class", self.by("workclass"), ["workclass"] + SUMMARY_COLUMNS),
+            ("By client", self.by("client"), ["client"] + SUMMARY_COLUMNS),
+            (f"By {self.period}", self.by("period"), ["period"] + SUMMARY_COLUMNS),
+            (f"By work class, client and {self.period}", self.by("workclass", "client", "period"),
+             ["workclass", "client", "period"] + SUMMARY_COLUMNS),
+        ]
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def aggregate(rows, parser=None, period="month", date_header="REPORT RELEASE DATE"):
+    # rows: (row_num, {header: value}) from stream_rows. One pass, returns a Summary
+    parser = parser or RevenueParser()
+    summary = Summary(period, date_header)
+    for row_num, values in rows:
+        summary.add(row_num, values, parser(values.get("REVENUE/REMARKS")))
+    return summary
+
+
+def write_xlsx(path, sections):
+    # One sheet per section, revenue as numbers so finance can keep working on it in Excel
+    workbook = Workbook(write_only=True)
+    for title, rows, columns in sections:
+        sheet = workbook.create_sheet(title[:31])  # Excel's limit for sheet names
+        sheet.append(columns)
+        for row in rows:
+            sheet.append([_money_cell(sheet, row[column]) if column == "revenue" else row[column] for column in columns])
+    tmp_path = path + ".tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _money_cell(sheet, amount):
+    cell = WriteOnlyCell(sheet, float(amount))
+    cell.number_format = MONEY_FORMAT
+    return cell
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Revenue totals from the REVENUE/REMARKS column of Buku Daftar.")
+    parser.add_argument("register", help="Buku Daftar excelbook (or its .sqlite)")
+    parser.add_argument("--period", choices=sorted(PERIODS), default="month", help="period to total by (default month)")
+    parser.add_argument("--date", choices=sorted(DATE_COLUMNS), default="released",
+                        help="date the period comes from (default released: REPORT RELEASE DATE)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN,
+                        help=f"regex for an amount in the text, first group is the number (default {DEFAULT_PATTERN})")
+    parser.add_argument("--out", help="write the tables to this .xlsx or .csv")
+    args = parser.parse_args(argv)
+
+    try:
+        revenue_parser = RevenueParser(args.pattern)
+    except (ValueError, re.error) as e:
+        print(f"Bad --pattern: {e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    summary = aggregate(stream_rows(args.register), revenue_parser, args.period, DATE_COLUMNS[args.date])
+    sections = summary.sections()
+
+    for title, rows, columns in sections[:3]:  # The full breakdown only goes to --out, it's long
+        print(title)
+        print(analytics.format_table(rows, columns) if rows else "(nothing)")
+        print()
+    print(f"Total revenue: {summary.total():,.2f}")
+    if summary.unparsed:
+        print(f"{summary.unparsed} row(s) have text but no amount in REVENUE/REMARKS, e.g:")
+        for row_num, text in summary.examples:
+            print(f"  row {row_num}: {text!r}")
+    if args.out:
+        if args.out.lower().endswith(".csv"):
+            analytics.write_csv(args.out, sections)
+        else:
+            write_xlsx(args.out, sections)
+        print(f"Written to {args.out}")
+    print(f"{summary.rows} rows in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import warnings
+
+from register import profiling
+
+# Header row of the excelbook, cached next to it (Buku_Daftar_UAT.schema.json) with the same stamp as the reference
+# index. With the schema, index and running number cache all fresh, startup does not open the excelbook at all.
+# When the stamp is off (saved in Excel, or by another program) row 1 is read again and its fingerprint tells us
+# whether the columns really changed. The headers the program wants are part of the fingerprint, so a newer BD/KK
+# that knows more columns maps them instead of trusting an older cache. Missing columns are warned about: a row saved without its TOT or
+# APPLICANT BY column just loses those values.
+
+
+class MissingColumnsWarning(UserWarning):
+    pass
+
+
+def schema_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".schema.json"
+
+
+def _header_texts(headers):
+    # Headers as they go into the cache. Empty header cells stay None
+    return [header if header is None else str(header) for header in headers]
+
+
+def fingerprint(headers, wanted):
+    payload = [headers, sorted(str(header) for header in wanted)]
+    return hashlib.sha1(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+
+def column_map(headers, wanted):
+    # {header: column number} for the headers we know
+    return {header: col for col, header in enumerate(headers, start=1) if header in wanted}
+
+
+def missing_headers(column_indexes, wanted, optional=()):
+    return [header for header in wanted if header not in column_indexes and header not in optional]
+
+
+def save_schema(workbook_path, headers, column_indexes, stamp, wanted):
+    # stamp of the excelbook the headers were read from (refindex.workbook_stamp), after any save.
+    # wanted is what column_indexes was mapped for
+    path = schema_path_for(workbook_path)
+    headers = _header_texts(headers)
+    payload = {
+        "stamp": stamp,
+        "fingerprint": fingerprint(headers, wanted),
+        "headers": headers,
+        "columns": column_indexes,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+@profiling.profiled("column_indexes")
+def load_schema(workbook_path, stamp, read_header_row, wanted, optional=()):
+    # (headers, column_indexes). read_header_row() only when the cache doesn't belong to this stamp.
+    # optional headers are mapped if they are there but not warned about
+    cached = None
+    try:
+        with open(schema_path_for(workbook_path), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("stamp") == stamp and cached.get("fingerprint") == fingerprint(cached["headers"], wanted):
+            return cached["headers"], cached["columns"]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        cached = None  # Missing or broken. Read row 1
+
+    headers = _header_texts(read_header_row())
+    if cached and cached.get("fingerprint") == fingerprint(headers, wanted):
+        column_indexes = cached["columns"]  # Saved again, same columns
+    else:
+        column_indexes = column_map(headers, wanted)
+        missing = missing_headers(column_indexes, wanted, optional)
+        if missing:
+            warnings.warn(f"Buku Daftar has no column for: {', '.join(missing)}. Those values are not saved "
+                          f"({workbook_path})", MissingColumnsWarning, stacklevel=2)
+    save_schema(workbook_path, headers, column_indexes, stamp, wanted)
+    return headers, column_indexes
@@ -0,0 +1,270 @@
+import heapq
+import json
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left, insort
+
+# Full-record search for KK: "kain biru", "stride/tal/25", "cleint 42" etc2. Inverted token index over the
+# columns below, so a search looks up a handful of tokens instead of a regex pass over every row.
+#
+#   index = build_index((row_num, record) for ...)      # record: {"CLIENT": ..., "WORK TITLE": ..., ...}
+#   index.search("baju hitam", limit=50)                 # -> [(row_num, score), ...] best first
+#
+# Every word in the query must match (AND). A word matches a token exactly, as a prefix ("jack" -> "jacket") or
+# with one typo ("cleint" -> "client", words of 4+ letters, no digits). Score adds up per word: column weight x
+# match quality x idf, so rare words and a hit in CLIENT/REPORT NUMBER count more. Ties go to the newer row.
+# Register and SqliteRegister keep an index up to date and save it next to the register.
+
+# Searched columns and their weight. Order matters, the column id is packed into the postings
+SEARCH_FIELDS = {
+    "REPORT NUMBER": 3.0,
+    "CLIENT": 3.0,
+    "CONTACT PERSON": 2.0,
+    "WORK TITLE": 1.5,
+    "SAMPLE MARKING": 1.0,
+}
+FIELD_NAMES = list(SEARCH_FIELDS)
+FIELD_WEIGHTS = list(SEARCH_FIELDS.values())
+FIELD_BITS = 3  # Postings hold row_num << 3 | column id
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_TOKENS = 200  # "c" would otherwise expand to half the vocabulary
+MIN_FUZZY_LENGTH = 4
+PREFIX_QUALITY = 0.6
+FUZZY_QUALITY = 0.4
+BISECT_RATIO = 16  # Look rows up by bisect when the candidates are this much fewer than the postings
+
+
+def search_path_for(register_path):
+    return os.path.splitext(register_path)[0] + ".search.json"
+
+
+def tokenize(text):
+    # "01. Baju No. 3 x 1" -> ["01", "baju", "no"]. Single letters/digits (the "x 1" quantities) are noise
+    if text is None:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if len(token) > 1]
+
+
+def record_tokens(record):
+    # [(token, column id), ...] once per token and column
+    pairs = []
+    for field, name in enumerate(FIELD_NAMES):
+        for token in dict.fromkeys(tokenize(record.get(name))):
+            pairs.append((token, field))
+    return pairs
+
+
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a, b):
+    # Levenshtein plus swapped neighbours ("cleint"), distance <= 1
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diffs = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diffs) == 1 or (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                                   and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _rank(item):
+    # (row_num, score): best score first, newer row first on a tie
+    return item[1], item[0]
+
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}  # token -> array of row_num << 3 | column id, ascending (rows are added in order)
+        self.last_row = 1  # Highest row in postings. Rows above it are appended, rows below are edits
+        self.row_count = 0
+        # Rows edited after they went into postings. Their postings are ignored and these count instead
+        self.edited = {}  # row_num -> [(token, column id), ...]
+        self.edited_postings = {}  # token -> {row_num: column id}
+        self.stamp = None  # What the index belongs to, see load_index
+        self._vocabulary = None  # Sorted tokens for prefix lookups, built on first use
+        self._fuzzy = None  # Token with one letter deleted -> tokens, built on first fuzzy lookup
+
+    def add(self, row_num, record):
+        # New row or new values for an existing one. record only needs the SEARCH_FIELDS
+        pairs = record_tokens(record)
+        if row_num > self.last_row:
+            for token, field in pairs:
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = array("q")
+                    self._new_token(token)
+                postings.append(row_num << FIELD_BITS | field)
+            self.last_row = row_num
+            self.row_count += 1
+            return
+        self._set_edited(row_num, pairs)
+
+    def _set_edited(self, row_num, pairs):
+        for token, _ in self.edited.pop(row_num, ()):
+            rows = self.edited_postings.get(token)
+            if rows:
+                rows.pop(row_num, None)
+        self.edited[row_num] = pairs
+        for token, field in pairs:
+            rows = self.edited_postings.setdefault(token, {})
+            if token not in self.postings and not rows:
+                self._new_token(token)
+            # Best column wins when a token sits in two columns of one row
+            if row_num not in rows or FIELD_WEIGHTS[field] > FIELD_WEIGHTS[rows[row_num]]:
+                rows[row_num] = field
+
+    def _new_token(self, token):
+        if self._vocabulary is not None:
+            insort(self._vocabulary, token)
+        if self._fuzzy is not None:
+            for variant in _deletes(token) | {token}:
+                self._fuzzy.setdefault(variant, []).append(token)
+
+    def vocabulary(self):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(set(self.postings) | set(self.edited_postings))
+        return self._vocabulary
+
+    def _fuzzy_matches(self, term):
+        if self._fuzzy is None:
+            self._fuzzy = {}
+            for token in self.vocabulary():
+                for variant in _deletes(token) | {token}:
+                    self._fuzzy.setdefault(variant, []).append(token)
+        candidates = set()
+        for variant in _deletes(term) | {term}:
+            candidates.update(self._fuzzy.get(variant, ()))
+        return [token for token in candidates if token != term and _within_one_edit(term, token)]
+
+    def _document_frequency(self, token):
+        return len(self.postings.get(token, ())) + len(self.edited_postings.get(token, ()))
+
+    def expand(self, term):
+        # Query word -> {token: match quality}
+        expansions = {}
+        if term in self.postings or self.edited_postings.get(term):
+            expansions[term] = 1.0
+        if len(term) >= MIN_PREFIX_LENGTH:
+            vocabulary = self.vocabulary()
+            i = bisect_left(vocabulary, term)
+            end = min(len(vocabulary), i + MAX_PREFIX_TOKENS)
+            while i < end and vocabulary[i].startswith(term):
+                # Scaled by how much of the token was typed, else "42" ranks a rare "42196" over an exact "42"
+                expansions.setdefault(vocabulary[i], PREFIX_QUALITY * len(term) / len(vocabulary[i]))
+                i += 1
+        if len(term) >= MIN_FUZZY_LENGTH and not any(c.isdigit() for c in term):
+            for token in self._fuzzy_matches(term):
+                expansions.setdefault(token, FUZZY_QUALITY)
+        return expansions
+
+    def _score_term(self, expansions, candidates):
+        # {row_num: best score of this query word}, only rows in candidates if given
+        scores = {}
+        edited = self.edited
+        for token, quality in expansions.items():
+            weight = quality * math.log(1 + self.row_count / (1 + self._document_frequency(token)))
+            postings = self.postings.get(token, ())
+            if candidates is not None and len(candidates) * BISECT_RATIO < len(postings):
+                # Few rows left, find them in the postings instead of walking all of it
+                for row_num in candidates:
+                    if row_num in edited:
+                        continue
+                    i = bisect_left(postings, row_num << FIELD_BITS)
+                    while i < len(postings) and postings[i] >> FIELD_BITS == row_num:
+                        score = FIELD_WEIGHTS[postings[i] & 7] * weight
+                        if score > scores.get(row_num, 0):
+                            scores[row_num] = score
+                        i += 1
+            else:
+                for code in postings:
+                    row_num = code >> FIELD_BITS
+                    if (candidates is not None and row_num not in candidates) or row_num in edited:
+                        continue
+                    score = FIELD_WEIGHTS[code & 7] * weight
+                    if score > scores.get(row_num, 0):
+                        scores[row_num] = score
+            for row_num, field in self.edited_postings.get(token, {}).items():
+                if candidates is None or row_num in candidates:
+                    score = FIELD_WEIGHTS[field] * weight
+                    if score > scores.get(row_num, 0):
+                        scores[row_num] = score
+        return scores
+
+    def search(self, query, limit=50):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        expanded = []
+        for term in terms:
+            expansions = self.expand(term)
+            if not expansions:
+                return []  # Every word has to match something
+            expanded.append(expansions)
+        # Rarest word first, the others only look at the rows it left
+        expanded.sort(key=lambda expansions: sum(self._document_frequency(token) for token in expansions))
+        scores = None
+        for expansions in expanded:
+            term_scores = self._score_term(expansions, scores)
+            scores = term_scores if scores is None else {row_num: scores[row_num] + score
+                                                         for row_num, score in term_scores.items()}
+            if not scores:
+                return []
+        if limit is None:  # Every matching row, e.g to filter a table
+            best = sorted(scores.items(), key=_rank, reverse=True)
+        else:
+            best = heapq.nlargest(limit, scores.items(), key=_rank)
+        return [(row_num, round(score, 3)) for row_num, score in best]
+
+
+def build_index(records):
+    # records: (row_num, record) in row order
+    index = SearchIndex()
+    for row_num, record in records:
+        index.add(row_num, record)
+    return index
+
+
+def save_index(path, index, stamp):
+    # stamp says what the index was built from (excelbook stamp, database change count). Checked on load
+    payload = {
+        "stamp": stamp,
+        "last_row": index.last_row,
+        "row_count": index.row_count,
+        "postings": {token: postings.tolist() for token, postings in index.postings.items()},
+        "edited": {str(row_num): pairs for row_num, pairs in index.edited.items()},
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    index.stamp = stamp
+
+
+def load_index(path):
+    # The saved index or None. Caller compares index.stamp with what it expects
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        index = SearchIndex()
+        index.postings = {token: array("q", postings) for token, postings in payload["postings"].items()}
+        index.last_row = payload["last_row"]
+        index.row_count = payload["row_count"]
+        for row_num, pairs in payload["edited"].items():
+            index._set_edited(int(row_num), [tuple(pair) for pair in pairs])
+        index.stamp = payload["stamp"]
+        return index
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,204 @@
+import argparse
+import hmac
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+
+from register import profiling
+from register.core import open_register
+from register import protocol
+from register.protocol import dumps, loads, service_port
+
+# Resident register service. Keeps Buku_Daftar_UAT.xlsx loaded so BD, KK and the launcher don't each pay for
+# python startup + load_workbook on every click. Started once by the launcher:
+#
+#   python -m register.service --register Buku_Daftar_UAT.xlsx            (local socket, 127.0.0.1:47613)
+#   python -m register.service --register Buku_Daftar_UAT.xlsx --stdio    (JSON over stdin/stdout)
+#
+# Protocol is one JSON object per line both ways:
+#   -> {"id": 1, "token": "...", "method": "find_by_reference", "params": {"reference_number": "PA/UAT/9230/25/01 (D)"}}
+#   <- {"id": 1, "ok": true, "result": 2041}
+#   <- {"id": 1, "ok": false, "error": "Invalid Work Class: X", "type": "ValueError"}
+# Methods are the Register methods in METHODS plus info, ping and shutdown. Dates go over as {"$datetime": iso}
+# or {"$date": iso}, see register.protocol. register.client is the python side of this.
+#
+# Any local program can connect to the port, so on the socket every request but ping carries the session token.
+# The service makes a new one every start and leaves it in a file only this user can read (protocol.token_path),
+# register.client picks it up from there. Documents are only written into the --output-dir folders
+# (default the Desktop doc_out_file folder BD uses), never anywhere a caller asks.
+
+FLUSH_INTERVAL_SECONDS = 60
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Desktop", "doc_out_file")
+RENDER_METHODS = {"render_work_file", "render_test_form", "render_review_of_request"}
+
+# Register methods a client may call
+METHODS = {
+    "register_entry", "register_entries", "append_entry", "allocate_reference", "reference_years", "find_by_reference",
+    "read_record", "read_rows", "column_values", "last_row", "search", "rows_between", "update_record",
+    "update_records", "update_test_dates", "has_pending", "flush", "render_work_file", "render_test_form",
+    "render_review_of_request",
+}
+
+
+class RegisterService:
+    # One Register shared by every connection. Register is not thread safe, so every call holds the lock.
+    # token None means no token is asked for (--stdio, only our parent process has the pipe)
+    def __init__(self, path, token=None, output_dirs=(DEFAULT_OUTPUT_DIR,)):
+        self.reg = open_register(path)
+        self.token = token
+        self.output_dirs = [os.path.realpath(output_dir) for output_dir in output_dirs]
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.on_shutdown = None
+
+    def info(self):
+        return {"path": self.reg.path, "headers": self.reg.headers, "column_indexes": self.reg.column_indexes,
+                "pid": os.getpid()}
+
+    def handle_line(self, line):
+        # One request line in, one response line out
+        request_id = None
+        try:
+            request = loads(line)
+            request_id = request.get("id")
+            if request.get("method") != "ping" and not self.authorized(request.get("token")):
+                raise PermissionError("Wrong or missing service token")
+            result = self.call(request.get("method"), request.get("params") or {})
+            response = {"id": request_id, "ok": True, "result": result}
+        except Exception as e:
+            response = {"id": request_id, "ok": False, "error": str(e), "type": type(e).__name__}
+        return dumps(response)
+
+    def authorized(self, token):
+        if self.token is None:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token, self.token)
+
+    def check_output(self, out_dir, name=None):
+        # Documents only go into the configured folders. name becomes part of the file name, no folders in it
+        real_dir = os.path.realpath(out_dir)
+        if not any(os.path.commonpath([real_dir, allowed]) == allowed for allowed in self.output_dirs):
+            raise PermissionError(f"Documents can only be written into {', '.join(self.output_dirs)}, not {out_dir}")
+        if name is not None and (os.path.basename(str(name)) != str(name) or str(name) in (".", "..")):
+            raise PermissionError(f"Document name can't be a path: {name}")
+
+    def call(self, method, params):
+        if method == "ping":
+            return "pong"
+        if method == "info":
+            return self.info()
+        if method == "shutdown":
+            self.shutdown()
+            return True
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}")
+        if method in RENDER_METHODS:
+            self.check_output(params.get("out_dir", ""), params.get("name"))
+        with self.lock:
+            return getattr(self.reg, method)(**params)
+
+    def flush(self):
+        # Same as BD's timer flush. A failed save (excelbook open in Excel) is retried on the next tick
+        with self.lock:
+            try:
+                self.reg.flush()
+            except Exception as e:
+                print(f"Flush failed, will retry: {e}", file=sys.stderr)
+
+    def flush_periodically(self, interval):
+        while not self.stopped.wait(interval):
+            self.flush()
+
+    def shutdown(self):
+        self.stopped.set()
+        self.flush()
+        if self.on_shutdown:
+            # socketserver.shutdown() waits for serve_forever, so not from the handler thread
+            threading.Thread(target=self.on_shutdown, daemon=True).start()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write((self.server.service.handle_line(line.decode("utf-8")) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True  # No allow_reuse_address: on Windows it lets a second service bind the same port
+
+
+def serve_socket(service, port):
+    # Localhost only, this is not meant for the network
+    with _Server(("127.0.0.1", port), _Handler) as server:
+        server.service = service
+        service.on_shutdown = server.shutdown
+        print(f"Register service for {service.reg.path} on 127.0.0.1:{port}", file=sys.stderr, flush=True)
+        server.serve_forever()
+
+
+def serve_stdio(service):
+    # For a parent process that talks to us through a pipe (e.g the launcher). Ends when stdin closes
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        sys.stdout.write(service.handle_line(line) + "\n")
+        sys.stdout.flush()
+        if service.stopped.is_set():
+            break
+
+
+def _port_taken(port):
+    with socket.socket() as probe:
+        return probe.connect_ex(("127.0.0.1", port)) == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep Buku Daftar loaded and serve it to BD, KK and the launcher.")
+    parser.add_argument("--register", default="Buku_Daftar_UAT.xlsx", help="Buku Daftar excelbook")
+    parser.add_argument("--port", type=int, default=service_port(), help="Local port (default %(default)s)")
+    parser.add_argument("--stdio", action="store_true", help="Talk JSON over stdin/stdout instead of a socket")
+    parser.add_argument("--output-dir", action="append", dest="output_dirs",
+                        help=f"Folder documents may be written into, can be given more than once "
+                             f"(default {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_SECONDS,
+                        help="Seconds between writes of the journal into the excelbook")
+    parser.add_argument("--profile", nargs="?", const="1", choices=["1", "cprofile"],
+                        help="Log time and memory per operation, see register.profiling")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable(args.profile)
+
+    if not args.stdio and _port_taken(args.port):
+        # One service per port. The launcher starting it twice is harmless
+        print(f"Register service already running on 127.0.0.1:{args.port}", file=sys.stderr)
+        return 1
+
+    token = None if args.stdio else secrets.token_urlsafe(32)
+    service = RegisterService(args.register, token, args.output_dirs or [DEFAULT_OUTPUT_DIR])
+    # Pay for the full load now, not on the first request
+    service.reg.next_row
+    threading.Thread(target=service.flush_periodically, args=(args.flush_interval,), daemon=True).start()
+    try:
+        if args.stdio:
+            serve_stdio(service)
+        else:
+            protocol.write_token(args.port, token)
+            serve_socket(service, args.port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stopped.set()
+        service.flush()
+        if token:
+            protocol.remove_token(args.port, token)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,664 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import warnings
+import zipfile
+from contextlib import contextmanager
+from functools import wraps
+from datetime import date, datetime, timedelta
+from xml.etree import ElementTree
+
+from register import counter, dates, formats, journal, lazybook, marking, profiling, refindex, search, templates, writelock
+from register.core import OPTIONAL_HEADERS, REGISTER_HEADERS, TEST_DATE_HEADERS, next_reference, normalize_row
+
+# Optional SQLite store for Buku Daftar. The excelbook is a linear scan for everything once it gets big, SQLite
+# keeps the same columns with indexes on the ones we search. Move the register in once:
+#
+#   python -m register.sqlstore import Buku_Daftar_UAT.xlsx     -> Buku_Daftar_UAT.sqlite next to it
+#   python -m register.sqlstore export Buku_Daftar_UAT.xlsx     (rewrite the excelbook from the database now)
+#
+# From then on open_register("Buku_Daftar_UAT.xlsx") gives a SqliteRegister (same methods as Register) and the
+# excelbook is only an export for people who still open it in Excel: flush() writes the rows the excelbook doesn't
+# have yet into it, its other sheets, column widths, styles and freeze panes stay. Edits made in Excel are not
+# merged back. If the excelbook was saved by someone else
+# since our last export, flush refuses to overwrite it until it is imported again (or exported with --force).
+# Delete the .sqlite to go back to the excelbook.
+#
+# Rows keep their Excel row number (row_num), so "row 2041" means the same thing in BD, KK and the export.
+# Dates are stored as ISO text (2025-03-14T00:00:00) so they sort and come back as datetimes.
+# SQLite does its own locking between programs. Keep the .sqlite on a local disk or a share with proper locking.
+
+DB_SUFFIX = ".sqlite"
+
+# Columns with an index. INTERNAL REFERENCE NUMBER lookups go through reference_key (amended "-(n)" cut off).
+# The date columns are for rows_between
+INDEXED_HEADERS = ["INTERNAL REFERENCE NUMBER", "REPORT NUMBER", "CLIENT"] + dates.DATE_HEADERS
+
+ISO_DATETIME = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?$")
+
+DEFAULT_TABLE = {"name": "Table1", "style": "TableStyleMedium2"}
+
+
+def db_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + DB_SUFFIX
+
+
+def _quote(header):
+    return '"' + str(header).replace('"', '""') + '"'
+
+
+def encode_value(value):
+    # Cell value -> something SQLite stores
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)  # time, timedelta etc2, Buku Daftar doesn't really have these
+
+
+def decode_value(value):
+    if isinstance(value, str) and ISO_DATETIME.match(value):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def connect(db_path):
+    # Autocommit connection, writes open their own transaction (see SqliteRegister._write).
+    # check_same_thread is off for the register service, it already serializes calls
+    conn = sqlite3.connect(db_path, timeout=writelock.LOCK_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+    # Rollback journal (WAL needs shared memory, no good on a shared drive), but kept between commits instead of
+    # created and deleted for every row. That alone was ~40ms of each commit
+    conn.execute("PRAGMA journal_mode=PERSIST")
+    columns = ", ".join(_quote(header) for header in REGISTER_HEADERS)
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, running INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS register (row_num INTEGER PRIMARY KEY, reference_key TEXT, change_seq INTEGER, {columns});
+        CREATE INDEX IF NOT EXISTS register_reference_key ON register (reference_key, row_num);
+    """)
+    existing = {column[1] for column in conn.execute("PRAGMA table_info(register)")}
+    if "change_seq" not in existing:
+        conn.execute("ALTER TABLE register ADD COLUMN change_seq INTEGER")  # Databases made before search
+    for header in REGISTER_HEADERS:
+        if header not in existing:
+            conn.execute(f"ALTER TABLE register ADD COLUMN {_quote(header)}")  # Columns added since (marking items)
+    # change_seq is the change that last wrote the row, so the search index can pick up just those
+    conn.execute("CREATE INDEX IF NOT EXISTS register_change_seq ON register (change_seq)")
+    for header in INDEXED_HEADERS:
+        index_name = "register_" + re.sub(r"\W+", "_", header.lower())
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON register ({_quote(header)})")
+    return conn
+
+
+def _read_table_style(workbook_path):
+    # Name and style of the excel table, so the export looks the same. Read-only mode can't see tables,
+    # so straight from the xlsx zip instead of a full load
+    try:
+        with zipfile.ZipFile(workbook_path) as archive:
+            for name in archive.namelist():
+                if name.startswith("xl/tables/") and name.endswith(".xml"):
+                    root = ElementTree.fromstring(archive.read(name))
+                    style = root.find("{*}tableStyleInfo")
+                    return {"name": root.get("displayName") or DEFAULT_TABLE["name"],
+                            "style": style.get("name") if style is not None else None}
+    except (OSError, zipfile.BadZipFile, ElementTree.ParseError):
+        pass
+    return dict(DEFAULT_TABLE)
+
+
+def _with_optional(headers):
+    # The export gets the optional columns too, so the excelbook has them from the next export on
+    return list(headers) + [header for header in OPTIONAL_HEADERS if header not in headers]
+
+
+def _locked(method):
+    # One connection shared by the window and its background saves (register.jobs). A thread inside a
+    # transaction must not have the other one's statements land in it, so calls take turns
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class SqliteRegister:
+    # Same methods as core.Register. workbook_path is the excelbook we export to (None: no export)
+    def __init__(self, db_path, workbook_path=None):
+        self.db_path = os.path.abspath(db_path)
+        self.workbook_path = os.path.abspath(workbook_path) if workbook_path else None
+        self.path = self.workbook_path or self.db_path  # What the service and connect_register compare
+        self.reload_count = 0
+        self.conn = connect(self.db_path)
+        self.lock = threading.RLock()
+        self._search = None  # Search index, loaded or built on the first search
+        self._export_book = None  # (path, stamp, workbook) of the last export, the next one only writes the changes
+        self.markings_left = []  # [(row, why)] import_workbook brought in without marking items
+        self.headers = _with_optional(self._meta("headers") or REGISTER_HEADERS)
+        self.column_indexes = {header: col for col, header in enumerate(self.headers, start=1) if header in REGISTER_HEADERS}
+
+    def _meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    @contextmanager
+    def _write(self):
+        # One transaction per call. IMMEDIATE takes SQLite's write lock up front, so allocating a reference and
+        # inserting its row can't interleave with another program doing the same
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            raise writelock.RegisterLockedError(f"Buku Daftar is busy (locked by another program): {self.db_path}") from e
+        try:
+            self._change_seq = self._meta("changes", 0) + 1
+            yield
+            self._set_meta("changes", self._change_seq)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _load_counters(self):
+        return dict(self.conn.execute("SELECT key, running FROM counters"))
+
+    def _save_counters(self, counters):
+        self.conn.executemany("INSERT OR REPLACE INTO counters (key, running) VALUES (?, ?)", counters.items())
+
+    def _put_row(self, row_num, values, counters):
+        # Insert or update one row (only the columns given) and keep the running numbers in step
+        values = normalize_row({header: value for header, value in values.items() if header in REGISTER_HEADERS})
+        params = {_quote(header): encode_value(value) for header, value in values.items()}
+        if "INTERNAL REFERENCE NUMBER" in values:
+            reference = values["INTERNAL REFERENCE NUMBER"]
+            params["reference_key"] = refindex.normalize_reference(reference) if reference else None
+            counter.record_reference(counters, reference)
+        params["change_seq"] = self._change_seq
+        columns = ", ".join(params)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in params)
+        self.conn.execute(
+            f"INSERT INTO register (row_num, {columns}) VALUES (?{', ?' * len(params)}) "
+            f"ON CONFLICT (row_num) DO UPDATE SET {updates}",
+            [row_num, *params.values()])
+
+    @property
+    def next_row(self):
+        return self.conn.execute("SELECT COALESCE(MAX(row_num), 1) + 1 FROM register").fetchone()[0]
+
+    def refresh(self):
+        pass  # Every call reads the database, nothing cached to pick up
+
+    @_locked
+    def allocate_reference(self, workclass, suffix=None, year=None):
+        return next_reference(self._load_counters(), workclass, suffix, year)
+
+    @_locked
+    def reference_years(self):
+        return counter.counter_years(self._load_counters())
+
+    def append_entry(self, row_values):
+        return self.append_entries([row_values])[0]
+
+    @_locked
+    def append_entries(self, rows):
+        with self._write():
+            return self._append(rows)
+
+    def _append(self, rows):
+        counters = self._load_counters()
+        first_row = self.next_row
+        for n, row_values in enumerate(rows):
+            self._put_row(first_row + n, row_values, counters)
+        self._save_counters(counters)
+        return list(range(first_row, first_row + len(rows)))
+
+    def register_entry(self, row_values, workclass, suffix=None):
+        return self.register_entries([(row_values, workclass, suffix)])[0]
+
+    @_locked
+    def register_entries(self, prepared):
+        # Allocating and inserting happen in one transaction, a failure rolls both back
+        with self._write():
+            counters = self._load_counters()
+            rows = []
+            references = []
+            for row_values, workclass, suffix in prepared:
+                reference = next_reference(counters, workclass, suffix)
+                counter.record_reference(counters, reference)
+                rows.append(dict(row_values, **{"INTERNAL REFERENCE NUMBER": reference}))
+                references.append(reference)
+            return list(zip(self._append(rows), references))
+
+    @_locked
+    def find_by_reference(self, reference_number):
+        row = self.conn.execute("SELECT row_num FROM register WHERE reference_key = ? ORDER BY row_num LIMIT 1",
+                                (refindex.normalize_reference(reference_number),)).fetchone()
+        return row[0] if row else None
+
+    @_locked
+    def search(self, query, limit=50):
+        # Rows matching every word of query in the searched columns, best first: [(row number, score), ...]
+        return self.search_index.search(query, limit)
+
+    @property
+    @_locked
+    def search_index(self):
+        # Saved or built once, then only the rows written since (by us or another program) are re-read
+        changes = self._meta("changes", 0)
+        if self._search is None:
+            index = search.load_index(search.search_path_for(self.db_path))
+            if index is not None and isinstance(index.stamp, int) and index.stamp <= changes:
+                self._search = index
+        if self._search is None or self._search.stamp < self._meta("imported_changes", 0):
+            # First time, or the whole register was imported again since (rows may be gone)
+            self._search = search.build_index(self._search_rows())
+            search.save_index(search.search_path_for(self.db_path), self._search, changes)
+        elif self._search.stamp != changes:
+            for row_num, record in self._search_rows(self._search.stamp):
+                self._search.add(row_num, record)
+            self._search.stamp = changes
+        return self._search
+
+    def _search_rows(self, since=None):
+        columns = ", ".join(_quote(header) for header in search.SEARCH_FIELDS)
+        where = "" if since is None else f"WHERE change_seq > {int(since)}"
+        for row in self.conn.execute(f"SELECT row_num, {columns} FROM register {where} ORDER BY row_num"):
+            yield row[0], dict(zip(search.SEARCH_FIELDS, row[1:]))
+
+    @_locked
+    def read_record(self, row_num):
+        cursor = self.conn.execute("SELECT * FROM register WHERE row_num = ?", (row_num,))
+        row = cursor.fetchone()
+        values = dict(zip([column[0] for column in cursor.description], row)) if row else {}
+        return {header: decode_value(values.get(header)) for header in self.headers if header}
+
+    @_locked
+    def last_row(self):
+        return self.next_row - 1
+
+    @_locked
+    def read_rows(self, row_nums, headers):
+        # A few columns of many rows, e.g one page of a table: [[value, ...], ...] in row_nums order
+        known = [header for header in headers if header in REGISTER_HEADERS]
+        columns = ", ".join(["row_num"] + [_quote(header) for header in known])
+        cursor = self.conn.execute(f"SELECT {columns} FROM register WHERE row_num IN (SELECT value FROM json_each(?))",
+                                   (json.dumps(list(row_nums)),))
+        found = {row[0]: dict(zip(known, row[1:])) for row in cursor}
+        return [[decode_value(found.get(row_num, {}).get(header)) for header in headers] for row_num in row_nums]
+
+    @_locked
+    def column_values(self, header, row_nums=None):
+        # One column as [[row_num, value], ...], every row if row_nums is None. Sorting is left to the caller,
+        # dates are still text in older rows
+        column = _quote(header) if header in REGISTER_HEADERS else "NULL"
+        if row_nums is None:
+            cursor = self.conn.execute(f"SELECT row_num, {column} FROM register ORDER BY row_num")
+        else:
+            cursor = self.conn.execute(f"SELECT row_num, {column} FROM register WHERE row_num IN (SELECT value FROM json_each(?))",
+                                       (json.dumps(list(row_nums)),))
+        found = dict(cursor)
+        if row_nums is None:
+            return [[row_num, decode_value(value)] for row_num, value in found.items()]
+        return [[row_num, decode_value(found.get(row_num))] for row_num in row_nums]
+
+    @_locked
+    def rows_between(self, header, first, last):
+        # Rows whose date column is first .. last, both inclusive, in date order. Dates are ISO text, so this is a
+        # range on the column's index. Text that is not a date ("NA") never falls in the range
+        if header not in REGISTER_HEADERS:
+            return []
+        first = dates.parse_date(first)
+        last = dates.parse_date(last)
+        if first is None or last is None:
+            return []
+        start = datetime(first.year, first.month, first.day).isoformat()
+        end = (datetime(last.year, last.month, last.day) + timedelta(days=1)).isoformat()
+        column = _quote(header)
+        return [row[0] for row in self.conn.execute(
+            f"SELECT row_num FROM register WHERE {column} >= ? AND {column} < ? ORDER BY {column}, row_num", (start, end))]
+
+    @_locked
+    def convert_dates(self, dry_run=False):
+        # One-off for databases imported before dates were typed: date text -> ISO datetimes, in one transaction.
+        # Returns (cells converted, [(row, header, text) left as text]), same as register.convert_dates
+        columns = ", ".join(_quote(header) for header in dates.DATE_HEADERS)
+        updates = {}
+        left = []
+        for row in self.conn.execute(f"SELECT row_num, {columns} FROM register ORDER BY row_num"):
+            for header, value in zip(dates.DATE_HEADERS, row[1:]):
+                if not isinstance(value, str) or ISO_DATETIME.match(value):
+                    continue
+                parsed = dates.parse_date(value)
+                if parsed is not None:
+                    updates.setdefault(row[0], {})[header] = parsed
+                elif not dates.is_no_date(value):
+                    left.append((row[0], header, value))
+        if updates and not dry_run:
+            with self._write():
+                counters = self._load_counters()
+                for row_num, values in updates.items():
+                    self._put_row(row_num, values, counters)
+        return sum(len(values) for values in updates.values()), left
+
+    def update_record(self, row_num, values):
+        self.update_records([(row_num, values)])
+
+    @_locked
+    def update_records(self, updates):
+        # Many rows in one transaction
+        with self._write():
+            counters = self._load_counters()
+            for row_num, values in updates:
+                self._put_row(row_num, values, counters)
+            self._save_counters(counters)
+
+    def update_test_dates(self, row_num, start_test_date, end_test_date, approved_date, release_date,
+                          lab_personnel, revenue_remarks):
+        values = [start_test_date, end_test_date, approved_date, release_date, lab_personnel, revenue_remarks]
+        self.update_record(row_num, dict(zip(TEST_DATE_HEADERS, values)))
+
+    @_locked
+    def has_pending(self):
+        # Changes the excelbook doesn't have yet
+        return bool(self.workbook_path) and self._meta("changes", 0) != self._meta("exported_changes", 0)
+
+    @_locked
+    def flush(self):
+        # Rewrite the excelbook export if it is behind. Same contract as Register.flush
+        if not self.has_pending():
+            return False
+        self.export()
+        if self._search is not None:
+            index = self.search_index
+            search.save_index(search.search_path_for(self.db_path), index, index.stamp)
+        return True
+
+    @_locked
+    @profiling.profiled("sqlite_export")
+    def export(self, workbook_path=None, force=False):
+        # Database -> excelbook. Returns the number of rows written
+        workbook_path = os.path.abspath(workbook_path or self.workbook_path)
+        with writelock.WriteLock(workbook_path):
+            exported_stamp = self._meta("exported_stamp")
+            stamp = refindex.workbook_stamp(workbook_path) if os.path.exists(workbook_path) else None
+            if not force and workbook_path == self.workbook_path and exported_stamp and stamp and stamp != exported_stamp:
+                raise RuntimeError(f"{os.path.basename(workbook_path)} was changed outside BD/KK since the last export. "
+                                   f"Import it again (python -m register.sqlstore import) or export with --force.")
+            # Our own last export only needs the rows written since, anything else gets every row
+            since = (self._meta("exported_changes", 0)
+                     if workbook_path == self.workbook_path and stamp and stamp == exported_stamp else None)
+
+            # One read transaction so the rows and the change count belong together
+            self.conn.execute("BEGIN")
+            try:
+                changes = self._meta("changes", 0)
+                where = "" if since is None else f"WHERE change_seq > {int(since)}"
+                rows = self.conn.execute(
+                    f"SELECT row_num, {', '.join(_quote(header) for header in REGISTER_HEADERS)} FROM register "
+                    f"{where} ORDER BY row_num").fetchall()
+                references = self.conn.execute(
+                    f"SELECT row_num, {_quote('INTERNAL REFERENCE NUMBER')} FROM register ORDER BY row_num").fetchall()
+                counters = self._load_counters()
+            finally:
+                self.conn.execute("COMMIT")
+
+            last_row = references[-1][0] if references else 1
+            if stamp:
+                self._write_into(workbook_path, stamp, rows, last_row, every_row=since is None)
+            else:
+                self._write_new(workbook_path, rows)
+
+            # Keep the excelbook's index and counter cache warm, in case somebody goes back to it.
+            # Reference column from row 2 down, gaps stay gaps
+            by_row = dict(references)
+            column = [by_row.get(row_num) for row_num in range(2, last_row + 1)]
+            refindex.save_index(workbook_path, refindex.build_index(column))
+            counter.save_counters(workbook_path, counters, *counter.column_tail(column))
+            if workbook_path == self.workbook_path:
+                with self._write_meta():
+                    self._set_meta("exported_changes", changes)
+                    self._set_meta("exported_stamp", refindex.workbook_stamp(workbook_path))
+            return len(rows)
+
+    def _write_into(self, workbook_path, stamp, rows, last_row, every_row):
+        # Rows written into the excelbook that is there, so whatever else people keep in it stays. The full load
+        # is the slow part, so the workbook of our last export is kept for the next one. register.bench, 10000 rows:
+        # new excelbook (write-only) 1.6s, first flush into it 3.0s, later flushes 1.7s (same as Register.flush)
+        cached = self._export_book
+        if cached and cached[:2] == (workbook_path, stamp) and not every_row:
+            workbook = cached[2]
+        else:
+            self._export_book = None
+            workbook = lazybook.load_workbook(workbook_path)
+        title = self._meta("sheet_title")
+        sheet = workbook[title] if title in workbook.sheetnames else workbook.active
+        for col, header in enumerate(self.headers, start=1):
+            sheet.cell(row=1, column=col, value=header)
+
+        positions = [(col, REGISTER_HEADERS.index(header) + 1) for col, header in enumerate(self.headers, start=1)
+                     if header in REGISTER_HEADERS]
+        written = set()
+        for row in rows:
+            for col, position in positions:
+                sheet.cell(row=row[0], column=col, value=decode_value(row[position]))
+            formats.format_row(sheet, self.column_indexes, row[0])  # Same formatting as a freshly saved row
+            written.add(row[0])
+        if every_row:
+            # Rows the database doesn't have (gaps, or added in Excel before a --force) are emptied or cut off
+            for row_num in range(2, last_row + 1):
+                if row_num not in written:
+                    for col, _ in positions:
+                        sheet.cell(row=row_num, column=col, value=None)
+            if sheet.max_row > last_row:
+                sheet.delete_rows(last_row + 1, sheet.max_row - last_row)
+        self._fit_table(sheet, last_row)
+
+        tmp_path = workbook_path + ".tmp"  # Same swap as Register.flush
+        try:
+            workbook.save(tmp_path)
+            os.replace(tmp_path, workbook_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if workbook_path == self.workbook_path:
+            self._export_book = (workbook_path, refindex.workbook_stamp(workbook_path), workbook)
+
+    def _fit_table(self, sheet, last_row):
+        # The excel table over every export column and row. The optional columns get their table column
+        from openpyxl.utils import get_column_letter  # openpyxl is only imported to export, BD/KK may never need it
+        from openpyxl.worksheet.table import TableColumn
+
+        ref = f"A1:{get_column_letter(len(self.headers))}{max(last_row, 2)}"
+        for table in sheet.tables.values():  # Only one table in Buku Daftar
+            for n in range(len(table.tableColumns) + 1, len(self.headers) + 1):
+                table.tableColumns.append(TableColumn(id=n, name=self._table_column_name(n)))
+            table.ref = ref
+            return
+        sheet.add_table(self._new_table(ref))
+
+    def _table_column_name(self, n):
+        header = self.headers[n - 1]
+        return str(header) if header else f"Column{n}"
+
+    def _new_table(self, ref):
+        from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo  # See _fit_table
+
+        table_style = self._meta("table") or DEFAULT_TABLE
+        table = Table(displayName=table_style["name"], ref=ref)
+        table.tableColumns = [TableColumn(id=n, name=self._table_column_name(n)) for n in range(1, len(self.headers) + 1)]
+        if table_style.get("style"):
+            table.tableStyleInfo = TableStyleInfo(name=table_style["style"], showRowStripes=True)
+        return table
+
+    def _write_new(self, workbook_path, rows):
+        # No excelbook yet: every row in one write-only pass
+        from openpyxl import Workbook  # See _fit_table
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self._meta("sheet_title") or "Sheet1")
+        sheet.append(self.headers)
+        positions = [(REGISTER_HEADERS.index(header) + 1 if header in REGISTER_HEADERS else None,
+                      formats.COLUMN_FORMATS.get(header)) for header in self.headers]
+        next_row = 2
+        for row in rows:
+            while next_row < row[0]:  # Gaps stay gaps, row numbers must not shift
+                sheet.append([])
+                next_row += 1
+            cells = []
+            for position, number_format in positions:
+                value = decode_value(row[position]) if position else None
+                if number_format and value is not None:
+                    cell = WriteOnlyCell(sheet, value)
+                    cell.number_format = number_format
+                    value = cell
+                cells.append(value)
+            sheet.append(cells)
+            next_row += 1
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # openpyxl warns about table columns in write-only mode even when they are set
+            sheet.add_table(self._new_table(f"A1:{get_column_letter(len(self.headers))}{max(next_row - 1, 2)}"))
+        tmp_path = workbook_path + ".tmp"
+        try:
+            workbook.save(tmp_path)
+            os.replace(tmp_path, workbook_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def _write_meta(self):
+        # Bookkeeping only, does not count as a change
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def render_work_file(self, row_num, out_dir, name=None):
+        return templates.render_work_file(self.read_record(row_num), out_dir, name)
+
+    def render_test_form(self, row_num, out_dir, logo_path, name=None):
+        return templates.render_test_form(self.read_record(row_num), out_dir, logo_path, name)
+
+    def render_review_of_request(self, row_num, out_dir, logo_path, name=None):
+        return templates.render_review_of_request(self.read_record(row_num), out_dir, logo_path, name)
+
+    def close(self):
+        self.conn.close()
+
+
+def _import_row(reg, row_num, values, counters):
+    try:
+        reg._put_row(row_num, values, counters)
+    except ValueError as e:
+        # A legacy SAMPLE MARKING whose items don't fit one cell. One row must not stop the whole import: the text
+        # goes in as it is, without items, and is listed (reg.markings_left)
+        reg._put_row(row_num, dict(values, **{marking.ITEMS_HEADER: None}), counters)
+        reg.markings_left.append((row_num, str(e)))
+
+
+def import_workbook(workbook_path, db_path=None, force=False):
+    # Excelbook plus its pending journal rows -> SQLite, replacing what the database had.
+    # Refuses to throw away database changes that never made it into the excelbook unless force.
+    # Rows brought in without their marking items end up in reg.markings_left
+    workbook_path = os.path.abspath(workbook_path)
+    reg = SqliteRegister(db_path or db_path_for(workbook_path), workbook_path)
+    if not force and reg.has_pending():
+        reg.close()
+        raise ValueError(f"{reg.db_path} has changes that are not in the excelbook yet. Export first or use --force.")
+
+    with writelock.WriteLock(workbook_path):  # Nobody writing the excelbook or its journal while we read them
+        pending = journal.read_entries(workbook_path)
+        workbook = lazybook.load_workbook(workbook_path, read_only=True)
+        try:
+            sheet = workbook.active
+            headers = _with_optional(lazybook.read_header_row(sheet))
+            sheet_title = sheet.title
+            positions = [(col, header) for col, header in enumerate(headers) if header in REGISTER_HEADERS]
+            with reg._write():
+                reg.conn.execute("DELETE FROM register")
+                reg.conn.execute("DELETE FROM counters")
+                counters = {}
+                for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+                    values = {header: row[col] for col, header in positions if col < len(row)}
+                    if any(value not in (None, "") for value in values.values()):
+                        _import_row(reg, row_num, values, counters)
+                for entry in pending:
+                    _import_row(reg, entry["row"], entry["values"], counters)
+                reg._save_counters(counters)
+                reg._set_meta("headers", headers)
+                reg._set_meta("sheet_title", sheet_title)
+                reg._set_meta("table", _read_table_style(workbook_path))
+                reg._set_meta("imported_changes", reg._change_seq)
+        finally:
+            workbook.close()
+
+        # The database has everything now. Journal rows go back into the excelbook with the next export
+        journal.clear(workbook_path)
+        with reg._write_meta():
+            reg._set_meta("exported_stamp", refindex.workbook_stamp(workbook_path))
+            if not pending:
+                reg._set_meta("exported_changes", reg._meta("changes", 0))
+    reg.headers = headers
+    reg.column_indexes = {header: col for col, header in enumerate(headers, start=1) if header in REGISTER_HEADERS}
+    return reg
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move Buku Daftar into SQLite and keep the excelbook in sync.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="Excelbook (and its pending journal) -> SQLite")
+    import_parser.add_argument("workbook", help="path to Buku_Daftar_UAT.xlsx")
+    import_parser.add_argument("--db", help="database (default: Buku_Daftar_UAT.sqlite next to the excelbook)")
+    import_parser.add_argument("--force", action="store_true", help="replace a database with unexported changes")
+    export_parser = subparsers.add_parser("export", help="SQLite -> excelbook")
+    export_parser.add_argument("workbook", help="path to Buku_Daftar_UAT.xlsx")
+    export_parser.add_argument("--db", help="database (default: Buku_Daftar_UAT.sqlite next to the excelbook)")
+    export_parser.add_argument("--force", action="store_true", help="overwrite an excelbook edited outside BD/KK")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or db_path_for(args.workbook)
+    start = time.perf_counter()
+    try:
+        if args.command == "import":
+            reg = import_workbook(args.workbook, db_path, force=args.force)
+            count = reg.next_row - 2
+            action = f"imported into {reg.db_path}"
+            left = reg.markings_left
+        else:
+            if not os.path.exists(db_path):
+                print(f"No database at {db_path}, import the excelbook first", file=sys.stderr)
+                return 1
+            reg = SqliteRegister(db_path, args.workbook)
+            count = reg.export(force=args.force)
+            action = f"exported to {reg.workbook_path}"
+            left = []
+    except (ValueError, RuntimeError, writelock.RegisterLockedError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    reg.close()
+    print(f"{count} rows {action} in {time.perf_counter() - start:.2f}s")
+    if left:
+        print(f"{len(left)} row(s) without {marking.ITEMS_HEADER}, their SAMPLE MARKING stays as text:")
+        for row_num, reason in left:
+            print(f"  row {row_num}: {reason}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import io
+import os
+import re
+import zipfile
+from collections import OrderedDict
+
+from register import dates, marking, profiling
+
+# Template rendering for the three documents. The layout (tables, borders, widths, logo etc2) is built once by
+# register.documents with placeholders like {{CLIENT}} instead of the data, and kept as a docx skeleton.
+# Rendering a row then only puts the values into word/document.xml and writes the zip. The runs are written the
+# way python-docx writes them, so that document.xml is the same as the one register.documents makes for the row.
+#
+# The layout is not the same for every row: the number of sample names, which tests are ticked and the logo
+# change it. Each of those shapes gets its own skeleton, built the first time it is needed, so the first row of
+# a shape costs a full build plus making the skeleton. Measured with register.bench (1000 rows, one shape):
+#   from a cached skeleton   page1 1.3 ms, page2 1.0 ms, page3 1.0 ms  (40 documents)
+#   from scratch             page1  39 ms, page2  25 ms, page3  25 ms
+#   5 documents, first build included: page1 38 -> 21 ms, page2 23 -> 13 ms, page3 23 -> 15 ms (about 1.7x)
+# So it pays off for batches and the resident service, where the same shapes come back again and again.
+# Only the SKELETONS_KEPT most recently used skeletons are kept, the service runs for days.
+# Same signatures as the render_* functions in register.documents.
+
+DOCUMENT_PART = "word/document.xml"
+# Text of a run with placeholders in it, either the whole text or inside other text (e.g "Client: {{CLIENT}}")
+PLACEHOLDER_TEXT = re.compile(r'<w:t(?: xml:space="preserve")?>([^<]*\{\{[^<]*)</w:t>')
+PLACEHOLDER = re.compile(r"\{\{([^{}]+)\}\}")
+RUN_TEXT_BREAKS = re.compile(r"[\t\r\n]")
+TEST_ORDER = ("I", "II", "III", "IV", "V")
+
+# Headers each layout prints. Their placeholder is {{HEADER}}
+WORK_FILE_FIELDS = ["REPORT NUMBER", "CLIENT", "CONTACT PERSON", "DATE RECEIVED", "RECEIVED BY", "WORK TITLE",
+                    "WORK CLASS", "INTERNAL REFERENCE NUMBER", "APPLICANT BY"]
+TEST_FORM_FIELDS = ["WORK TITLE", "WORK CLASS", "INTERNAL REFERENCE NUMBER"]
+REVIEW_OF_REQUEST_FIELDS = ["WORK TITLE", "INTERNAL REFERENCE NUMBER", "CLIENT"]
+
+SKELETONS_KEPT = 64
+_skeletons = OrderedDict()  # (layout, shape) -> Skeleton, least recently used first
+
+
+class Skeleton:
+    # A saved docx. Every part except document.xml is already compressed into static_zip, rendering only
+    # appends the filled in document.xml to a copy of it
+    def __init__(self, doc):
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        static = io.BytesIO()
+        with zipfile.ZipFile(buffer) as package, zipfile.ZipFile(static, "w", zipfile.ZIP_DEFLATED) as static_package:
+            for info in package.infolist():
+                if info.filename == DOCUMENT_PART:
+                    self.document_info = info
+                    document_xml = package.read(info).decode("utf-8")
+                else:
+                    static_package.writestr(info, package.read(info))
+        self.static_zip = static.getvalue()
+        self.document_xml = document_xml
+
+    def render(self, values, path):
+        # values is {placeholder: text}
+        document_xml = PLACEHOLDER_TEXT.sub(lambda match: _fill(_unescape(match.group(1)), values), self.document_xml)
+        buffer = io.BytesIO(self.static_zip)
+        buffer.seek(0, io.SEEK_END)
+        with zipfile.ZipFile(buffer, "a") as package:
+            package.writestr(self.document_info, document_xml.encode("utf-8"))
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+        return path
+
+
+def _fill(text, values):
+    # The run text python-docx would have written with the values in it, so the document.xml comes out the same
+    # as register.documents makes it
+    whole = PLACEHOLDER.fullmatch(text)
+    if whole:
+        value = values.get(whole.group(1))
+        return _run_text(str(value)) if value else ""  # add_run(None) or add_run("") leaves the run without text
+    return _run_text(PLACEHOLDER.sub(lambda match: str(values.get(match.group(1))), text))  # None shows as "None"
+
+
+def _escape(text):
+    # Same as xml.sax.saxutils.escape, which imports urllib and http (slow start for BD/KK)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _unescape(text):
+    return text.replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
+
+
+def _run_text(text):
+    # Like run.text: tab and each \r or \n become <w:tab/> and <w:br/>, the text between them gets its own <w:t>,
+    # with xml:space="preserve" only when it starts or ends with whitespace
+    parts = []
+    start = 0
+    for match in RUN_TEXT_BREAKS.finditer(text):
+        parts.append(_text_element(text[start:match.start()]))
+        parts.append("<w:tab/>" if match.group() == "\t" else "<w:br/>")
+        start = match.end()
+    parts.append(_text_element(text[start:]))
+    return "".join(parts)
+
+
+def _text_element(text):
+    if not text:
+        return ""
+    space = ' xml:space="preserve"' if text.strip() != text else ""
+    return f"<w:t{space}>{_escape(text)}</w:t>"
+
+
+def _tests_ticked(type_of_test):
+    # Same "test in type_of_test" check the layouts use, on the real TOT string. e.g "IV" ticks I and IV
+    return tuple(test for test in TEST_ORDER if test in type_of_test)
+
+
+def _placeholder_record(fields, tests):
+    # A list for TOT: "in" on it only matches whole codes, so the layout ticks exactly these tests
+    record = {field: f"{{{{{field}}}}}" for field in fields}
+    record["TOT"] = list(tests)
+    return record
+
+
+def _marking_placeholders(count):
+    # Zero padded so they stay in order when the layout sorts them, wider for 1000+ items (continuation pages)
+    width = max(3, len(str(count - 1)))
+    return [f"{{{{M{n:0{width}d}}}}}" for n in range(count)]
+
+
+def _skeleton(layout, shape, build):
+    # build(documents) makes the layout. python-docx is only imported for that, BD/KK talking to the service
+    # never render here
+    key = (layout, shape)
+    skeleton = _skeletons.get(key)
+    if skeleton is None:
+        from register import documents
+        skeleton = _skeletons[key] = Skeleton(build(documents))
+        if len(_skeletons) > SKELETONS_KEPT:
+            _skeletons.popitem(last=False)
+    else:
+        _skeletons.move_to_end(key)
+    return skeleton
+
+
+def _values(record, fields, names):
+    values = {field: dates.format_date(record.get(field)) if field in dates.DATE_HEADERS else record.get(field)
+              for field in fields}
+    values.update(zip((placeholder[2:-2] for placeholder in _marking_placeholders(len(names))), names))
+    return values
+
+
+@profiling.profiled("create_page1")
+def render_work_file(record, out_dir, name=None):
+    names = marking.sample_names(record)
+    tests = _tests_ticked(record.get("TOT"))
+    skeleton = _skeleton("work file", (len(names), tests), lambda documents: documents.build_work_file(
+        _placeholder_record(WORK_FILE_FIELDS, tests), _marking_placeholders(len(names))))
+    path = os.path.join(out_dir, f'{name or record.get("CLIENT")}_workfile.docx')
+    return skeleton.render(_values(record, WORK_FILE_FIELDS, names), path)
+
+
+@profiling.profiled("create_page2")
+def render_test_form(record, out_dir, logo_path, name=None):
+    names = marking.sample_names(record)
+    tests = _tests_ticked(record.get("TOT"))
+    skeleton = _skeleton("test form", (len(names), tests, logo_path), lambda documents: documents.build_test_form(
+        _placeholder_record(TEST_FORM_FIELDS, tests), _marking_placeholders(len(names)), logo_path))
+    path = os.path.join(out_dir, f'{name or record.get("CLIENT")}_testform.docx')
+    return skeleton.render(_values(record, TEST_FORM_FIELDS, names), path)
+
+
+@profiling.profiled("create_page3")
+def render_review_of_request(record, out_dir, logo_path, name=None):
+    tests = _tests_ticked(record.get("TOT"))
+    skeleton = _skeleton("review of request", (tests, logo_path), lambda documents: documents.build_review_of_request(
+        _placeholder_record(REVIEW_OF_REQUEST_FIELDS, tests), logo_path))
+    path = os.path.join(out_dir, f'{name or record.get("CLIENT")}_review of request.docx')
+    return skeleton.render(_values(record, REVIEW_OF_REQUEST_FIELDS, []), path)
+
+
+def clear_cache():
+    # Drop the skeletons, e.g after the logo file was replaced
+    _skeletons.clear()
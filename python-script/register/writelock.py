@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+try:
+    import msvcrt
+except ImportError:  # Not Windows
+    msvcrt = None
+    import fcntl
+
+# Advisory write lock for the excelbook. BD, KK, the register service and the bulk tools all take it before
+# touching the journal or saving, so two clerks on the same shared drive take turns instead of the last save
+# silently wiping the other's rows. It is a lock on a small side file (Buku_Daftar_UAT.lock), Excel itself
+# does not know about it.
+
+LOCK_TIMEOUT_SECONDS = 30
+RETRY_SECONDS = 0.01
+
+
+class RegisterLockedError(TimeoutError):
+    pass
+
+
+def lock_path_for(workbook_path):
+    return os.path.splitext(workbook_path)[0] + ".lock"
+
+
+def _try_lock(f):
+    # Raises OSError if someone else holds it
+    if msvcrt:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(f):
+    if msvcrt:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class WriteLock:
+    # Re-entrant, so Register methods can call each other while holding it. Threads of one process take turns on
+    # it too (a background save in BD/KK against the window reading rows), the file lock is only for other processes
+    def __init__(self, workbook_path, timeout=LOCK_TIMEOUT_SECONDS):
+        self.path = lock_path_for(workbook_path)
+        self.timeout = timeout
+        self.wait_seconds = 0.0  # Total time spent waiting for other writers, the bench reads this
+        self._file = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        start = time.monotonic()
+        if not self._thread_lock.acquire(timeout=self.timeout):
+            raise RegisterLockedError(f"Buku Daftar is busy (still saving after {self.timeout}s): {self.path}")
+        if self._depth:
+            self._depth += 1
+            return
+        try:
+            f = open(self.path, "a+b")
+            while True:
+                try:
+                    _try_lock(f)
+                    break
+                except OSError:
+                    if time.monotonic() - start >= self.timeout:
+                        f.close()
+                        raise RegisterLockedError(f"Buku Daftar is busy (locked by another program for {self.timeout}s): {self.path}")
+                    time.sleep(RETRY_SECONDS)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self.wait_seconds += time.monotonic() - start
+        self._file = f
+        self._depth = 1
+
+    def release(self):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                try:
+                    _unlock(self._file)
+                finally:
+                    self._file.close()
+                    self._file = None
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
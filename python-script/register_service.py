@@ -0,0 +1,19 @@
+import multiprocessing
+import os
+import sys
+
+from register import service
+
+# Entry point for the register service exe (pyinstaller), started by the launcher. Same folder as BD and KK
+
+if getattr(sys, 'frozen', False):
+    base_path = os.path.dirname(sys.executable)
+else:
+    base_path = os.path.dirname(__file__)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    args = sys.argv[1:]
+    if "--register" not in args:
+        args += ["--register", os.path.join(base_path, "Buku_Daftar_UAT.xlsx")]
+    sys.exit(service.main(args))
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# Tests for the headless register package. Small synthetic registers (register.bench), no Tk needed:
+#   cd python-script && python -m pytest -q tests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from register import bench  # noqa: E402  needs the path above
+
+ROWS = 30
+
+
+@pytest.fixture
+def register_path(tmp_path):
+    # A fresh Buku Daftar with ROWS rows, references like PA/UAT/9230/24/17 (D)
+    path = str(tmp_path / "Buku_Daftar_UAT.xlsx")
+    bench.generate_register(path, ROWS)
+    return path
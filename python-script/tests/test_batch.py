@@ -0,0 +1,21 @@
+import os
+
+from register import batch
+from register.core import open_register
+
+
+def no_pool(*args, **kwargs):
+    raise AssertionError("a process pool was started")
+
+
+def test_a_few_rows_render_in_process(register_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", no_pool)
+    reg = open_register(register_path)
+    row_nums = list(range(2, 2 + batch.POOL_MIN_ROWS - 1))
+    done = []
+    results = batch.render_rows(reg, row_nums, str(tmp_path), None, None, progress=lambda *args: done.append(args))
+    assert [(row_num, kind) for row_num, kind, _, _ in results] == [
+        (row_num, kind) for row_num in row_nums for kind in batch.DOCUMENT_KINDS]
+    work_files = [path for _, kind, path, _ in results if kind == "Work File"]
+    assert all(path and os.path.exists(path) for path in work_files)
+    assert done[-1] == (len(results), len(results))
@@ -0,0 +1,41 @@
+from openpyxl import load_workbook
+
+from register import bench, counter, refindex
+from tests.conftest import ROWS
+
+
+def read_rows(path):
+    # Read-only mode leaves out the empty cells at the end of a row
+    width = len(bench.REGISTER_HEADERS)
+    workbook = load_workbook(path, read_only=True)
+    rows = [list(row) + [None] * (width - len(row)) for row in workbook.active.iter_rows(values_only=True)]
+    workbook.close()
+    return rows
+
+
+def test_generated_register(register_path):
+    rows = read_rows(register_path)
+    assert rows[0] == bench.REGISTER_HEADERS
+    assert len(rows) == ROWS + 1
+    assert rows[1:] == [list(row) for row in bench.synthetic_rows(ROWS)]  # Same seed, same register
+
+
+def test_references_look_like_the_real_ones(register_path):
+    column = bench.REGISTER_HEADERS.index("INTERNAL REFERENCE NUMBER")
+    references = [row[column] for row in read_rows(register_path)[1:]]
+    index = refindex.build_index(references)
+    counters = counter.seed_counters(references)
+    for row_num, reference in enumerate(references, start=2):
+        assert refindex.lookup(index, reference) <= row_num  # An amended "-(n)" one finds its original
+        parsed = counter.parse_reference(reference)
+        if parsed:
+            code, year_suffix, running = parsed
+            assert counter.next_running_number(counters, code, year_suffix) > running
+
+
+def test_marking_cases_count_items_not_rows(tmp_path):
+    results = bench.bench_markings(3, str(tmp_path), calls=1)
+    assert {(result["size"], result["unit"]) for result in results} == {(3, "items")}
+    bench.write_results(results, str(tmp_path / "results"))
+    with open(tmp_path / "results.csv", encoding="utf-8") as f:
+        assert f.readline().strip() == "size,unit,operation,calls,seconds,per_call_ms"
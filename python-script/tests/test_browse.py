@@ -0,0 +1,39 @@
+from register import browse
+from register.core import open_register
+from tests.conftest import ROWS
+
+
+class Untouchable:
+    def __getattr__(self, name):
+        raise AssertionError(f"the register was read ({name})")
+
+
+def test_nothing_is_read_until_asked():
+    rows = browse.RowSet(Untouchable(), descending=True)
+    assert rows.descending and rows.order is None
+
+
+def test_show(register_path):
+    rows = browse.RowSet(open_register(register_path), descending=True)
+    start, total, window = rows.show(0, 5, descending=True)
+    assert (start, total) == (0, ROWS)
+    assert [row_num for row_num, _ in window] == list(range(ROWS + 1, ROWS - 4, -1))
+
+    start, total, window = rows.show(ROWS, 5, sort_by="CLIENT")  # Past the end: the last screenful
+    assert (start, total) == (ROWS - 5, ROWS)
+    clients = [values[rows.columns.index("CLIENT")] for _, values in rows.show(0, ROWS, sort_by="CLIENT")[2]]
+    assert clients == sorted(clients, key=browse.sort_key("CLIENT"))
+
+    query = clients[0]
+    start, total, window = rows.show(0, 5, query=query, sort_by="CLIENT")
+    assert 0 < total < ROWS
+    assert all(values[rows.columns.index("CLIENT")] == query for _, values in window)
+
+
+def test_show_refresh_picks_up_new_rows(register_path):
+    reg = open_register(register_path)
+    rows = browse.RowSet(reg)
+    assert rows.show(0, 5)[1] == ROWS
+    reg.append_entry({"CLIENT": "New"})
+    assert rows.show(0, 5)[1] == ROWS  # Same view, nothing read again
+    assert rows.show(0, 5, refresh=True)[1] == ROWS + 1
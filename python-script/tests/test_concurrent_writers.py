@@ -0,0 +1,105 @@
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from openpyxl import load_workbook
+
+from register import bench, journal, writelock
+from register.core import REGISTER_HEADERS, open_register
+from tests.conftest import ROWS
+
+# Several processes writing to one excelbook, like BD and KK on two PCs over the shared drive. Each writer
+# registers rows one at a time and flushes every few rows
+
+ENTRIES = 12
+FLUSH_EVERY = 4
+EXCEL_REFERENCE = "PA/UAT/9250/99/01"
+REFERENCE_COLUMN = REGISTER_HEADERS.index("INTERNAL REFERENCE NUMBER") + 1
+CLIENT_COLUMN = REGISTER_HEADERS.index("CLIENT") + 1
+
+
+def saved_rows(path):
+    # [(CLIENT, INTERNAL REFERENCE NUMBER), ...] from row 2 down
+    workbook = load_workbook(path, read_only=True)
+    rows = [(row[CLIENT_COLUMN - 1], row[REFERENCE_COLUMN - 1])
+            for row in workbook.active.iter_rows(min_row=2, values_only=True)]
+    workbook.close()
+    return rows
+
+
+def edit_in_excel(path):
+    # What a clerk saving in Excel does: change a row and type a new one under the last. Excel doesn't know our
+    # lock, taking it here only keeps the edit out of the middle of a flush
+    with writelock.WriteLock(path):
+        workbook = load_workbook(path)
+        sheet = workbook.active
+        new_row = sheet.max_row + 1
+        sheet.cell(row=2, column=CLIENT_COLUMN, value="Edited in Excel")
+        sheet.cell(row=new_row, column=CLIENT_COLUMN, value="Added in Excel")
+        sheet.cell(row=new_row, column=REFERENCE_COLUMN, value=EXCEL_REFERENCE)
+        workbook.save(path)
+    return new_row
+
+
+def paused_writer(path, entries, seed, halfway, resume):
+    # Like bench._concurrent_writer, but stops halfway with its last row only in the journal until the test
+    # has edited the excelbook
+    rng = random.Random(seed)
+    reg = open_register(path)
+    references = []
+    for n in range(1, entries + 1):
+        references.append(reg.register_entry({"CLIENT": f"Writer {seed}"}, rng.choice(bench.WORKCLASSES)[1])[1])
+        if n == entries // 2:
+            halfway.put(seed)
+            resume.wait()
+        elif n % FLUSH_EVERY == 0:
+            reg.flush()
+    reg.flush()
+    return references, reg.reload_count
+
+
+@pytest.mark.parametrize("writers", [2, 3])
+def test_concurrent_writers(register_path, writers):
+    open_register(register_path)  # Index and running number cache, like a normal first launch
+    with ProcessPoolExecutor(max_workers=writers) as pool:
+        futures = [pool.submit(bench._concurrent_writer, register_path, ENTRIES, FLUSH_EVERY, seed)
+                   for seed in range(writers)]
+        outcomes = [future.result() for future in futures]
+
+    references = [reference for refs, _, _ in outcomes for reference in refs]
+    assert len(references) == writers * ENTRIES
+    assert len(set(references)) == len(references)  # Nobody got the same number
+
+    rows = saved_rows(register_path)
+    assert not journal.has_pending(register_path)
+    assert len(rows) == ROWS + writers * ENTRIES  # No row lost or written twice
+    assert sorted(reference for _, reference in rows[ROWS:]) == sorted(references)
+
+
+@pytest.mark.parametrize("writers", [2, 3])
+def test_excel_edit_while_writers_run(register_path, writers):
+    open_register(register_path)
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=writers) as pool:
+        halfway = manager.Queue()
+        resume = manager.Event()
+        futures = [pool.submit(paused_writer, register_path, ENTRIES, seed, halfway, resume) for seed in range(writers)]
+        for _ in range(writers):
+            halfway.get(timeout=60)
+        assert journal.has_pending(register_path)  # Every writer has a row that is not in the excelbook yet
+        excel_row = edit_in_excel(register_path)
+        resume.set()
+        outcomes = [future.result() for future in futures]
+
+    references = [reference for refs, _ in outcomes for reference in refs]
+    assert len(set(references)) == writers * ENTRIES
+    assert all(reloads >= 1 for _, reloads in outcomes)  # Everybody took the edited copy instead of saving over it
+
+    rows = saved_rows(register_path)
+    assert not journal.has_pending(register_path)
+    assert len(rows) == ROWS + writers * ENTRIES + 1
+    assert rows[0][0] == "Edited in Excel"
+    assert rows[excel_row - 2] == ("Added in Excel", EXCEL_REFERENCE)  # The journaled rows moved down, not over it
+    assert sorted(reference for _, reference in rows[ROWS:] if reference != EXCEL_REFERENCE) == sorted(references)
+    for seed in range(writers):
+        assert [client for client, _ in rows].count(f"Writer {seed}") == ENTRIES
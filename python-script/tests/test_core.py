@@ -0,0 +1,77 @@
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from register import counter, journal
+from register.core import REGISTER_HEADERS, open_register, prepare_entry
+from tests.conftest import ROWS
+
+CLIENT_COLUMN = REGISTER_HEADERS.index("CLIENT") + 1
+FORM = dict(report_number="STRIDE/TAL/25/00031", client="Jabatan Kimia", contact_person="Aina", work_title="Fibre",
+            date_received="14/03/25", received_by="Hafiz", quantity="2", sample_marking="Baju No. 3, Seluar;2",
+            workclass="MINDEF", subgroup="Bekalan", additional="D", tests=("IV", "I"))
+
+
+def test_prepare_entry():
+    row_values, workclass, suffix = prepare_entry(**FORM)
+    assert (workclass, suffix) == ("MINDEF", "D")
+    assert row_values["SAMPLE MARKING"] == "01. baju no. 3 x 1; 02. seluar x 2"
+    assert row_values["TOT"] == "I, IV"
+    assert row_values["WORK CLASS"] == "MINDEF (Bekalan)"
+    assert row_values["APPLICANT BY"] == "NA"
+
+
+@pytest.mark.parametrize("change", [{"client": " "}, {"subgroup": ""}, {"additional": ""}, {"workclass": "Swasta"},
+                                    {"tests": ("VI",)}])
+def test_prepare_entry_refuses_what_the_form_refuses(change):
+    with pytest.raises(ValueError):
+        prepare_entry(**dict(FORM, **change))
+
+
+def test_register_and_flush(register_path):
+    reg = open_register(register_path)
+    row_values, workclass, suffix = prepare_entry(**FORM)
+    reference = reg.allocate_reference(workclass, suffix)
+    assert reg.register_entry(row_values, workclass, suffix) == (ROWS + 2, reference)
+    assert reg.allocate_reference(workclass, suffix) != reference
+    assert reg.find_by_reference(reference) == ROWS + 2
+    assert reg.has_pending()
+
+    assert reg.flush()
+    assert not reg.has_pending()
+    reopened = open_register(register_path)
+    assert reopened.find_by_reference(reference + "-(1)") == ROWS + 2
+    assert reopened.read_record(ROWS + 2)["CLIENT"] == "Jabatan Kimia"
+    year_suffix = datetime.now().year % 100
+    assert reopened.allocate_reference("MINDEF", "D").startswith(f"PA/UAT/9230/{year_suffix:02d}/")
+
+
+def test_register_entries_count_on(register_path):
+    reg = open_register(register_path)
+    first = reg.allocate_reference("STRIDE")
+    (_, reference), (_, second) = reg.register_entries([({"CLIENT": "a"}, "STRIDE", None),
+                                                        ({"CLIENT": "b"}, "STRIDE", None)])
+    assert reference == first
+    assert counter.parse_reference(second)[2] == counter.parse_reference(first)[2] + 1
+    assert reg.allocate_reference("STRIDE") != second
+
+
+def test_update_record_moves_the_reference(register_path):
+    reg = open_register(register_path)
+    reg.update_record(2, {"INTERNAL REFERENCE NUMBER": "PA/UAT/9260/21/99", "CLIENT": "Edited"})
+    assert reg.find_by_reference("PA/UAT/9260/21/99") == 2
+    reg.flush()
+    assert load_workbook(register_path).active.cell(row=2, column=CLIENT_COLUMN).value == "Edited"
+    assert open_register(register_path).find_by_reference("PA/UAT/9260/21/99") == 2
+
+
+def test_crash_recovery_at_open(register_path):
+    # A row journaled by a program that died before it flushed
+    recovered = {"CLIENT": "Recovered", "INTERNAL REFERENCE NUMBER": "PA/UAT/9260/25/77"}
+    journal.append_rows(register_path, [(ROWS + 2, recovered)], op="append")
+    reg = open_register(register_path)
+    assert reg.find_by_reference("PA/UAT/9260/25/77") == ROWS + 2
+    assert reg.allocate_reference("STRIDE", year=2025) == "PA/UAT/9260/25/78"
+    reg.flush()
+    assert load_workbook(register_path).active.cell(row=ROWS + 2, column=CLIENT_COLUMN).value == "Recovered"
@@ -0,0 +1,69 @@
+import json
+
+from register import counter
+from register.core import next_reference
+
+REFERENCES = ["PA/UAT/9230/25/41 (D)", "PA/UAT/9230/25/09", "PA/UAT/9240/24/03", "PA/UAT/9240/24/05-(1)", None]
+
+
+def fake_excelbook(tmp_path, content=b"v1"):
+    # Only its stamp (mtime, size) matters to the cache
+    path = tmp_path / "Buku_Daftar_UAT.xlsx"
+    path.write_bytes(content)
+    return str(path)
+
+
+def not_read():
+    raise AssertionError("the reference column was read")
+
+
+def test_parse_reference():
+    assert counter.parse_reference("PA/UAT/9230/25/41 (D)") == ("9230", 25, 41)
+    assert counter.parse_reference("PA/UAT/9240/25/07") == ("9240", 25, 7)
+    assert counter.parse_reference("PA/UAT/9240/25/07-(1)") is None  # Amended, not counted
+    assert counter.parse_reference("9240/25/07") is None
+
+
+def test_seed_and_next_running_number():
+    counters = counter.seed_counters(REFERENCES)
+    assert counters == {"9230/25": 41, "9240/24": 3}
+    assert counter.next_running_number(counters, "9230", 25) == 42
+    assert counter.next_running_number(counters, "9240", 25) == 1
+    counter.record_reference(counters, "PA/UAT/9230/25/42 (L)")
+    counter.record_reference(counters, "PA/UAT/9230/25/07")  # Lower, nothing changes
+    assert counters["9230/25"] == 42
+
+
+def test_next_reference_and_years():
+    counters = counter.seed_counters(REFERENCES)
+    assert next_reference(counters, "MINDEF", "L", year=2025) == "PA/UAT/9230/25/42 (L)"
+    assert next_reference(counters, "Berbayar", year=2025) == "PA/UAT/9240/25/01"
+    assert counter.counter_years(counters) == [25, 24]
+
+
+def test_cache_is_trusted_while_the_excelbook_is_untouched(tmp_path):
+    path = fake_excelbook(tmp_path)
+    counter.load_counters(path, lambda: REFERENCES)  # Writes the cache
+    with open(counter.counter_path_for(path), encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["counters"]["9260/24"] = 500  # Only the cache knows this
+    with open(counter.counter_path_for(path), "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    assert counter.load_counters(path, not_read)["9260/24"] == 500
+
+
+def test_cache_kept_when_saved_elsewhere_with_the_same_last_row(tmp_path):
+    path = fake_excelbook(tmp_path)
+    counter.load_counters(path, lambda: REFERENCES)
+    fake_excelbook(tmp_path, b"saved by KK")
+    assert counter.load_counters(path, lambda: REFERENCES) == {"9230/25": 41, "9240/24": 3}
+    assert counter.load_counters(path, not_read) == {"9230/25": 41, "9240/24": 3}  # Re-stamped
+
+
+def test_cache_is_reseeded_after_rows_added_outside(tmp_path):
+    path = fake_excelbook(tmp_path)
+    counter.load_counters(path, lambda: REFERENCES)
+    fake_excelbook(tmp_path, b"row added in Excel")
+    counters = counter.load_counters(path, lambda: REFERENCES + ["PA/UAT/9250/24/90"])
+    assert counters["9250/24"] == 90
+    assert counter.next_running_number(counters, "9250", 24) == 91
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+from register import convert_dates, dates, journal
+from register.core import REGISTER_HEADERS, open_register
+
+
+def test_parse_date_formats():
+    for text in ["14/3/25", "14/03/2025", "2025-03-14", "14-03-25", "14.03.2025", " 14/03/25 "]:
+        assert dates.parse_date(text) == datetime(2025, 3, 14)
+    assert dates.parse_date(date(2025, 3, 14)) == datetime(2025, 3, 14)
+    assert dates.parse_date("NA") is None
+
+
+def test_normalize_row_keeps_text_that_is_not_a_date():
+    row = dates.normalize_row({"DATE RECEIVED": "14/3/25", "END TEST DATE": " KIV ", "CLIENT": "14/3/25"})
+    assert row == {"DATE RECEIVED": datetime(2025, 3, 14), "END TEST DATE": "KIV", "CLIENT": "14/3/25"}
+    assert dates.format_date(row["DATE RECEIVED"]) == "14/03/25"
+    assert dates.format_date(None) == ""
+
+
+def test_date_index_rows_between():
+    index = dates.DateIndex([(2, "01/03/25"), (3, datetime(2025, 3, 31)), (4, "NA"), (5, "01/04/25")])
+    assert index.rows_between(date(2025, 3, 1), date(2025, 3, 31)) == [2, 3]
+    index.set(5, "15/03/25")
+    assert index.rows_between(date(2025, 3, 1), date(2025, 3, 31)) == [2, 5, 3]
+
+
+def test_register_rows_between(register_path):
+    reg = open_register(register_path)
+    assert 2 in reg.rows_between("DATE RECEIVED", date(2021, 1, 1), date(2021, 1, 31))  # Generated from 4/1/21
+    row_num = reg.append_entry({"CLIENT": "Later", "DATE RECEIVED": "15/6/30"})
+    assert reg.read_record(row_num)["DATE RECEIVED"] == datetime(2030, 6, 15)
+    assert reg.rows_between("DATE RECEIVED", date(2030, 6, 1), date(2030, 6, 30)) == [row_num]
+
+
+def test_convert_workbook(register_path):
+    # The generated register has dates as text, like the rows written before the date columns were typed
+    workbook = load_workbook(register_path)
+    workbook.active.cell(row=2, column=REGISTER_HEADERS.index("START TEST DATE") + 1, value="KIV")
+    workbook.save(register_path)
+    journal.append_rows(register_path, [(3, {"END TEST DATE": "01/02/21"})])
+
+    converted, left = convert_dates.convert_workbook(register_path)
+    assert converted > 0
+    assert left == [(2, "START TEST DATE", "KIV")]
+    assert not journal.has_pending(register_path)
+
+    sheet = load_workbook(register_path).active
+    assert isinstance(sheet.cell(row=2, column=REGISTER_HEADERS.index("DATE RECEIVED") + 1).value, datetime)
+    assert sheet.cell(row=3, column=REGISTER_HEADERS.index("END TEST DATE") + 1).value == datetime(2021, 2, 1)
+    assert convert_dates.convert_workbook(register_path) == (0, left)  # Safe to run again
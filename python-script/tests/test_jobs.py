@@ -0,0 +1,72 @@
+import threading
+import time
+
+from register.jobs import JobQueue
+
+
+class FakeWidget:
+    # after() without Tk: the callbacks run when the test pumps them
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, func):
+        self.pending.append(func)
+
+    def pump(self, until, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "jobs did not finish"
+            pending, self.pending = self.pending, []
+            for func in pending:
+                func()
+            time.sleep(0.01)
+
+
+def test_newer_submit_supersedes_the_older_one():
+    widget = FakeWidget()
+    jobs = JobQueue(widget)
+    release = threading.Event()
+    jobs.submit(release.wait, label="Blocking")  # Keeps the searches below waiting
+    delivered = []
+    for query in ("ja", "jac", "jack"):
+        jobs.submit(str.upper, query, key="search", supersede=True, on_done=delivered.append)
+    release.set()
+    widget.pump(lambda: not jobs.busy)
+    assert delivered == ["JACK"]
+    jobs.close()
+
+
+def test_result_of_a_running_job_is_dropped_once_superseded():
+    widget = FakeWidget()
+    jobs = JobQueue(widget)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_search(query):
+        started.set()
+        release.wait()
+        return query
+
+    delivered = []
+    jobs.submit(slow_search, "old", key="search", supersede=True, on_done=delivered.append)
+    started.wait(5)
+    jobs.submit(str, "new", key="search", supersede=True, on_done=delivered.append)
+    release.set()
+    widget.pump(lambda: not jobs.busy)
+    assert delivered == ["new"]
+    jobs.close()
+
+
+def test_coalesced_callbacks_ride_along():
+    widget = FakeWidget()
+    jobs = JobQueue(widget)
+    release = threading.Event()
+    calls = []
+    jobs.submit(release.wait)
+    done = []
+    for _ in range(3):
+        jobs.submit(lambda: calls.append(1) or len(calls), key="flush", on_done=done.append)
+    release.set()
+    widget.pump(lambda: not jobs.busy)
+    assert calls == [1] and done == [1, 1, 1]
+    jobs.close()
@@ -0,0 +1,63 @@
+from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet.table import Table
+
+from register import journal
+from register.core import open_register
+from tests.conftest import ROWS
+
+HEADERS = ["REPORT NUMBER", "INTERNAL REFERENCE NUMBER", "CLIENT"]
+COLUMN_INDEXES = {header: col for col, header in enumerate(HEADERS, start=1)}
+
+
+def small_register(path, rows=3):
+    # HEADERS and a few rows in a table, like Buku Daftar
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADERS)
+    for n in range(1, rows + 1):
+        sheet.append([f"STRIDE/TAL/25/{n:05d}", f"PA/UAT/9260/25/{n:02d}", f"Client {n}"])
+    sheet.add_table(Table(displayName="BukuDaftar", ref=f"A1:C{rows + 1}"))
+    workbook.save(path)
+    return str(path)
+
+
+def test_read_from_offsets_and_torn_lines(tmp_path):
+    path = small_register(tmp_path / "Buku_Daftar_UAT.xlsx")
+    journal.append_rows(path, [(5, {"CLIENT": "a"})], op="append")
+    with open(journal.journal_path_for(path), "ab") as f:
+        f.write(b'{"op": "append", "row": 6, "val')  # Crash mid-write
+    offset = journal.append_rows(path, [(2, {"CLIENT": "b"})])  # Starts on a line of its own
+
+    entries, end = journal.read_from(path)
+    assert entries == [{"op": "append", "row": 5, "values": {"CLIENT": "a"}},
+                       {"op": "update", "row": 2, "values": {"CLIENT": "b"}}]
+    assert end == offset
+    assert journal.read_from(path, end) == ([], end)
+    assert journal.has_pending(path)
+
+
+def test_recover_at_startup(tmp_path):
+    # Rows journaled by a program that died before it flushed
+    path = small_register(tmp_path / "Buku_Daftar_UAT.xlsx")
+    journal.append_rows(path, [(5, {"CLIENT": "Recovered", "INTERNAL REFERENCE NUMBER": "PA/UAT/9260/25/04"})],
+                        op="append")
+    journal.append_rows(path, [(2, {"CLIENT": "Edited"})])
+
+    workbook = load_workbook(path)
+    assert journal.recover(workbook, path, workbook.active, COLUMN_INDEXES) == 2
+    assert not journal.has_pending(path)
+
+    sheet = load_workbook(path).active
+    assert sheet.cell(row=5, column=3).value == "Recovered"
+    assert sheet.cell(row=2, column=3).value == "Edited"
+    assert next(iter(sheet.tables.values())).ref == "A1:C5"
+    assert journal.recover(workbook, path, workbook.active, COLUMN_INDEXES) == 0
+
+
+def test_replay_twice_is_harmless(register_path):
+    journal.append_rows(register_path, [(ROWS + 2, {"CLIENT": "Once"})], op="append")
+    first = open_register(register_path)
+    second = open_register(register_path)  # Replays the same journal
+    assert first.last_row() == second.last_row() == ROWS + 2
+    second.flush()
+    assert first.last_row() == ROWS + 2
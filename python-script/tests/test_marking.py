@@ -0,0 +1,90 @@
+import pytest
+from openpyxl import load_workbook
+
+from register import convert_markings, marking, refindex, sqlstore
+from register.core import REGISTER_HEADERS
+from tests.conftest import ROWS
+
+
+def test_parse_input_defaults_and_quantities():
+    assert marking.parse_input("Baju No. 3, Seluar Hitam;2, , Topi;x") == [
+        ("baju no. 3", 1), ("seluar hitam", 2), ("topi", 1)]
+
+
+def test_round_trip_through_both_cells():
+    items = marking.parse_input("Baju No. 3, Seluar Hitam;2")
+    text = marking.format_items(items)
+    assert text == "01. baju no. 3 x 1; 02. seluar hitam x 2"
+    assert marking.parse_saved(text) == items
+    assert marking.loads(marking.dumps(items)) == items
+
+
+def test_round_trip_past_99_items():
+    # The old string slicing broke here
+    items = [(f"kain {n}", n % 5 + 1) for n in range(120)]
+    assert marking.parse_saved(marking.format_items(items)) == items
+    assert marking.record_items({"SAMPLE MARKING": marking.format_items(items)}) == items
+
+
+def test_record_items_prefers_the_json():
+    record = {"SAMPLE MARKING": "typed over", marking.ITEMS_HEADER: '[["baju",2]]'}
+    assert marking.record_items(record) == [("baju", 2)]
+    assert marking.record_items({"SAMPLE MARKING": "01. baju x 2"}) == [("baju", 2)]
+    assert marking.sample_names({"SAMPLE MARKING": "seluar, baju biru"}) == ["Baju Biru", "Seluar"]
+
+
+def test_normalize_row_keeps_the_typed_text():
+    values = {"SAMPLE MARKING": "Baju No. 3, Seluar;2"}
+    row = marking.normalize_row(values)
+    assert row["SAMPLE MARKING"] == "Baju No. 3, Seluar;2"
+    assert marking.loads(row[marking.ITEMS_HEADER]) == [("baju no. 3", 1), ("seluar", 2)]
+    assert "SAMPLE MARKING ITEMS" not in values
+    assert marking.normalize_row({"SAMPLE MARKING": ""})[marking.ITEMS_HEADER] is None
+    assert marking.normalize_row({"CLIENT": "x"}) == {"CLIENT": "x"}
+
+
+def test_both_cells_are_checked_against_the_cell_limit():
+    too_long = "x" * (marking.CELL_LIMIT + 1)
+    with pytest.raises(ValueError):
+        marking.normalize_row({"SAMPLE MARKING": too_long})
+    with pytest.raises(ValueError):
+        marking.format_cell([("a" * 100, 1)] * 400)
+    with pytest.raises(ValueError):
+        marking.dumps([("a" * 100, 1)] * 400)
+
+LONG_MARKING = ", ".join(["ab"] * 8000)  # Fits a cell as text, not as items
+
+
+def legacy_register(register_path, long_row):
+    # Buku Daftar from before the items column, with one SAMPLE MARKING whose items don't fit a cell
+    workbook = load_workbook(register_path)
+    sheet = workbook.active
+    sheet.delete_cols(REGISTER_HEADERS.index(marking.ITEMS_HEADER) + 1)
+    sheet.cell(row=long_row, column=REGISTER_HEADERS.index("SAMPLE MARKING") + 1, value=LONG_MARKING)
+    workbook.save(register_path)
+
+
+def test_convert_workbook_lists_what_does_not_fit(register_path):
+    legacy_register(register_path, 3)
+    filled, left = convert_markings.convert_workbook(register_path)
+    assert filled == ROWS - 1
+    assert [row_num for row_num, _ in left] == [3]
+    sheet = load_workbook(register_path).active
+    assert sheet.cell(row=3, column=REGISTER_HEADERS.index("SAMPLE MARKING") + 1).value == LONG_MARKING
+
+    stamp = refindex.workbook_stamp(register_path)
+    assert convert_markings.convert_workbook(register_path)[0] == 0
+    assert refindex.workbook_stamp(register_path) == stamp  # Nothing to do, not written again
+
+
+def test_sqlite_import_keeps_what_does_not_fit(register_path):
+    legacy_register(register_path, 3)
+    reg = sqlstore.import_workbook(register_path)
+    try:
+        assert [row_num for row_num, _ in reg.markings_left] == [3]
+        record = reg.read_record(3)
+        assert record["SAMPLE MARKING"] == LONG_MARKING and record[marking.ITEMS_HEADER] is None
+        assert reg.read_record(2)[marking.ITEMS_HEADER]
+        assert reg.last_row() == ROWS + 1
+    finally:
+        reg.close()
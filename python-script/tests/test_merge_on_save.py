@@ -0,0 +1,69 @@
+from openpyxl import load_workbook
+
+from register import journal
+from register.core import REGISTER_HEADERS, open_register
+from tests.conftest import ROWS
+
+CLIENT_COLUMN = REGISTER_HEADERS.index("CLIENT") + 1
+
+
+def saved_clients(path):
+    sheet = load_workbook(path, read_only=True).active
+    rows = sheet.iter_rows(min_row=2, min_col=CLIENT_COLUMN, max_col=CLIENT_COLUMN, values_only=True)
+    return [value for (value,) in rows]
+
+
+def test_two_programs_both_save(register_path):
+    # BD and KK on the same excelbook: each sees the other's rows before handing out a row or a reference
+    bd = open_register(register_path)
+    kk = open_register(register_path)
+    bd_row, bd_reference = bd.register_entry({"CLIENT": "From BD"}, "STRIDE")
+    kk_row, kk_reference = kk.register_entry({"CLIENT": "From KK"}, "STRIDE")
+    assert (bd_row, kk_row) == (ROWS + 2, ROWS + 3)
+    assert bd_reference != kk_reference
+
+    assert bd.flush()  # Writes both rows, they are both in its sheet
+    kk.update_record(2, {"CLIENT": "Edited in KK"})
+    assert kk.reload_count == 0  # BD saved exactly what KK had
+    assert kk.flush()
+    assert not journal.has_pending(register_path)
+
+    clients = saved_clients(register_path)
+    assert len(clients) == ROWS + 2
+    assert clients[0] == "Edited in KK"
+    assert clients[-2:] == ["From BD", "From KK"]
+    assert bd.read_record(2)["CLIENT"] == "Edited in KK"
+
+
+def test_excel_edit_survives_the_next_save(register_path):
+    reg = open_register(register_path)
+    reg.register_entry({"CLIENT": "Before"}, "MINDEF", "D")
+    reg.flush()
+
+    # Somebody edits and adds a row in Excel while the program stays open
+    workbook = load_workbook(register_path)
+    workbook.active.cell(row=2, column=CLIENT_COLUMN, value="Edited in Excel")
+    workbook.active.cell(row=ROWS + 3, column=CLIENT_COLUMN, value="Added in Excel")
+    workbook.save(register_path)
+
+    row_num, _ = reg.register_entry({"CLIENT": "After"}, "MINDEF", "D")
+    assert reg.reload_count == 1
+    assert row_num == ROWS + 4
+    reg.flush()
+    assert saved_clients(register_path)[0] == "Edited in Excel"
+    assert saved_clients(register_path)[-3:] == ["Before", "Added in Excel", "After"]
+
+
+def test_journaled_row_moves_when_excel_took_its_place(register_path):
+    reg = open_register(register_path)
+    row_num, reference = reg.register_entry({"CLIENT": "Journaled"}, "Berbayar")
+
+    # Excel writes its own row on the same row number before we flushed
+    workbook = load_workbook(register_path)
+    workbook.active.cell(row=row_num, column=CLIENT_COLUMN, value="Typed in Excel")
+    workbook.save(register_path)
+
+    reg.flush()
+    assert reg.moved_rows == {row_num: row_num + 1}
+    assert reg.find_by_reference(reference) == row_num + 1
+    assert saved_clients(register_path)[-2:] == ["Typed in Excel", "Journaled"]
@@ -0,0 +1,38 @@
+from openpyxl import load_workbook
+
+from register import revenue
+from register.core import REGISTER_HEADERS, open_register
+
+from conftest import ROWS
+
+CLIENT_COLUMN = REGISTER_HEADERS.index("CLIENT") + 1
+
+
+def register_rows(register_path):
+    # What the Register (not streaming) has in the revenue columns
+    reg = open_register(register_path)
+    row_nums = range(2, reg.last_row() + 1)
+    rows = zip(row_nums, reg.read_rows(row_nums, revenue.REVENUE_HEADERS))
+    return [(row_num, dict(zip(revenue.REVENUE_HEADERS, values))) for row_num, values in rows
+            if any(value not in (None, "") for value in values)]
+
+
+def test_stream_follows_rows_moved_by_the_journal(register_path):
+    reg = open_register(register_path)
+    row_num, _ = reg.register_entry({"CLIENT": "Journaled", "REVENUE/REMARKS": "RM 100"}, "Berbayar")
+    reg.update_record(row_num, {"REVENUE/REMARKS": "RM 250"})
+    reg.register_entry({"CLIENT": "Also journaled", "REVENUE/REMARKS": "RM 40"}, "Berbayar")
+
+    # Excel writes its own row on the same row number before anything was flushed
+    workbook = load_workbook(register_path)
+    workbook.active.cell(row=row_num, column=CLIENT_COLUMN, value="Typed in Excel")
+    workbook.save(register_path)
+
+    streamed = list(revenue.stream_rows(register_path))
+    assert streamed == register_rows(register_path)
+    assert [values["CLIENT"] for _, values in streamed[-3:]] == ["Typed in Excel", "Journaled", "Also journaled"]
+    assert [row_num for row_num, _ in streamed[-3:]] == [ROWS + 2, ROWS + 3, ROWS + 4]  # Both new rows moved down
+    assert streamed[-2][1]["REVENUE/REMARKS"] == "RM 250"  # The edit followed its row
+
+    summary = revenue.aggregate(streamed, revenue.RevenueParser())
+    assert summary.total() == revenue.aggregate(register_rows(register_path), revenue.RevenueParser()).total()
@@ -0,0 +1,32 @@
+from register import schema
+
+HEADERS = ["REPORT NUMBER", "CLIENT", "SAMPLE MARKING ITEMS"]
+STAMP = [1, 100]
+
+
+def read_header_row(calls):
+    def read():
+        calls.append(1)
+        return HEADERS
+    return read
+
+
+def test_cache_is_used_for_the_same_stamp(tmp_path):
+    path = str(tmp_path / "Buku_Daftar_UAT.xlsx")
+    calls = []
+    assert schema.load_schema(path, STAMP, read_header_row(calls), ["REPORT NUMBER", "CLIENT"]) == (
+        HEADERS, {"REPORT NUMBER": 1, "CLIENT": 2})
+    assert schema.load_schema(path, STAMP, read_header_row(calls), ["CLIENT", "REPORT NUMBER"])[1] == {
+        "REPORT NUMBER": 1, "CLIENT": 2}
+    assert len(calls) == 1
+
+
+def test_more_wanted_headers_are_mapped(tmp_path):
+    # A newer program that knows SAMPLE MARKING ITEMS, on a cache written by an older one
+    path = str(tmp_path / "Buku_Daftar_UAT.xlsx")
+    calls = []
+    schema.load_schema(path, STAMP, read_header_row(calls), ["REPORT NUMBER", "CLIENT"])
+    wanted = ["REPORT NUMBER", "CLIENT", "SAMPLE MARKING ITEMS"]
+    assert schema.load_schema(path, STAMP, read_header_row(calls), wanted)[1] == {
+        "REPORT NUMBER": 1, "CLIENT": 2, "SAMPLE MARKING ITEMS": 3}
+    assert schema.load_schema(path, [2, 200], read_header_row(calls), wanted)[1]["SAMPLE MARKING ITEMS"] == 3
@@ -0,0 +1,56 @@
+from register import search
+from register.core import open_register
+
+RECORDS = [
+    (2, {"CLIENT": "Client 42", "WORK TITLE": "Fibre analysis lot 7",
+         "SAMPLE MARKING": "01. jacket x 1; 02. beret x 2"}),
+    (3, {"CLIENT": "Client 7", "WORK TITLE": "Fibre analysis lot 42", "SAMPLE MARKING": "01. trousers x 3"}),
+    (4, {"CLIENT": "Kilang Kain Biru", "REPORT NUMBER": "STRIDE/TAL/25/00004", "SAMPLE MARKING": "01. kain biru x 1"}),
+]
+
+
+def rows(results):
+    return [row_num for row_num, _ in results]
+
+
+def test_exact_words_must_all_match():
+    index = search.build_index(RECORDS)
+    assert rows(index.search("kain biru")) == [4]
+    assert rows(index.search("jacket trousers")) == []
+    assert index.search("") == []
+
+
+def test_prefix():
+    index = search.build_index(RECORDS)
+    assert rows(index.search("jack")) == [2]
+    assert rows(index.search("stride/tal/25")) == [4]
+    assert set(rows(index.search("fib"))) == {2, 3}
+
+
+def test_fuzzy_one_typo():
+    index = search.build_index(RECORDS)
+    assert set(rows(index.search("cleint"))) == {2, 3}
+    assert rows(index.search("troussers")) == [3]
+    assert rows(index.search("jackte")) == [2]  # Transposed letters
+    assert rows(index.search("kian")) == [4]  # 4 letters is the shortest that gets a typo
+
+
+def test_exact_and_client_hits_rank_first():
+    index = search.build_index(RECORDS)
+    # "42" is the client on row 2 (weight 3) and a work title on row 3
+    assert rows(index.search("42"))[0] == 2
+
+
+def test_edited_row_is_found_by_its_new_text():
+    index = search.build_index(RECORDS)
+    index.add(3, {"CLIENT": "Syarikat Baju", "SAMPLE MARKING": "01. seluar x 1"})
+    assert rows(index.search("trousers")) == []
+    assert rows(index.search("seluar")) == [3]
+
+
+def test_register_search_sees_journaled_rows(register_path):
+    reg = open_register(register_path)
+    assert rows(reg.search("client")) != []
+    row_num = reg.append_entry({"CLIENT": "Jabatan Kimia", "SAMPLE MARKING": "01. tudung x 1"})
+    assert rows(reg.search("jabatan tudung")) == [row_num]
+    assert rows(open_register(register_path).search("jabtan")) == [row_num]  # From the journal, not saved yet
@@ -0,0 +1,71 @@
+from openpyxl import load_workbook
+
+from register import sqlstore
+from register.core import REGISTER_HEADERS
+from tests.conftest import ROWS
+
+CLIENT_COLUMN = REGISTER_HEADERS.index("CLIENT") + 1
+
+
+def dress_up(register_path):
+    # What people add to Buku Daftar in Excel
+    workbook = load_workbook(register_path)
+    sheet = workbook.active
+    sheet.column_dimensions["B"].width = 42
+    sheet.freeze_panes = "A2"
+    notes = workbook.create_sheet("Notes")
+    notes["A1"] = "Keep me"
+    workbook.save(register_path)
+
+
+def test_export_keeps_the_rest_of_the_excelbook(register_path):
+    dress_up(register_path)
+    reg = sqlstore.import_workbook(register_path)
+    try:
+        reg.update_record(2, {"CLIENT": "Edited"})
+        row_num = reg.append_entry({"CLIENT": "Added"})
+        assert reg.flush()
+        reg.update_record(3, {"CLIENT": "Edited again"})  # From the kept workbook this time
+        assert reg.export() == 1
+    finally:
+        reg.close()
+
+    workbook = load_workbook(register_path)
+    sheet = workbook.active
+    assert workbook.sheetnames == [sheet.title, "Notes"]
+    assert workbook["Notes"]["A1"].value == "Keep me"
+    assert sheet.column_dimensions["B"].width == 42
+    assert sheet.freeze_panes == "A2"
+    assert [sheet.cell(row=n, column=CLIENT_COLUMN).value for n in (2, 3, row_num)] == ["Edited", "Edited again", "Added"]
+    table = next(iter(sheet.tables.values()))
+    assert table.ref.endswith(str(ROWS + 2))
+    assert [column.name for column in table.tableColumns] == [cell.value for cell in sheet[1]]
+
+
+def test_forced_export_drops_rows_added_in_excel(register_path):
+    reg = sqlstore.import_workbook(register_path)
+    try:
+        workbook = load_workbook(register_path)
+        workbook.active.cell(row=ROWS + 5, column=CLIENT_COLUMN, value="Not in the database")
+        workbook.save(register_path)
+        assert reg.export(force=True) == ROWS
+    finally:
+        reg.close()
+    sheet = load_workbook(register_path).active
+    assert sheet.max_row == ROWS + 1
+
+
+def test_export_to_a_new_excelbook(register_path, tmp_path):
+    reg = sqlstore.import_workbook(register_path)
+    try:
+        path = str(tmp_path / "copy.xlsx")
+        assert reg.export(path) == ROWS
+    finally:
+        reg.close()
+    original = load_workbook(register_path).active
+    copy = load_workbook(path).active
+    assert [cell.value for cell in copy[1]][:len(REGISTER_HEADERS)] == REGISTER_HEADERS
+    assert copy.max_row == ROWS + 1
+    assert [cell.value for (cell,) in copy.iter_rows(min_col=CLIENT_COLUMN, max_col=CLIENT_COLUMN)] == [
+        cell.value for (cell,) in original.iter_rows(min_col=CLIENT_COLUMN, max_col=CLIENT_COLUMN)]
+    assert copy.tables
@@ -0,0 +1,29 @@
+import zipfile
+
+import pytest
+
+from register import bench, documents, templates
+from register.core import REGISTER_HEADERS
+
+# Values python-docx writes differently from plain text: spaces at the ends, tabs, line breaks, XML characters
+ODD_VALUES = [("CLIENT", "  Spaced  "), ("WORK TITLE", "Tab\there & <there>"), ("CLIENT", "Line\r\nbreak\nand\rmore"),
+              ("CLIENT", None), ("SAMPLE MARKING ITEMS", '[[" lead", 1], ["trail ", 2], ["a\\tb", 1]]'),
+              ("REPORT NUMBER", "")]
+KINDS = [("render_work_file", False), ("render_test_form", True), ("render_review_of_request", True)]
+
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as package:
+        return package.read(templates.DOCUMENT_PART)
+
+
+@pytest.mark.parametrize("header, value", ODD_VALUES)
+def test_same_document_as_python_docx(tmp_path, header, value):
+    logo_path = str(tmp_path / "logo.png")
+    bench.write_logo(logo_path)
+    record = dict(zip(REGISTER_HEADERS, next(iter(bench.synthetic_rows(1, 3)))), **{header: value})
+    for kind, needs_logo in KINDS:
+        args = (logo_path,) if needs_logo else ()
+        built = getattr(documents, kind)(record, str(tmp_path), *args, name="built")
+        filled = getattr(templates, kind)(record, str(tmp_path), *args, name="filled")
+        assert document_xml(filled) == document_xml(built), kind